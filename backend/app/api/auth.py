@@ -18,6 +18,8 @@ from app.exceptions import ApiException
 from fastapi.responses import RedirectResponse
 from app.core.settings_service import save_access_token
 from app.core import settings_service
+from app.core.http_clients import http_clients
+from app.core.identity_cache import identity_cache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -86,22 +88,16 @@ async def callback(
         "code": code,
     }
 
-    # 配置代理设置 (如果有配置的话)
-    proxies = {}
-    if settings.HTTP_PROXY:
-        proxies["http://"] = settings.HTTP_PROXY
-    if settings.HTTPS_PROXY:
-        proxies["https://"] = settings.HTTPS_PROXY
-
     try:
-        async with httpx.AsyncClient(proxies=proxies if proxies else None) as client:
-            headers = {"Accept": "application/json"} 
-            token_response = await client.post(
-                url=GITHUB_TOKEN_URL,
-                params=params,
-                headers=headers,
-            )
-            token_response.raise_for_status()
+        # 使用共享连接池（已包含代理配置）
+        client = http_clients.get(GITHUB_TOKEN_URL)
+        headers = {"Accept": "application/json"} 
+        token_response = await client.post(
+            url=GITHUB_TOKEN_URL,
+            params=params,
+            headers=headers,
+        )
+        token_response.raise_for_status()
 
     except httpx.RequestError as e:
         # 网络层面的错误 (DNS 解析失败、连接超时等)
@@ -190,6 +186,9 @@ async def logout(
     """处理用户退出登录，清除数据库中的 token 和浏览器中的 Cookie。"""
     logger.info("User requested logout. Clearing token from DB and cookie.")
     
+    # 使所有缓存的身份验证结果失效
+    identity_cache.invalidate()
+
     try:
         # 从数据库中清除 access_token
         settings_service.save_access_token(session=session, token=None)
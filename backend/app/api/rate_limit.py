@@ -0,0 +1,27 @@
+"""
+GitHub API 配额查询端点。
+返回进程内限流调度器记录的最新配额、暂停状态和并发信息，不会额外消耗 GitHub 配额。
+"""
+import logging
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import get_token_from_cookie
+from app.core.github_governor import github_governor
+from app.schemas import RateLimitResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/rate-limit",
+    tags=["RateLimit"],
+    # 只校验 Cookie，不调用 GitHub 验证身份，避免查询配额本身消耗配额
+    dependencies=[Depends(get_token_from_cookie)]
+)
+
+@router.get("", response_model=RateLimitResponse, summary="Get the remaining GitHub API budget")
+async def get_rate_limit():
+    """
+    获取 GitHub API 的剩余配额与调度状态。
+    数据来自最近一次 GitHub 响应的 X-RateLimit-* 头；服务启动后尚未访问过 GitHub 时 resources 为空。
+    """
+    return RateLimitResponse(**github_governor.snapshot())
@@ -14,6 +14,7 @@ from app.exceptions import ApiException
 from app.api.dependencies import get_token_from_cookie
 from app.api.users import get_current_github_user
 from app.core import settings_service
+from app.core.fast_json import FastJSONResponse
 from app.core.notifiers.factory import create_notifier
 from app.core.notifiers.base import Notifier
 from app.core.security import decrypt_data
@@ -71,7 +72,7 @@ class AppSettingsResponse(BaseModel):
     ai_model: Optional[str]
     ai_concurrency: int
 
-@router.get("", response_model=AppSettingsResponse, summary="Get application settings")
+@router.get("", response_model=AppSettingsResponse, summary="Get application settings", response_class=FastJSONResponse)
 async def get_settings(
     session: Session = Depends(get_session),
     _token: str = Depends(get_current_github_user),
@@ -4,22 +4,31 @@
 包括从本地数据库查询数据并生成筛选元数据，以及管理数据同步的完整流程。
 """
 import logging
-from typing import List, Set, Dict, Any, Optional
-from fastapi import APIRouter, Depends, status
+from typing import List, Set, Dict, Any, Optional, Literal
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from sqlalchemy.exc import OperationalError
 from sqlmodel import Session, select, SQLModel
 
-from app.db import get_session
-from app.models import Repo, AppSettings
+from app.db import get_session, get_data_version
+from app.models import Repo, AppSettings, RepoTombstone
 from app.core import settings_service
-from app.schemas import StarsResponse, RepoResponse, SyncResponse, RepoUpdateRequest
+from app.schemas import StarsResponse, RepoResponse, SyncResponse, RepoUpdateRequest, SearchResponse, StarsPageResponse, StarsChangesResponse, FacetsResponse
 from app.exceptions import ApiException
 from app.api.dependencies import get_token_from_cookie
 from app.api.users import get_current_github_user 
 from datetime import datetime
 import app.core.sync_service as sync_service
+from app.core import search_service, listing_service, fast_json
+from app.core.stars_cache import stars_payload_cache, etag_matches
+from app.core.fast_json import FastJSONResponse
+from app.core.listing_service import repo_row_to_dict, select_repo_rows
 
 logger = logging.getLogger(__name__)
 
+# 列表类接口的 view 参数：full 返回完整字段，compact 不返回备注和 AI 总结
+RepoView = Literal["full", "compact"]
+_VIEW_QUERY = Query("full", description="返回字段：full 为完整字段，compact 只包含列表和卡片视图需要的字段（不含 notes、ai_summary）")
+
 router = APIRouter(
     prefix="/api/stars",
     tags=["Stars"],
@@ -46,60 +55,56 @@ def _apply_custom_order(all_items: Set[str], order_list: List[str]) -> List[str]
     remaining_items_sorted = sorted(list(remaining_items_set))
     return ordered_items + remaining_items_sorted
 
+def _build_metadata(session: Session, facets: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    根据筛选项计数中实际使用的语言和标签生成用于前端筛选的元数据（语言列表、标签列表），
+    并按照用户的自定义排序设置进行排序。
+    """
+    # 获取用户的自定义排序设置
+    app_settings = settings_service.get_app_settings(session)
+    user_defined_tags_order = app_settings.tags_order
+    user_defined_languages_order = app_settings.languages_order
+
+    # 合并用户定义的排序和实际使用的项目（计数中的标签已排除内部标签 '_favorite'）
+    all_relevant_tags_set = set(user_defined_tags_order)
+    all_relevant_tags_set.update(facets["tags"])
+
+    all_relevant_languages_set = set(user_defined_languages_order)
+    all_relevant_languages_set.update(facets["languages"])
+
+    # 应用自定义排序
+    return {
+        "languages": _apply_custom_order(all_relevant_languages_set, user_defined_languages_order),
+        "tags": _apply_custom_order(all_relevant_tags_set, user_defined_tags_order),
+    }
+
 @router.get("", response_model=StarsResponse, summary="Get all starred repositories from local DB")
 async def get_all_stars(
     session: Session = Depends(get_session),
-    _github_user: dict = Depends(get_current_github_user) 
+    _github_user: dict = Depends(get_current_github_user),
+    if_none_match: Optional[str] = Header(None),
+    view: RepoView = _VIEW_QUERY,
 ):
     """
     从本地数据库获取当前用户的所有星标仓库信息。    
     同时生成用于前端筛选的元数据（语言列表、标签列表），这些元数据会根据用户的自定义排序设置进行排序。
+    序列化后的响应体按 (数据版本号, 自定义排序) 缓存，并带有强 ETag；客户端携带匹配的 If-None-Match 时返回 304。
     """
     try:
-        # 从数据库查询所有仓库记录
-        statement = select(Repo)
-        db_repos = session.exec(statement).all()
-
-        # 聚合实际使用的编程语言
-        actual_used_languages_set = set()
-        for repo in db_repos:
-            if repo.language:
-                actual_used_languages_set.add(repo.language)
-
-        # 聚合实际使用的标签（排除内部标签 '_favorite'）
-        actual_used_tags_set = set()
-        for repo in db_repos:
-            if repo.tags:
-                user_visible_tags = {tag for tag in repo.tags if tag != '_favorite'}
-                actual_used_tags_set.update(user_visible_tags)
-
-        # 获取用户的自定义排序设置
+        # 先读取数据版本号再查询仓库：两次读取之间发生的写入会在下次增量请求中重复返回，不会丢失
+        version = get_data_version(session)
         app_settings = settings_service.get_app_settings(session)
-        user_defined_tags_order = app_settings.tags_order
-        user_defined_languages_order = app_settings.languages_order
+        cache_key = (version, tuple(app_settings.tags_order), tuple(app_settings.languages_order))
 
-        # 合并用户定义的排序和实际使用的项目
-        all_relevant_tags_set = set(user_defined_tags_order)
-        all_relevant_tags_set.update(actual_used_tags_set)
-        
-        all_relevant_languages_set = set(user_defined_languages_order)
-        all_relevant_languages_set.update(actual_used_languages_set)
-
-        # 应用自定义排序
-        sorted_tags = _apply_custom_order(all_relevant_tags_set, user_defined_tags_order)
-        sorted_languages = _apply_custom_order(all_relevant_languages_set, user_defined_languages_order)
-
-        metadata = {
-            "languages": sorted_languages,
-            "tags": sorted_tags,
-        }
-
-        # 构建并返回响应
-        stars_as_dicts = [repo.model_dump() for repo in db_repos]
-        return StarsResponse(
-            stars=[RepoResponse.model_validate(repo_dict) for repo_dict in stars_as_dicts],
-            metadata=metadata
-        )
+        payload = stars_payload_cache.get(view, cache_key)
+        if payload is None:
+            # 从数据库查询所有仓库记录，直接把行转换为与 RepoResponse 结构一致的字典
+            stars = [repo_row_to_dict(row) for row in session.exec(select_repo_rows(compact=view == "compact")).all()]
+            metadata = _build_metadata(session, listing_service.get_facet_counts(session))
+
+            # 构建响应并缓存序列化结果
+            body = fast_json.dumps({"stars": stars, "metadata": metadata, "version": version})
+            payload = stars_payload_cache.store(view, cache_key, body)
 
     except Exception as e:
         logger.error(f"Failed to query stars from database: {e}", exc_info=True)
@@ -110,14 +115,125 @@ async def get_all_stars(
             message_en="An unknown error occurred while querying the database",
         )
 
+    # no-cache 要求浏览器每次都带 If-None-Match 重新验证，数据未变化时只需一个 304
+    headers = {"ETag": payload.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, payload.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+@router.get("/facets", response_model=FacetsResponse, summary="Get repository counts for every sidebar filter")
+async def get_star_facets(
+    session: Session = Depends(get_session),
+    _github_user: dict = Depends(get_current_github_user),
+):
+    """
+    返回侧边栏各筛选项的仓库数量：全部、特别关注、未分类，以及每个标签和语言的数量。
+    计数由数据库触发器增量维护，读取时不需要扫描仓库。
+    """
+    return FastJSONResponse(listing_service.get_facet_counts(session))
+
+@router.get("/changes", response_model=StarsChangesResponse, summary="Get repositories changed since a data version")
+async def get_star_changes(
+    since: int = Query(..., ge=0, description="客户端本地数据对应的版本号（/api/stars 或上一次增量响应中的 version）"),
+    view: RepoView = _VIEW_QUERY,
+    session: Session = Depends(get_session),
+    _github_user: dict = Depends(get_current_github_user),
+):
+    """
+    返回版本号 since 之后新增或修改的仓库，以及被删除的仓库 ID，客户端据此更新本地副本。
+    since 大于服务器当前版本号时（例如数据库被重建），返回 reset=true，客户端应重新获取完整列表。
+    """
+    try:
+        version = get_data_version(session)
+        if since > version:
+            logger.info(f"Change request since version {since} is ahead of the current version {version}, asking client to reset.")
+            return FastJSONResponse(StarsChangesResponse(version=version, reset=True).model_dump())
+
+        changed_repos = session.exec(select_repo_rows(compact=view == "compact").where(Repo.version > since)).all()
+        deleted_ids = session.exec(select(RepoTombstone.id).where(RepoTombstone.version > since)).all()
+        metadata = _build_metadata(session, listing_service.get_facet_counts(session))
+        return FastJSONResponse({
+            "version": version,
+            "reset": False,
+            "stars": [repo_row_to_dict(row) for row in changed_repos],
+            "deleted_ids": list(deleted_ids),
+            "metadata": metadata,
+        })
+    except Exception as e:
+        logger.error(f"Failed to query star changes since version {since}: {e}", exc_info=True)
+        raise ApiException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            code="DB_QUERY_FAILED",
+            message_zh="查询数据库时发生未知错误",
+            message_en="An unknown error occurred while querying the database",
+        )
+
+@router.get("/page", response_model=StarsPageResponse, summary="Get one page of starred repositories")
+async def get_stars_page(
+    filter_type: Literal["system", "tag", "language"] = Query("system", description="筛选类型，与侧边栏一致"),
+    filter_value: str = Query("all", description="筛选值：system 下为 all/constellation/untagged，其余为标签名或语言名"),
+    sort: Literal["starred_at", "pushed_at", "stargazers_count", "name"] = Query("starred_at", description="排序字段"),
+    limit: int = Query(100, ge=1, le=500, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="上一页响应中的 next_cursor，为空时返回第一页"),
+    view: RepoView = _VIEW_QUERY,
+    session: Session = Depends(get_session),
+    _github_user: dict = Depends(get_current_github_user),
+):
+    """
+    按筛选条件和排序方式分页获取星标仓库。
+    使用游标分页，首屏只需要一次小请求，响应大小与仓库总数无关。
+    """
+    try:
+        repos, next_cursor, total = listing_service.list_repos_page(
+            session, filter_type, filter_value, sort, limit=limit, cursor=cursor, compact=view == "compact"
+        )
+    except ApiException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to query stars page from database: {e}", exc_info=True)
+        raise ApiException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            code="DB_QUERY_FAILED",
+            message_zh="查询数据库时发生未知错误",
+            message_en="An unknown error occurred while querying the database",
+        )
+    return FastJSONResponse({"stars": repos, "next_cursor": next_cursor, "total": total})
+
+@router.get("/search", response_model=SearchResponse, summary="Full-text search over starred repositories")
+async def search_stars(
+    q: str = Query(..., min_length=1, max_length=200, description="搜索词，多个词之间为 AND 关系，每个词按前缀匹配"),
+    limit: int = Query(50, ge=1, le=1000, description="返回的最大结果数"),
+    offset: int = Query(0, ge=0, description="跳过的结果数"),
+    session: Session = Depends(get_session),
+    _github_user: dict = Depends(get_current_github_user),
+):
+    """
+    在名称、全名、别名、描述、备注、AI 总结和标签中搜索仓库。
+    结果按 bm25 相关性排序，并返回带 <mark> 高亮的命中片段。
+    """
+    try:
+        total, results = search_service.search_repos(session, q, limit=limit, offset=offset)
+    except OperationalError as e:
+        logger.error(f"Full-text search failed for query '{q}': {e}", exc_info=True)
+        raise ApiException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            code="SEARCH_UNAVAILABLE",
+            message_zh="全文搜索当前不可用",
+            message_en="Full-text search is currently unavailable",
+            details=str(e),
+        )
+    return FastJSONResponse({"query": q, "total": total, "results": results})
+
 @router.post("/sync", response_model=SyncResponse, summary="Sync stars from GitHub to local DB")
 async def sync_stars(
     session: Session = Depends(get_session),
     github_user: dict = Depends(get_current_github_user),
+    mode: Literal["full", "incremental"] = Query("full", description="同步模式：full 为完整同步，incremental 只拉取新收藏的仓库"),
 ):
     """
     触发从 GitHub 同步星标仓库到本地数据库。
         调用核心同步服务执行完整的数据同步流程，包括获取最新的仓库信息、对比本地数据库、处理新增/更新/删除的仓库。
+        mode=incremental 时只拉取比本地最新收藏更新的星标，不处理取消收藏和元数据刷新。
     """
     # 从数据库中获取 GitHub access token
     access_token = settings_service.get_access_token(session)
@@ -131,11 +247,12 @@ async def sync_stars(
         )
 
     user_login = github_user.get("login")
-    logger.info(f"API sync request received for user: {user_login}")
+    logger.info(f"API sync request received for user: {user_login}, mode: {mode}")
 
     try:
         # 调用核心同步服务执行数据同步，返回统计信息
-        stats, _ = await sync_service.run_full_sync(session=session, access_token=access_token)
+        sync_func = sync_service.run_full_sync if mode == "full" else sync_service.run_incremental_sync
+        stats, _ = await sync_func(session=session, access_token=access_token)
         
         # 同步成功后提交数据库事务
         session.commit()
@@ -160,6 +277,26 @@ async def sync_stars(
         # 重新抛出已知的 ApiException
         raise e
 
+@router.get("/{repo_id}", response_model=RepoResponse, summary="Get a single starred repository with all fields")
+async def get_repo_details(
+    repo_id: int,
+    session: Session = Depends(get_session),
+    _github_user: dict = Depends(get_current_github_user),
+):
+    """
+    获取单个仓库的完整信息，包括备注和 AI 总结。
+    前端使用 compact 视图加载列表，打开详情面板时再通过此接口获取长文本字段。
+    """
+    row = session.exec(select_repo_rows().where(Repo.id == repo_id)).first()
+    if row is None:
+        raise ApiException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            code="REPO_NOT_FOUND",
+            message_zh=f"ID 为 {repo_id} 的仓库不存在",
+            message_en=f"Repository with id {repo_id} not found"
+        )
+    return FastJSONResponse(repo_row_to_dict(row))
+
 @router.patch(
     "/{repo_id}",
     response_model=RepoResponse,
@@ -1,9 +1,9 @@
 """
 处理与 AI 总结相关的 API 端点
+总结任务保存在数据库中，由后台 worker（见 app.core.summary_jobs）执行，这里只负责创建任务和查询进度。
 """
 import logging
-import asyncio
-from fastapi import APIRouter, Depends, BackgroundTasks, status
+from fastapi import APIRouter, Depends, status
 from sqlmodel import Session
 from pydantic import BaseModel
 from typing import Optional
@@ -12,8 +12,9 @@ from app.db import get_session
 from app.exceptions import ApiException
 from app.api.dependencies import get_token_from_cookie
 from app.api.users import get_current_github_user
-from app.core.summary_service import get_repos_to_summarize, summarize_repos_batch
-from app.core import settings_service
+from app.core.summary_service import get_repos_to_summarize
+from app.core.summary_jobs import enqueue_summary_job, get_active_job, get_job_progress, summary_worker
+from app.core.fast_json import FastJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -35,24 +36,16 @@ class SummaryStartResponse(BaseModel):
 
 
 class SummaryStatusResponse(BaseModel):
-    """总结状态的响应体（可选，用于调试）"""
+    """总结状态的响应体"""
     is_running: bool
-    progress: Optional[dict] = None
-
-
-# 全局状态（简单实现，生产环境建议使用 Redis）
-_summary_status = {
-    "is_running": False,
-    "total": 0,
-    "completed": 0,
-    "failed": 0
-}
+    job_id: Optional[int] = None
+    mode: Optional[str] = None
+    progress: Optional[dict] = None  # total / completed / failed / pending / running，实时统计
 
 
 @router.post("/start", response_model=SummaryStartResponse, summary="Start AI summary task")
 async def start_summary(
     request: SummaryStartRequest,
-    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
     _token: str = Depends(get_current_github_user),
 ):
@@ -61,7 +54,6 @@ async def start_summary(
 
     Args:
         request: 请求体，包含总结模式
-        background_tasks: FastAPI 后台任务
         session: 数据库会话
         _token: 用户认证 token
 
@@ -79,7 +71,7 @@ async def start_summary(
             )
 
         # 检查是否已有任务在运行
-        if _summary_status["is_running"]:
+        if get_active_job(session) is not None:
             raise ApiException(
                 status_code=status.HTTP_409_CONFLICT,
                 code="TASK_ALREADY_RUNNING",
@@ -90,39 +82,28 @@ async def start_summary(
         # 获取需要总结的仓库
         repos, readme_cache = await get_repos_to_summarize(mode=request.mode)
 
-        if not repos:
+        job = enqueue_summary_job(session, request.mode, [repo.id for repo in repos])
+        if job is None:
             return SummaryStartResponse(
                 message="没有需要总结的仓库",
                 total=0
             )
+        session.commit()
 
-        # 获取应用设置
-        app_settings = settings_service.get_app_settings(session)
-
-        # 在后台启动总结任务
-        background_tasks.add_task(
-            _run_summary_task,
-            repos,
-            app_settings,
-            readme_cache
-        )
-
-        # 更新状态
-        _summary_status["is_running"] = True
-        _summary_status["total"] = len(repos)
-        _summary_status["completed"] = 0
-        _summary_status["failed"] = 0
+        # 唤醒后台 worker 执行任务
+        summary_worker.notify(job.id, readme_cache)
 
-        logger.info(f"总结任务已启动，模式：{request.mode}，共 {len(repos)} 个仓库")
+        logger.info(f"总结任务已启动，模式：{request.mode}，共 {job.total} 个仓库")
 
         return SummaryStartResponse(
             message="总结任务已启动",
-            total=len(repos)
+            total=job.total
         )
 
     except ApiException:
         raise
     except Exception as e:
+        session.rollback()
         logger.error(f"启动总结任务失败：{e}", exc_info=True)
         raise ApiException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -132,47 +113,23 @@ async def start_summary(
         )
 
 
-@router.get("/status", response_model=SummaryStatusResponse, summary="Get summary task status")
+@router.get("/status", response_model=SummaryStatusResponse, summary="Get summary task status", response_class=FastJSONResponse)
 async def get_summary_status(
+    session: Session = Depends(get_session),
     _token: str = Depends(get_current_github_user),
 ):
     """
-    查询总结任务状态（可选，用于调试）
+    查询总结任务状态，进度从任务表实时统计
 
     Returns:
         总结任务状态
     """
+    job = get_active_job(session)
+    if job is None:
+        return SummaryStatusResponse(is_running=False)
     return SummaryStatusResponse(
-        is_running=_summary_status["is_running"],
-        progress={
-            "total": _summary_status["total"],
-            "completed": _summary_status["completed"],
-            "failed": _summary_status["failed"]
-        } if _summary_status["is_running"] else None
+        is_running=True,
+        job_id=job.id,
+        mode=job.mode,
+        progress=get_job_progress(session, job)
     )
-
-
-async def _run_summary_task(repos, app_settings, readme_cache=None):
-    """
-    后台运行总结任务
-
-    Args:
-        repos: 需要总结的仓库列表
-        app_settings: 应用设置
-        readme_cache: 预取的 README 缓存
-    """
-    try:
-        result = await summarize_repos_batch(repos, app_settings, readme_cache)
-
-        # 更新状态
-        _summary_status["completed"] = result["success"]
-        _summary_status["failed"] = result["failed"]
-
-        logger.info(f"总结任务完成：成功 {result['success']}，失败 {result['failed']}")
-
-    except Exception as e:
-        logger.error(f"总结任务执行失败：{e}", exc_info=True)
-
-    finally:
-        # 重置运行状态
-        _summary_status["is_running"] = False
@@ -1,14 +1,15 @@
 """
 自定义标签管理的 API 端点。
-提供全局删除标签的功能，包括从用户的自定义排序中移除标签，以及从所有已标记该标签的仓库中移除该标签。
+提供全局删除、重命名标签的功能（同时维护用户的自定义排序），以及在多个仓库上批量添加、移除、重命名标签的功能。
 """
 import logging
 from fastapi import APIRouter, Depends, status, Path
 from sqlmodel import Session
 from urllib.parse import unquote
 
-from app.db import get_session
+from app.db import get_session, get_data_version
 from app.exceptions import ApiException
+from app.schemas import TagBulkRequest, TagBulkResponse, TagRenameRequest
 from app.api.dependencies import get_token_from_cookie
 from app.api.users import get_current_github_user
 from app.core import tags_service
@@ -60,3 +61,80 @@ def delete_tag(
     
     # 成功时返回 204 No Content，不需要响应体
     return
+
+@router.post(
+    "/bulk",
+    response_model=TagBulkResponse,
+    summary="Add, remove or rename a tag across many repositories"
+)
+def bulk_update_tags(
+    request: TagBulkRequest,
+    session: Session = Depends(get_session),
+):
+    """
+    在一个事务中批量修改多个仓库的标签。
+    目标仓库由 repo_ids 和/或 filter（与侧边栏筛选一致）确定，两者都提供时取交集；
+    移除和重命名未指定范围时作用于所有带有该标签的仓库。只修改仓库标签，不改变用户的自定义标签排序。
+    """
+    logger.info(f"API request received to bulk {request.action} tag '{request.tag}'.")
+    try:
+        updated = tags_service.bulk_update_tags(
+            session,
+            request.action,
+            request.tag,
+            new_tag_name=request.new_tag,
+            repo_ids=request.repo_ids,
+            filter_type=request.filter.type if request.filter else None,
+            filter_value=request.filter.value if request.filter else None,
+        )
+        session.commit()
+    except ApiException:
+        session.rollback()
+        raise
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Failed to bulk {request.action} tag '{request.tag}', transaction rolled back.", exc_info=True)
+        raise ApiException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            code="TAG_BULK_UPDATE_FAILED",
+            message_zh="批量修改分组时发生服务器内部错误",
+            message_en="An internal server error occurred while updating tags in bulk.",
+            details=str(e),
+        )
+    return TagBulkResponse(updated=updated, version=get_data_version(session))
+
+@router.patch(
+    "/{tag_name}",
+    response_model=TagBulkResponse,
+    summary="Rename a tag globally"
+)
+def rename_tag(
+    rename_request: TagRenameRequest,
+    session: Session = Depends(get_session),
+    tag_name: str = Path(..., description="要重命名的标签名称 (需要 URL 编码)")
+):
+    """
+    全局重命名指定的自定义标签，新名称已存在时两个标签合并。
+    1. 在用户的自定义标签排序中替换该标签。
+    2. 在所有已标记此标签的仓库上重命名该标签。
+    """
+    decoded_tag_name = unquote(tag_name)
+    logger.info(f"API request received to rename tag: '{decoded_tag_name}' -> '{rename_request.new_name}'")
+
+    try:
+        updated = tags_service.rename_tag_globally(session, decoded_tag_name, rename_request.new_name)
+        session.commit()
+        logger.info(f"Successfully renamed tag '{decoded_tag_name}' on {updated} repos and committed changes.")
+    except ApiException:
+        session.rollback()
+        raise
+    except Exception:
+        session.rollback()
+        logger.error(f"Failed to rename tag '{decoded_tag_name}', transaction rolled back.", exc_info=True)
+        raise ApiException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            code="TAG_RENAME_FAILED",
+            message_zh="重命名分组时发生服务器内部错误",
+            message_en="An internal server error occurred while renaming the tag."
+        )
+    return TagBulkResponse(updated=updated, version=get_data_version(session))
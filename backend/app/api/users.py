@@ -9,11 +9,13 @@ from fastapi import APIRouter, Depends, Response, status
 
 from sqlmodel import Session
 from app.db import get_session
-from app.config import settings
-from app.exceptions import ApiException
+from app.exceptions import ApiException, GitHubRateLimitError
 from app.schemas import UserResponse
 from app.api.dependencies import get_token_from_cookie 
 from app.core import settings_service
+from app.core.github_governor import github_governor
+from app.core.http_clients import http_clients
+from app.core.identity_cache import identity_cache
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +34,9 @@ async def get_current_github_user(
     """
     验证用户身份并返回 GitHub 用户信息。    
     1. 从数据库中获取存储的 access_token。
-    2. 使用 token 调用 GitHub API 获取用户信息。
-    3. 处理 token 过期或无效的情况，自动清理相关数据。
+    2. 身份缓存仍在有效期内时直接返回缓存的用户信息，不访问 GitHub。
+    3. 否则使用 token 调用 GitHub API 获取用户信息（有 ETag 时发起条件请求，304 表示身份仍然有效）。
+    4. 处理 token 过期或无效的情况，自动清理相关数据。
     返回:
         dict: GitHub API 返回的用户信息字典。
     异常:
@@ -53,38 +56,61 @@ async def get_current_github_user(
             message_en="Server session not found or expired, please log in again"
         )
     
+    cached_user = identity_cache.get_fresh(access_token)
+    if cached_user is not None:
+        return cached_user
+
     headers = {
         "Authorization": f"token {access_token}",
         "Accept": "application/vnd.github.v3+json",
     }
-    
-    # 配置代理设置（如果有配置的话）
-    proxies = {}
-    if settings.HTTP_PROXY:
-        proxies["http://"] = settings.HTTP_PROXY
-    if settings.HTTPS_PROXY:
-        proxies["https://"] = settings.HTTPS_PROXY
-    
+    etag = identity_cache.get_etag(access_token)
+    if etag:
+        headers["If-None-Match"] = etag
+
     try:
-        async with httpx.AsyncClient(proxies=proxies if proxies else None) as client:
-            api_response = await client.get(GITHUB_USER_API_URL, headers=headers)
+        # 使用共享连接池（已包含代理配置）
+        client = http_clients.get(GITHUB_USER_API_URL)
+        api_response = await github_governor.request(client, "GET", GITHUB_USER_API_URL, headers=headers)
             
-            if api_response.status_code == 401:
-                # token 无效或过期，清理 Cookie 和数据库中的 token
-                logger.warning(f"Invalid or expired GitHub token (from DB). Clearing cookie and DB token.")
-                response.delete_cookie("access_token")
-                settings_service.save_access_token(session, token=None)
-                session.commit()
-                raise ApiException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    code="AUTH_INVALID_TOKEN",
-                    message_zh="用户凭证无效或已过期，请重新登录",
-                    message_en="Invalid or expired token, please log in again"
-                )
+        if api_response.status_code == 304:
+            # 用户信息未变化，身份仍然有效
+            cached_user = identity_cache.revalidated(access_token)
+            if cached_user is not None:
+                return cached_user
+            # 缓存在请求期间被清除（例如并发的登出），不带 ETag 重新获取
+            headers.pop("If-None-Match", None)
+            api_response = await github_governor.request(client, "GET", GITHUB_USER_API_URL, headers=headers)
+
+        if api_response.status_code == 401:
+            # token 无效或过期，清理身份缓存、Cookie 和数据库中的 token
+            logger.warning(f"Invalid or expired GitHub token (from DB). Clearing cookie and DB token.")
+            identity_cache.invalidate(access_token)
+            response.delete_cookie("access_token")
+            settings_service.save_access_token(session, token=None)
+            session.commit()
+            raise ApiException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                code="AUTH_INVALID_TOKEN",
+                message_zh="用户凭证无效或已过期，请重新登录",
+                message_en="Invalid or expired token, please log in again"
+            )
             
-            api_response.raise_for_status()
-            return api_response.json()
+        api_response.raise_for_status()
+        github_user = api_response.json()
+        identity_cache.store(access_token, github_user, api_response.headers.get("etag"))
+        return github_user
 
+    except GitHubRateLimitError as e:
+        # GitHub 限流，暂停时间超过可等待的上限
+        logger.warning(f"GitHub rate limit reached while fetching user info: {e}")
+        raise ApiException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            code="GITHUB_RATE_LIMITED",
+            message_zh="GitHub API 调用次数已达上限，请稍后再试",
+            message_en="GitHub API rate limit reached, please try again later",
+            details=str(e)
+        )
     except httpx.RequestError as e:
         # 网络层面的错误
         logger.error(f"Network error while fetching user info from GitHub: {e}")
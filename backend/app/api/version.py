@@ -2,13 +2,13 @@
 专门用于处理版本检查和更新通知的 API 端点。
 包含每日缓存机制以避免频繁请求。支持版本比较和更新提醒功能。
 """
-import httpx
 import re
 import logging
 from fastapi import APIRouter
 from datetime import datetime, date, timedelta
 
 from app.version import __version__ as CURRENT_VERSION
+from app.core.http_clients import http_clients
 
 router = APIRouter(prefix="/api/version", tags=["Version"])
 logger = logging.getLogger(__name__)
@@ -37,9 +37,9 @@ class VersionChecker:
         if date.today() != self._last_check_date:
             logger.info(f"New day ({date.today()}). Performing version check from {GITHUB_VERSION_URL}")
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(GITHUB_VERSION_URL, timeout=10.0)
-                    response.raise_for_status()
+                client = http_clients.get(GITHUB_VERSION_URL, use_proxy=False)
+                response = await client.get(GITHUB_VERSION_URL, timeout=10.0)
+                response.raise_for_status()
 
                 content = response.text
                 # 使用正则表达式从版本文件中提取版本号
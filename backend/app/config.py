@@ -16,6 +16,21 @@ class Settings(BaseSettings):
     # 数据库文件的路径
     DATABASE_URL: str = "sqlite:////data/stargazer.db"
 
+    # SQLite 连接参数，每个新连接建立时通过 PRAGMA 设置；设为空字符串表示不设置该项，使用 SQLite 默认值。
+    # WAL 模式下后台同步的写事务不会阻塞界面的读请求，synchronous=NORMAL 在 WAL 下仍能保证数据库不损坏。
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: str = "268435456"     # 内存映射读取的字节数上限（256 MB）
+    SQLITE_CACHE_SIZE: str = "-65536"       # 页缓存大小，负数表示 KiB（64 MB）
+    SQLITE_TEMP_STORE: str = "MEMORY"       # 临时表和排序使用内存
+    SQLITE_BUSY_TIMEOUT_MS: str = "10000"   # 数据库被锁定时等待的毫秒数，超过后才报错
+
+    # 全文搜索索引的分词模式：
+    # - "ngram": 中日韩文字按相邻两字切分（bigram）后建立索引，支持中文子串搜索；其他文字按单词索引
+    # - "unicode61": 只按空白和标点切分单词，连续的中文会被当作一个整体
+    # 修改后在下次启动时自动重建索引。
+    SEARCH_TOKENIZER: str = "ngram"
+
     # 调试模式开关，在生产环境中应设为 False
     DEBUG: bool = False
 
@@ -28,6 +43,36 @@ class Settings(BaseSettings):
     # 匿名遥测开关
     DISABLE_TELEMETRY: bool = False
 
+    # 后台同步中完整同步的频率：每 N 次后台同步执行一次完整同步，其余为只拉取新星标的增量同步。
+    # 设为 1 表示每次都执行完整同步。
+    FULL_SYNC_EVERY_N_RUNS: int = 3
+
+    # 同步星标使用的 GitHub 接口："rest"（默认，支持 ETag 分页缓存）或 "graphql"（只请求所需字段，传输量更小）
+    GITHUB_SYNC_BACKEND: str = "rest"
+
+    # 同时进行的 GitHub API 请求数上限（配额不足时会自动降低）
+    GITHUB_MAX_CONCURRENCY: int = 8
+
+    # 完整同步时并发请求星标分页的窗口大小
+    GITHUB_PAGE_CONCURRENCY: int = 4
+
+    # GitHub 身份验证结果的缓存时间（秒）。有效期内受保护的接口不再访问 GitHub 验证 token，
+    # 过期后通过 ETag 条件请求重新验证。设为 0 表示每次请求都重新验证。
+    IDENTITY_CACHE_TTL_SECONDS: int = 300
+
+    # AI 总结接口的调用速率上限：每分钟请求数和每分钟 token 数（按提示词长度估算，响应后按实际用量校正）。
+    # 设为 0 表示不限制。触发 429 限流时所有请求一起暂停（优先使用 Retry-After），并临时降低速率，之后逐步恢复。
+    AI_REQUESTS_PER_MINUTE: int = 60
+    AI_TOKENS_PER_MINUTE: int = 0
+
+    # AI 总结时同时预取 README 的数量。README 获取与 AI 调用分两个阶段并行进行，
+    # 预取结果放入有界队列（容量为两个阶段并发数之和的两倍）等待 AI 处理。
+    SUMMARY_README_CONCURRENCY: int = 4
+
+    # 对外 HTTP 连接池：每个目标地址保持的最大连接数，以及是否启用 HTTP/2（需要安装 h2）
+    HTTP_POOL_MAX_CONNECTIONS: int = 20
+    HTTP2_ENABLED: bool = False
+
     # 网络代理配置 (可选)
     HTTP_PROXY: Optional[str] = None
     HTTPS_PROXY: Optional[str] = None
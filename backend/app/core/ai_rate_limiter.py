@@ -0,0 +1,137 @@
+"""
+AI 接口调用速率限制器。
+AI 服务商通常同时限制每分钟请求数（RPM）和每分钟 token 数（TPM）。限制器为二者各维护一个令牌桶：
+1. 每次调用前按估算的 token 数同时从两个桶中取出额度，额度不足时等待补充，调用完成后按实际用量校正。
+2. 触发 429 限流时，所有调用方一起暂停（优先使用 Retry-After，否则按连续限流次数指数退避），
+   并把速率临时减半；之后每次成功调用逐步恢复，直到配置的上限。
+同一个 AI 接口地址在进程内共享一个限制器，总结任务的各个并发 worker 都通过它控制速率。
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 未提供 Retry-After 时，第 n 次连续限流的暂停秒数（超出列表长度时使用最后一项）
+DEFAULT_BACKOFF_SECONDS = (30, 60, 120)
+# 限流时速率乘以 RATE_DECREASE_FACTOR，每次成功调用加回 RATE_RECOVERY_STEP，速率不低于上限的 MIN_RATE_FACTOR
+RATE_DECREASE_FACTOR = 0.5
+RATE_RECOVERY_STEP = 0.05
+MIN_RATE_FACTOR = 0.1
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本的 token 数：中日韩等宽字符按每字 1 个，其余按每 4 个字符 1 个。"""
+    wide = sum(1 for char in text if ord(char) >= 0x2E80)
+    return wide + (len(text) - wide) // 4 + 1
+
+
+class _TokenBucket:
+    """容量为每分钟上限、按秒连续补充的令牌桶。limit 为 0 表示不限制。"""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = max(0, per_minute)
+        self.available = float(self.per_minute)
+        self._updated = time.monotonic()
+
+    def refill(self, rate_factor: float):
+        """按经过的时间补充额度，速率为上限乘以 rate_factor。"""
+        now = time.monotonic()
+        if self.per_minute:
+            self.available = min(
+                float(self.per_minute), self.available + (now - self._updated) * self.per_minute * rate_factor / 60
+            )
+        self._updated = now
+
+    def wait_time(self, amount: float, rate_factor: float) -> float:
+        """取出 amount 额度还需要等待的秒数，单次需求超过容量时按装满计算。"""
+        if not self.per_minute:
+            return 0.0
+        missing = min(amount, self.per_minute) - self.available
+        return max(0.0, missing * 60 / (self.per_minute * rate_factor))
+
+    def take(self, amount: float):
+        """取出 amount 额度，amount 为负数时退回额度（不超过容量）。"""
+        if self.per_minute:
+            self.available = min(float(self.per_minute), self.available - amount)
+
+
+class AIRateLimiter:
+    """按 RPM 和 TPM 限制 AI 调用速率，并在限流时自适应退避。"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+        self._rate_factor = 1.0
+        self._paused_until = 0.0
+        self._consecutive_limits = 0
+        # 串行发放额度，保证等待的调用方按先后顺序获得额度
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int):
+        """为一次调用取出 1 个请求额度和 tokens 个 token 额度，处于暂停期或额度不足时等待。"""
+        async with self._lock:
+            while True:
+                pause_left = self._paused_until - time.monotonic()
+                if pause_left > 0:
+                    await asyncio.sleep(pause_left)
+                    continue
+                self._requests.refill(self._rate_factor)
+                self._tokens.refill(self._rate_factor)
+                wait = max(
+                    self._requests.wait_time(1, self._rate_factor),
+                    self._tokens.wait_time(tokens, self._rate_factor),
+                )
+                if wait <= 0:
+                    self._requests.take(1)
+                    self._tokens.take(tokens)
+                    return
+                await asyncio.sleep(wait)
+
+    def settle(self, reserved_tokens: int, used_tokens: Optional[int]):
+        """调用完成后按实际 token 用量校正预估值（多退少补），用量未知时保持预估值。"""
+        if used_tokens is not None:
+            self._tokens.take(used_tokens - reserved_tokens)
+
+    def on_success(self):
+        """记录一次成功调用：清除连续限流计数，逐步恢复速率。"""
+        self._consecutive_limits = 0
+        if self._rate_factor < 1.0:
+            self._rate_factor = min(1.0, self._rate_factor + RATE_RECOVERY_STEP)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """
+        记录一次 429 限流：所有调用方暂停，速率减半。
+        返回:
+            本次暂停的秒数。
+        """
+        self._consecutive_limits += 1
+        if retry_after is None:
+            retry_after = DEFAULT_BACKOFF_SECONDS[min(self._consecutive_limits, len(DEFAULT_BACKOFF_SECONDS)) - 1]
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self._rate_factor = max(MIN_RATE_FACTOR, self._rate_factor * RATE_DECREASE_FACTOR)
+        logger.warning(
+            f"AI API rate limited, pausing all AI requests for {retry_after:.1f}s "
+            f"and reducing the rate to {self._rate_factor:.0%} of the limit."
+        )
+        return retry_after
+
+
+# 每个 AI 接口地址共享一个限制器
+_limiters: Dict[str, AIRateLimiter] = {}
+
+
+def get_ai_rate_limiter(base_url: str) -> AIRateLimiter:
+    """返回指定 AI 接口地址的进程级限制器，首次使用时按配置创建。"""
+    limiter = _limiters.get(base_url)
+    if limiter is None:
+        limiter = AIRateLimiter(settings.AI_REQUESTS_PER_MINUTE, settings.AI_TOKENS_PER_MINUTE)
+        _limiters[base_url] = limiter
+        logger.info(
+            f"AI rate limiter for {base_url}: {settings.AI_REQUESTS_PER_MINUTE or 'unlimited'} requests/min, "
+            f"{settings.AI_TOKENS_PER_MINUTE or 'unlimited'} tokens/min."
+        )
+    return limiter
@@ -1,16 +1,20 @@
 """
 AI 服务模块：负责调用 AI API 进行仓库总结
 
-支持连接池复用（通过 async with 上下文管理器）和多语言提示词。
+通过进程级共享的 HTTP 连接池复用连接，支持多语言提示词。
+每次调用都经过该接口地址共享的速率限制器（见 ai_rate_limiter），限流时由限制器统一暂停和降速。
 提示词模板从 locales/ 目录的 JSON 文件加载，遵循项目统一的 i18n 机制。
 """
 import json
 import httpx
-import asyncio
 import logging
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from app.core.ai_rate_limiter import AIRateLimiter, estimate_tokens, get_ai_rate_limiter
+from app.core.http_clients import http_clients
 from app.exceptions import (
     InvalidApiKeyError, RateLimitError, ApiEndpointError,
     NetworkTimeoutError, EmptyContentError,
@@ -50,10 +54,42 @@ def get_prompt_template(language: str) -> str:
     return _PROMPT_CACHE.get(language, _PROMPT_CACHE.get("zh", ""))
 
 
+# 预估一次总结的输出 token 数（总结最多保存 400 字符），用于在调用前预留 TPM 额度
+SUMMARY_OUTPUT_TOKENS_ESTIMATE = 512
+
+
+def _parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """解析 429 响应的 Retry-After（秒数或 HTTP 日期）以及部分服务商使用的 retry-after-ms 头。"""
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+    retry_after = response.headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
 class AIService:
     """AI 服务类：封装 AI API 调用逻辑，支持连接池复用"""
 
-    def __init__(self, base_url: str, api_key: str, model: str, language: str = "zh"):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        model: str,
+        language: str = "zh",
+        rate_limiter: Optional[AIRateLimiter] = None
+    ):
         """
         初始化 AI 服务
 
@@ -62,6 +98,7 @@ class AIService:
             api_key: API 密钥
             model: 模型名称
             language: 提示词语言（"zh" 或 "en"），默认中文
+            rate_limiter: 速率限制器，默认使用该接口地址共享的限制器
         """
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
@@ -69,26 +106,19 @@ class AIService:
         self.language = language
         self.temperature = 0.3
         self.max_tokens = 4096
-        self._client: Optional[httpx.AsyncClient] = None
+        self.rate_limiter = rate_limiter or get_ai_rate_limiter(self.base_url)
 
     async def __aenter__(self):
-        """创建连接池"""
-        self._client = httpx.AsyncClient(timeout=30.0)
+        """保留上下文管理器接口，连接池由共享注册表管理"""
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """关闭连接池"""
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        """连接池由应用关闭时统一释放，这里无需处理"""
+        return None
 
     def _get_client(self) -> httpx.AsyncClient:
-        """获取 HTTP 客户端，未通过上下文管理器使用时自动创建临时客户端"""
-        if self._client:
-            return self._client
-        # 兼容不使用 async with 的场景（如单次调用）
-        self._client = httpx.AsyncClient(timeout=30.0)
-        return self._client
+        """获取指向 AI API 地址的共享 HTTP 客户端"""
+        return http_clients.get(self.base_url, use_proxy=False)
 
     async def summarize_repository(
         self,
@@ -163,13 +193,20 @@ class AIService:
             "max_tokens": self.max_tokens
         }
 
-        client = self._get_client()
+        # 按提示词长度和预估的输出长度预留 TPM 额度，响应后按 usage 校正
+        reserved_tokens = estimate_tokens(prompt) + SUMMARY_OUTPUT_TOKENS_ESTIMATE
+        await self.rate_limiter.acquire(reserved_tokens)
+        used_tokens = None
+
         try:
-            response = await client.post(url, json=payload, headers=headers)
+            client = self._get_client()
+            response = await client.post(url, json=payload, headers=headers, timeout=30.0)
             response.raise_for_status()
 
             data = response.json()
             logger.info(f"AI API 原始响应：{data}")
+            used_tokens = (data.get("usage") or {}).get("total_tokens")
+            self.rate_limiter.on_success()
             content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
 
             if not content:
@@ -181,7 +218,7 @@ class AIService:
             if e.response.status_code == 401:
                 raise InvalidApiKeyError(f"HTTP 401: {e.response.text[:200]}")
             elif e.response.status_code == 429:
-                raise RateLimitError(f"HTTP 429: {e.response.text[:200]}")
+                raise RateLimitError(f"HTTP 429: {e.response.text[:200]}", retry_after=_parse_retry_after(e.response))
             elif e.response.status_code in [500, 502, 503, 504]:
                 raise ApiEndpointError(f"HTTP {e.response.status_code}")
             else:
@@ -201,6 +238,9 @@ class AIService:
         except Exception as e:
             raise ApiEndpointError(f"未知错误：{str(e)}")
 
+        finally:
+            self.rate_limiter.settle(reserved_tokens, used_tokens)
+
     async def handle_rate_limit_with_retry(
         self,
         full_name: str,
@@ -208,6 +248,7 @@ class AIService:
     ) -> Optional[str]:
         """
         处理限流并重试
+        限流时由速率限制器暂停所有调用方并降低速率（优先使用 Retry-After），暂停结束后重试。
 
         Args:
             full_name: 仓库全名
@@ -216,20 +257,20 @@ class AIService:
         Returns:
             AI 生成的总结文本，失败返回 None
         """
-        retry_delays = [30, 60, 120]
+        max_attempts = 3
 
-        for attempt, delay in enumerate(retry_delays, start=1):
+        for attempt in range(1, max_attempts + 1):
             try:
                 return await self.summarize_repository(full_name, readme_content)
 
-            except RateLimitError:
-                if attempt < len(retry_delays):
+            except RateLimitError as e:
+                delay = self.rate_limiter.on_rate_limited(e.retry_after)
+                if attempt < max_attempts:
                     logger.warning(
-                        f"API 限流，等待 {delay} 秒后重试（第 {attempt} 次）：{full_name}"
+                        f"API 限流，等待 {delay:.0f} 秒后重试（第 {attempt} 次）：{full_name}"
                     )
-                    await asyncio.sleep(delay)
                 else:
-                    logger.error(f"重试 {len(retry_delays)} 次后仍限流：{full_name}")
+                    logger.error(f"重试 {max_attempts} 次后仍限流：{full_name}")
                     return None
 
         return None
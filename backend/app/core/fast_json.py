@@ -0,0 +1,47 @@
+"""
+大响应体的快速 JSON 序列化。
+安装了 orjson 时使用 orjson 编码（原生支持 datetime，速度约为标准库的数倍），否则回退到标准库 json。
+仓库列表等大接口直接从查询得到的行构建字典并编码，不经过 Pydantic 模型的校验和转换。
+"""
+import json
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # orjson 是可选依赖
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def _default(value: Any) -> Any:
+    """标准库 json 无法直接编码的类型，输出格式与 Pydantic 和 orjson (OPT_UTC_Z) 一致。"""
+    if isinstance(value, datetime) and value.utcoffset() == timedelta(0):
+        return value.replace(tzinfo=None).isoformat() + "Z"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """把 content 编码为 UTF-8 JSON 字节。"""
+    if orjson is not None:
+        # UTC 时间以 Z 结尾，与 Pydantic 的输出保持一致
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """使用 dumps 编码的 JSONResponse，可作为路由的 response_class，也可以直接返回。"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+logger.debug(f"Fast JSON serializer: {'orjson' if HAS_ORJSON else 'json (orjson not installed)'}")
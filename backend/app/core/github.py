@@ -1,17 +1,23 @@
 """
 GitHub API 客户端封装。
 封装所有与 GitHub API 的直接交互，提供智能重试机制、网络代理支持和并发数据获取功能。
-支持获取用户的所有星标仓库，包含分页处理和错误恢复能力。
+支持以流式方式获取用户的所有星标仓库，包含分页处理、ETag 条件请求和错误恢复能力。
 """
 import httpx
 import asyncio
+import hashlib
+import json
 import re
+import time
 import logging
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, Callable, List, Dict, Any, NamedTuple, Optional, Set
 import backoff
 
 from app.config import settings
-from app.exceptions import ApiException
+from app.exceptions import ApiException, GitHubRateLimitError
+from app.core.github_governor import github_governor
+from app.core.http_clients import http_clients
+from app.core.identity_cache import identity_cache
 from fastapi import status
 
 logger = logging.getLogger(__name__)
@@ -20,6 +26,31 @@ GITHUB_API_BASE_URL = "https://api.github.com"
 STARS_PER_PAGE = 100
 MAX_RETRIES = 3
 
+# GraphQL 查询：只请求 Repo 模型实际存储的 11 个字段，按收藏时间倒序进行游标分页
+STARRED_REPOS_GRAPHQL_QUERY = """
+query($first: Int!, $after: String) {
+  viewer {
+    starredRepositories(first: $first, after: $after, orderBy: {field: STARRED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      edges {
+        starredAt
+        node {
+          databaseId
+          name
+          nameWithOwner
+          owner { login avatarUrl }
+          url
+          description
+          primaryLanguage { name }
+          stargazerCount
+          pushedAt
+        }
+      }
+    }
+  }
+}
+"""
+
 def _is_recoverable_error(e: Exception) -> bool:
     """
     判断异常是否可恢复（适合重试）。    
@@ -43,50 +74,121 @@ retry_on_server_error = backoff.on_exception(
     giveup=lambda e: not _is_recoverable_error(e)
 )
 
+class StarRecord(NamedTuple):
+    """一个星标仓库的精简记录，只包含 Repo 模型从 GitHub 同步的字段。"""
+    id: int
+    name: str
+    full_name: str
+    owner_login: str
+    owner_avatar_url: str
+    html_url: str
+    description: Optional[str]
+    language: Optional[str]
+    stargazers_count: int
+    pushed_at: str
+    starred_at: str
+
+
+class StarPage(NamedTuple):
+    """流式获取过程中产出的一页星标数据。"""
+    page: int
+    records: List[StarRecord]
+    # 内容与上次同步时一致（304、内容哈希一致或回退到旧缓存），其中的仓库无需比对字段
+    unchanged: bool
+    # 需要写回分页缓存的 {"etag", "body_hash"}，为 None 表示该页无需回写
+    cache_entry: Optional[Dict[str, Any]]
+
+
+# 根据页码读取该页缓存的星标记录，缓存不存在时返回 None
+CachedPageLoader = Callable[[int], Optional[List[StarRecord]]]
+
+
+def _hash_page_items(records: List[StarRecord]) -> str:
+    """计算清理后页面数据的稳定哈希，用于判断页面内容是否发生变化。"""
+    payload = json.dumps(records, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
 class GitHubApiClient:
     """
     GitHub API 客户端，内置并发、分页、智能重试和代理支持。
     提供获取用户星标仓库的功能，自动处理 GitHub API 的分页机制，并在网络错误或服务器错误时自动重试。
+    如果传入了页面缓存，分页请求会携带 If-None-Match 头，GitHub 返回 304 时通过 load_cached_page 读取缓存数据。
     """
-    def __init__(self, token: str):
+    # 是否支持基于 ETag 的分页缓存（GraphQL 后端使用 POST 请求，不支持）
+    uses_page_cache = True
+    # 遇到 GitHub 限流时最长等待共同暂停结束的秒数，超过则放弃本次同步
+    rate_limit_max_wait = 300.0
+
+    def __init__(
+        self,
+        token: str,
+        page_cache: Optional[Dict[int, Dict[str, Any]]] = None,
+        load_cached_page: Optional[CachedPageLoader] = None
+    ):
         """
         初始化 GitHub API 客户端。
+        参数:
+            token: GitHub access token。
+            page_cache: 可选的页面缓存元数据，键为页码，值为包含 etag、body_hash 的字典。
+                        获取过程中会被原地更新，调用方根据 StarPage.cache_entry 负责持久化。
+            load_cached_page: 按页码读取缓存星标记录的回调，只在 GitHub 返回 304 或回退到旧缓存时调用，
+                              避免把所有页面的数据常驻内存。未提供时不发起条件请求。
         """
         self._token = token
-        
-        # 配置网络代理（如果有设置的话）
-        proxies = {}
-        if settings.HTTP_PROXY:
-            proxies["http://"] = settings.HTTP_PROXY
-        if settings.HTTPS_PROXY:
-            proxies["https://"] = settings.HTTPS_PROXY
-
-        self.client = httpx.AsyncClient(
-            base_url=GITHUB_API_BASE_URL,
-            headers={
-                "Authorization": f"token {self._token}",
-                "Accept": "application/vnd.github.star+json",
-            },
-            timeout=30.0,
-            proxies=proxies if proxies else None
-        )
-        if proxies:
-            logger.info(f"GitHubApiClient is configured to use proxies: {proxies}")
+
+        # --- 页面条件请求相关状态 ---
+        self.page_cache: Dict[int, Dict[str, Any]] = page_cache if page_cache is not None else {}
+        self.load_cached_page = load_cached_page
+        self.page_cache_hits = 0     # GitHub 返回 304 的页数
+        self.page_cache_misses = 0   # GitHub 返回完整页面数据的页数
+        self.total_pages = 0
+
+        # --- 分页并发获取相关状态 ---
+        self.page_concurrency = max(1, settings.GITHUB_PAGE_CONCURRENCY)
+        self.page_latencies_ms: Dict[int, float] = {}  # 每页成功请求的耗时（毫秒）
+        self.stale_pages: Set[int] = set()   # 重试用尽后回退到旧缓存数据的页码
+        self.failed_pages: Set[int] = set()  # 重试用尽且没有缓存可用的页码
+
+        # 使用进程级共享的连接池（已包含代理配置），认证信息随每个请求发送
+        self.client = http_clients.get(GITHUB_API_BASE_URL)
+        self._default_headers = {
+            "Authorization": f"token {self._token}",
+            "Accept": "application/vnd.github.star+json",
+        }
 
     @retry_on_server_error
     async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
         """
         统一的 HTTP 请求方法，带有自动重试机制。
         对于 4xx 客户端错误不会重试，对于 5xx 服务器错误会自动重试。
+        所有请求都经过全局的 github_governor，共享限流状态和并发控制。
         """
-        response = await self.client.request(method, url, **kwargs)
+        kwargs["headers"] = {**self._default_headers, **(kwargs.get("headers") or {})}
+        try:
+            response = await github_governor.request(
+                self.client, method, url, max_wait=self.rate_limit_max_wait, **kwargs
+            )
+        except GitHubRateLimitError as e:
+            raise ApiException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                code="GITHUB_RATE_LIMITED",
+                message_zh="GitHub API 调用次数已达上限，请稍后再试",
+                message_en="GitHub API rate limit reached, please try again later",
+                details=str(e)
+            )
+
+        # 304 Not Modified 是条件请求的正常结果，交由调用方处理
+        if response.status_code == 304:
+            return response
 
         if 400 <= response.status_code < 500:
             if response.status_code == 401:
+                # token 已失效，同时清除该 token 的身份缓存
+                identity_cache.invalidate(self._token)
                 raise ApiException(
-                    status_code=status.HTTP_401_UNAUTHORIZED, 
-                    code="AUTH_INVALID_TOKEN", 
-                    message_zh="GitHub Token 无效或已过期", 
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    code="AUTH_INVALID_TOKEN",
+                    message_zh="GitHub Token 无效或已过期",
                     message_en="Invalid or expired GitHub token"
                 )
             # 对于其他 4xx 错误直接抛出，不重试
@@ -98,7 +200,7 @@ class GitHubApiClient:
 
     async def _get_total_pages(self) -> int:
         """
-        通过 HEAD 请求探测星标仓库的总页数。        
+        通过 HEAD 请求探测星标仓库的总页数。
         利用 GitHub API 的 Link header 来确定分页信息。
         """
         try:
@@ -108,76 +210,207 @@ class GitHubApiClient:
         except Exception as e:
             logger.error(f"Failed to probe total pages from GitHub after all retries: {e}", exc_info=True)
             raise ApiException(
-                status_code=status.HTTP_502_BAD_GATEWAY, 
-                code="GITHUB_API_PROBE_FAILED", 
-                message_zh="探测 GitHub API 失败", 
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                code="GITHUB_API_PROBE_FAILED",
+                message_zh="探测 GitHub API 失败",
                 message_en="Failed to probe GitHub API"
             )
 
         link_header = response.headers.get("link")
         if not link_header:
             return 1
-        
+
         # 从 Link header 中提取最后一页的页码
         last_page_match = re.search(r'page=(\d+)>; rel="last"', link_header)
         return int(last_page_match.group(1)) if last_page_match else 1
 
-    async def _get_stars_by_page(self, page: int) -> List[Dict[str, Any]]:
-        """获取指定页码的星标仓库列表。"""
-        response = await self._request("GET", "/user/starred", params={"per_page": STARS_PER_PAGE, "page": page})
-        return response.json()
+    @staticmethod
+    def _clean_star_items(raw_items: List[Dict[str, Any]]) -> List[StarRecord]:
+        """将 GitHub 返回的原始星标条目清理为只包含 Repo 模型所需字段的 StarRecord 列表。"""
+        cleaned_stars = []
+        for item in raw_items:
+            repo_data = item.get("repo", {})
+            if not repo_data or not repo_data.get('id'):
+                logger.warning(f"Skipping an item because it has no repo_data or repo_data['id']. Item: {item}")
+                continue
+            owner = repo_data.get("owner", {})
+            cleaned_stars.append(StarRecord(
+                id=repo_data.get("id"),
+                name=repo_data.get("name"),
+                full_name=repo_data.get("full_name"),
+                owner_login=owner.get("login"),
+                owner_avatar_url=owner.get("avatar_url"),
+                html_url=repo_data.get("html_url"),
+                description=repo_data.get("description"),
+                language=repo_data.get("language"),
+                stargazers_count=repo_data.get("stargazers_count"),
+                pushed_at=repo_data.get("pushed_at"),
+                starred_at=item.get("starred_at"),
+            ))
+        return cleaned_stars
+
+    def _load_cached_records(self, page: int) -> Optional[List[StarRecord]]:
+        """读取指定页码的缓存星标记录，没有缓存或未提供读取回调时返回 None。"""
+        if not self.load_cached_page or page not in self.page_cache:
+            return None
+        return self.load_cached_page(page)
 
-    async def get_all_starred_repos(self) -> List[Dict[str, Any]]:
+    async def _get_stars_by_page(self, page: int) -> StarPage:
         """
-        并发获取用户所有星标的仓库。        
-        自动处理分页，使用 asyncio.gather 并发请求所有页面以提高效率。
-        返回清理后的仓库数据列表。
+        获取指定页码的星标仓库（已清理）。
+        如果该页有缓存的 ETag，则发起条件请求；GitHub 返回 304 时读取缓存数据，
+        缓存数据已丢失时重新发起不带条件的请求。
+        """
+        cached = self.page_cache.get(page)
+        headers = {}
+        if cached and cached.get("etag") and self.load_cached_page:
+            headers["If-None-Match"] = cached["etag"]
+
+        response = await self._request(
+            "GET", "/user/starred",
+            params={"per_page": STARS_PER_PAGE, "page": page},
+            headers=headers
+        )
+
+        if response.status_code == 304:
+            records = self._load_cached_records(page)
+            if records is not None:
+                self.page_cache_hits += 1
+                return StarPage(page=page, records=records, unchanged=True, cache_entry=None)
+            logger.warning(f"Page {page} was not modified but its cached data is missing, refetching without ETag.")
+            response = await self._request(
+                "GET", "/user/starred",
+                params={"per_page": STARS_PER_PAGE, "page": page}
+            )
+
+        self.page_cache_misses += 1
+        raw_items = response.json()
+        if raw_items and 'repo' not in raw_items[0]:
+            logger.error(f"_get_stars_by_page: 'repo' key not found in first item of page {page}. Item keys: {raw_items[0].keys()}")
+        records = self._clean_star_items(raw_items)
+        body_hash = _hash_page_items(records)
+
+        # ETag 变化但清理后的内容未变（例如只有我们不关心的字段变了），仍视为未变化
+        unchanged = bool(cached and cached.get("body_hash") == body_hash)
+
+        cache_entry = {"etag": response.headers.get("etag"), "body_hash": body_hash}
+        self.page_cache[page] = cache_entry
+        return StarPage(page=page, records=records, unchanged=unchanged, cache_entry=cache_entry)
+
+    async def _fetch_page_with_retry(self, page: int) -> StarPage:
+        """
+        获取单个分页，失败时只影响该页，不影响其他页面。
+        重试只由 _request 的 backoff 负责（最多 MAX_RETRIES 次），这里不再叠加一层重试。
+        仍然失败时优先回退到该页的旧缓存数据；没有缓存时记录为失败页并返回空页。
+        认证失败和限流属于全局性错误，直接向上抛出。
+        """
+        started = time.perf_counter()
+        try:
+            star_page = await self._get_stars_by_page(page)
+        except ApiException as e:
+            if e.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_429_TOO_MANY_REQUESTS):
+                raise
+            error = e
+        except Exception as e:
+            error = e
+        else:
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.page_latencies_ms[page] = latency_ms
+            logger.debug(f"Fetched starred page {page} in {latency_ms:.0f} ms.")
+            return star_page
+
+        records = self._load_cached_records(page)
+        if records is not None:
+            logger.error(f"Giving up on starred page {page}, using stale cached data: {error}")
+            self.stale_pages.add(page)
+            # 旧缓存数据不代表最新状态，视为未变化以免回写旧值
+            return StarPage(page=page, records=records, unchanged=True, cache_entry=None)
+
+        logger.error(f"Giving up on starred page {page}, no cached data available: {error}")
+        self.failed_pages.add(page)
+        return StarPage(page=page, records=[], unchanged=False, cache_entry=None)
+
+    @property
+    def is_complete(self) -> bool:
+        """本次获取是否拿到了所有页面的最新数据。不完整时调用方不应据此删除本地仓库。"""
+        return not self.stale_pages and not self.failed_pages
+
+    def page_latency_summary(self) -> Dict[str, float]:
+        """汇总分页请求耗时（毫秒），用于调整并发窗口大小。"""
+        latencies = sorted(self.page_latencies_ms.values())
+        if not latencies:
+            return {}
+        p95_index = min(len(latencies) - 1, int(len(latencies) * 0.95))
+        return {
+            "avg": round(sum(latencies) / len(latencies), 1),
+            "p95": round(latencies[p95_index], 1),
+            "max": round(latencies[-1], 1),
+        }
+
+    def _log_fetch_summary(self, total_stars: int):
+        """记录一次完整获取的汇总信息。"""
+        logger.info(
+            f"Successfully fetched a total of {total_stars} starred repos from GitHub. "
+            f"Page cache hits: {self.page_cache_hits}, misses: {self.page_cache_misses}. "
+            f"Page latency (ms): {self.page_latency_summary()}"
+        )
+        if not self.is_complete:
+            logger.warning(
+                f"Star list is incomplete. Stale pages: {sorted(self.stale_pages)}, "
+                f"failed pages: {sorted(self.failed_pages)}."
+            )
+        if not total_stars:
+            logger.warning("iter_starred_pages: star list is empty after fetching from GitHub.")
+
+    async def iter_starred_pages(self) -> AsyncIterator[StarPage]:
+        """
+        流式获取用户所有星标的仓库，每下载并清理完一页就产出一个 StarPage。
+        GITHUB_PAGE_CONCURRENCY 个工作协程并发请求页面，结果通过有界队列交给调用方，
+        调用方处理不过来时工作协程会暂停，内存中最多只保留并发窗口大小的页面数据。
+        页面的产出顺序与页码顺序无关。
         """
         try:
             total_pages = await self._get_total_pages()
-            logger.info(f"Total pages to fetch from GitHub: {total_pages}")
-            
+            self.total_pages = total_pages
+            logger.info(f"Total pages to fetch from GitHub: {total_pages}, concurrency window: {self.page_concurrency}")
+
             if total_pages == 0:
-                return []
-
-            # 并发请求所有页面
-            tasks = [self._get_stars_by_page(page) for page in range(1, total_pages + 1)]
-            pages_results = await asyncio.gather(*tasks)
-            
-            # 合并所有页面的结果
-            all_stars = [item for page in pages_results for item in page]
-            
-            logger.info(f"Successfully fetched a total of {len(all_stars)} starred repos from GitHub.")
-            
-            cleaned_stars = []
-
-            if not all_stars:
-                logger.warning("get_all_starred_repos: all_stars list is empty after fetching from GitHub.")
-            elif 'repo' not in all_stars[0]:
-                logger.error(f"get_all_starred_repos: 'repo' key not found in first item. Item keys: {all_stars[0].keys()}")
-
-            # 清理和标准化数据格式
-            for item in all_stars:
-                repo_data = item.get("repo", {})
-                if not repo_data or not repo_data.get('id'):
-                    logger.warning(f"Skipping an item because it has no repo_data or repo_data['id']. Item: {item}")
-                    continue
-                owner = repo_data.get("owner", {})
-                cleaned_stars.append({
-                    "id": repo_data.get("id"),
-                    "name": repo_data.get("name"),
-                    "full_name": repo_data.get("full_name"),
-                    "owner_login": owner.get("login"),
-                    "owner_avatar_url": owner.get("avatar_url"),
-                    "html_url": repo_data.get("html_url"),
-                    "description": repo_data.get("description"),
-                    "language": repo_data.get("language"),
-                    "stargazers_count": repo_data.get("stargazers_count"),
-                    "pushed_at": repo_data.get("pushed_at"),
-                    "starred_at": item.get("starred_at"), 
-                })
-
-            return cleaned_stars
+                return
+
+            pending_pages: asyncio.Queue = asyncio.Queue()
+            for page in range(1, total_pages + 1):
+                pending_pages.put_nowait(page)
+            results: asyncio.Queue = asyncio.Queue(maxsize=self.page_concurrency)
+
+            async def worker():
+                while True:
+                    try:
+                        page = pending_pages.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        star_page = await self._fetch_page_with_retry(page)
+                    except Exception as e:
+                        # 全局性错误交给消费端抛出，其余工作协程随后被取消
+                        await results.put(e)
+                        return
+                    await results.put(star_page)
+
+            workers = [asyncio.create_task(worker()) for _ in range(min(self.page_concurrency, total_pages))]
+            total_stars = 0
+            try:
+                for _ in range(total_pages):
+                    result = await results.get()
+                    if isinstance(result, Exception):
+                        raise result
+                    total_stars += len(result.records)
+                    yield result
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+            self._log_fetch_summary(total_stars)
 
         except Exception as e:
             logger.error(f"Failed to get all starred repos due to an unrecoverable error: {e}", exc_info=True)
@@ -190,6 +423,58 @@ class GitHubApiClient:
                 message_en="An unknown error occurred during GitHub sync"
             )
 
+    async def get_all_starred_repos(self) -> List[StarRecord]:
+        """
+        获取用户所有星标的仓库，一次性返回完整列表。
+        同步流程应优先使用 iter_starred_pages 边获取边处理，此方法供需要完整列表的场景使用。
+        """
+        return [record async for star_page in self.iter_starred_pages() for record in star_page.records]
+
+    async def get_new_starred_repos(self, latest_starred_at: Optional[str]) -> List[StarRecord]:
+        """
+        按收藏时间倒序逐页获取星标仓库，遇到不晚于 latest_starred_at 的条目即停止翻页。
+        用于增量同步：通常只需一到两次请求即可拿到所有新收藏的仓库。
+        参数:
+            latest_starred_at: 本地数据库中最新的 starred_at（ISO 8601 字符串），为 None 时获取全部。
+        返回:
+            清理后的新增星标仓库记录列表（按收藏时间倒序）。
+        """
+        new_stars: List[StarRecord] = []
+        page = 1
+        try:
+            while True:
+                response = await self._request(
+                    "GET", "/user/starred",
+                    params={"per_page": STARS_PER_PAGE, "page": page, "sort": "created", "direction": "desc"}
+                )
+                raw_items = response.json()
+                page_items = self._clean_star_items(raw_items)
+
+                reached_known_star = False
+                for item in page_items:
+                    if latest_starred_at and item.starred_at and item.starred_at <= latest_starred_at:
+                        reached_known_star = True
+                        break
+                    new_stars.append(item)
+
+                if reached_known_star or len(raw_items) < STARS_PER_PAGE:
+                    break
+                page += 1
+
+            logger.info(f"Incremental fetch finished after {page} page(s). New stars found: {len(new_stars)}.")
+            return new_stars
+
+        except Exception as e:
+            logger.error(f"Failed to get new starred repos due to an unrecoverable error: {e}", exc_info=True)
+            if isinstance(e, ApiException):
+                raise e
+            raise ApiException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                code="GITHUB_SYNC_FAILED",
+                message_zh="同步 GitHub 数据时发生未知错误",
+                message_en="An unknown error occurred during GitHub sync"
+            )
+
     async def get_recent_commits(self, full_name: str, since: Optional[str] = None) -> List[str]:
         """
         获取仓库自指定时间以来的 commit message 列表。
@@ -221,3 +506,143 @@ class GitHubApiClient:
         except Exception as e:
             logger.warning(f"获取 {full_name} 的 commit 列表失败：{e}")
             return []
+
+
+class GitHubGraphQLClient(GitHubApiClient):
+    """
+    基于 GitHub GraphQL API 的星标获取客户端，与 GitHubApiClient 接口一致。
+    通过 viewer.starredRepositories 只请求 Repo 模型需要的字段，响应体积和 JSON 解析开销
+    远小于 REST 接口返回的完整仓库对象。游标分页只能顺序请求，不支持 ETag 缓存。
+    """
+    uses_page_cache = False
+
+    @staticmethod
+    def _clean_star_edges(edges: List[Dict[str, Any]]) -> List[StarRecord]:
+        """将 GraphQL 返回的 edges 转换为与 REST 清理结果相同的 StarRecord 列表。"""
+        cleaned_stars = []
+        for edge in edges:
+            node = edge.get("node") or {}
+            if not node.get("databaseId"):
+                logger.warning(f"Skipping a GraphQL edge because it has no node.databaseId. Edge: {edge}")
+                continue
+            owner = node.get("owner") or {}
+            primary_language = node.get("primaryLanguage") or {}
+            cleaned_stars.append(StarRecord(
+                id=node.get("databaseId"),
+                name=node.get("name"),
+                full_name=node.get("nameWithOwner"),
+                owner_login=owner.get("login"),
+                owner_avatar_url=owner.get("avatarUrl"),
+                html_url=node.get("url"),
+                description=node.get("description"),
+                language=primary_language.get("name"),
+                stargazers_count=node.get("stargazerCount"),
+                pushed_at=node.get("pushedAt"),
+                starred_at=edge.get("starredAt"),
+            ))
+        return cleaned_stars
+
+    async def _get_starred_page(self, after: Optional[str]) -> Dict[str, Any]:
+        """请求一页 starredRepositories，返回其中的 connection 对象（包含 pageInfo 和 edges）。"""
+        response = await self._request(
+            "POST", "/graphql",
+            json={"query": STARRED_REPOS_GRAPHQL_QUERY, "variables": {"first": STARS_PER_PAGE, "after": after}},
+            headers={"Accept": "application/json"}
+        )
+        payload = response.json()
+        if payload.get("errors"):
+            logger.error(f"GitHub GraphQL API returned errors: {payload['errors']}")
+            raise ApiException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                code="GITHUB_GRAPHQL_ERROR",
+                message_zh="GitHub GraphQL 接口返回错误",
+                message_en="GitHub GraphQL API returned an error",
+                details=str(payload["errors"])
+            )
+        return payload["data"]["viewer"]["starredRepositories"]
+
+    async def _iter_connection_pages(self) -> AsyncIterator[StarPage]:
+        """按收藏时间倒序顺序翻页，每页产出一个 StarPage，直到没有下一页。"""
+        cursor = None
+        while True:
+            connection = await self._get_starred_page(cursor)
+            self.total_pages += 1
+            records = self._clean_star_edges(connection.get("edges") or [])
+            yield StarPage(page=self.total_pages, records=records, unchanged=False, cache_entry=None)
+
+            page_info = connection.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                return
+            cursor = page_info.get("endCursor")
+
+    async def iter_starred_pages(self) -> AsyncIterator[StarPage]:
+        """通过 GraphQL 游标分页流式获取用户所有星标的仓库，产出与 REST 版本相同格式的 StarPage。"""
+        try:
+            total_stars = 0
+            async for star_page in self._iter_connection_pages():
+                total_stars += len(star_page.records)
+                yield star_page
+            logger.info(f"Successfully fetched a total of {total_stars} starred repos from GitHub GraphQL API in {self.total_pages} page(s).")
+        except Exception as e:
+            logger.error(f"Failed to get all starred repos via GraphQL: {e}", exc_info=True)
+            if isinstance(e, ApiException):
+                raise e
+            raise ApiException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                code="GITHUB_SYNC_FAILED",
+                message_zh="同步 GitHub 数据时发生未知错误",
+                message_en="An unknown error occurred during GitHub sync"
+            )
+
+    async def get_new_starred_repos(self, latest_starred_at: Optional[str]) -> List[StarRecord]:
+        """
+        通过 GraphQL 获取比 latest_starred_at 更新的星标仓库，用于增量同步。
+        按收藏时间倒序翻页，遇到不晚于 latest_starred_at 的条目即停止。
+        """
+        try:
+            stars: List[StarRecord] = []
+            async for star_page in self._iter_connection_pages():
+                reached_known_star = False
+                for item in star_page.records:
+                    if latest_starred_at and item.starred_at and item.starred_at <= latest_starred_at:
+                        reached_known_star = True
+                        break
+                    stars.append(item)
+                if reached_known_star:
+                    break
+            logger.info(f"Incremental GraphQL fetch finished after {self.total_pages} page(s). New stars found: {len(stars)}.")
+            return stars
+        except Exception as e:
+            logger.error(f"Failed to get new starred repos via GraphQL: {e}", exc_info=True)
+            if isinstance(e, ApiException):
+                raise e
+            raise ApiException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                code="GITHUB_SYNC_FAILED",
+                message_zh="同步 GitHub 数据时发生未知错误",
+                message_en="An unknown error occurred during GitHub sync"
+            )
+
+
+# 可选的星标获取后端，键为配置项 GITHUB_SYNC_BACKEND 的取值
+GITHUB_CLIENT_MAP = {
+    "rest": GitHubApiClient,
+    "graphql": GitHubGraphQLClient,
+}
+
+
+def create_github_client(
+    token: str,
+    page_cache: Optional[Dict[int, Dict[str, Any]]] = None,
+    load_cached_page: Optional[CachedPageLoader] = None
+) -> GitHubApiClient:
+    """
+    根据配置项 GITHUB_SYNC_BACKEND 创建用于同步星标的 GitHub 客户端。
+    未知的取值会记录警告并回退到 REST 后端。
+    """
+    backend = (settings.GITHUB_SYNC_BACKEND or "rest").lower()
+    ClientClass = GITHUB_CLIENT_MAP.get(backend)
+    if not ClientClass:
+        logger.warning(f"Unknown GITHUB_SYNC_BACKEND '{settings.GITHUB_SYNC_BACKEND}', falling back to 'rest'.")
+        ClientClass = GitHubApiClient
+    return ClientClass(token=token, page_cache=page_cache, load_cached_page=load_cached_page)
@@ -0,0 +1,213 @@
+"""
+GitHub API 限流调度器。
+进程内所有访问 api.github.com 的调用（星标同步、README 获取、commit 列表、用户身份验证）都经过同一个调度器。
+调度器读取响应中的 X-RateLimit-* 和 Retry-After 头：
+1. 配额充足时允许较高并发，配额越少并发越低。
+2. 触发主限流（配额耗尽）或次级限流（Retry-After / secondary rate limit）时，所有调用方一起暂停到重置时间，
+   而不是各自失败、各自退避。
+"""
+import asyncio
+import time
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.config import settings
+from app.exceptions import GitHubRateLimitError
+
+logger = logging.getLogger(__name__)
+
+# 默认最长等待时间（秒）。暂停时间超过该值时直接抛出 GitHubRateLimitError，避免接口请求长时间挂起
+DEFAULT_MAX_WAIT_SECONDS = 60.0
+# 被限流后，同一请求在暂停结束后最多重新发送的次数
+MAX_RATE_LIMIT_RETRIES = 2
+# 次级限流未提供 Retry-After 时的默认暂停时间（秒）
+SECONDARY_LIMIT_DEFAULT_PAUSE = 60.0
+# 剩余配额比例阈值：低于 LOW 时并发降为 1/4，低于 CRITICAL 时串行执行
+LOW_QUOTA_RATIO = 0.2
+CRITICAL_QUOTA_RATIO = 0.05
+
+
+class GitHubRateGovernor:
+    """
+    进程级的 GitHub 请求调度器。
+    根据各配额类型（core、graphql、search 等）的剩余额度动态调整允许的并发数，
+    并在触发限流时让所有调用方共同暂停。
+    """
+
+    def __init__(self, max_concurrency: int):
+        """
+        初始化调度器。
+        参数:
+            max_concurrency: 配额充足时允许同时进行的 GitHub 请求数上限。
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        # 各配额类型的最新状态，键为 X-RateLimit-Resource（如 core、graphql）
+        self._resources: Dict[str, Dict[str, Any]] = {}
+        # 全局暂停截止时间（Unix 时间戳），在此之前所有请求都需等待
+        self._paused_until = 0.0
+        self._pause_reason: Optional[str] = None
+        self._in_flight = 0
+        # 每次释放并发名额或暂停结束时替换并触发该事件，唤醒所有等待者
+        self._wakeup = asyncio.Event()
+
+    def _allowed_concurrency(self) -> int:
+        """根据所有配额类型中最紧张的剩余比例计算当前允许的并发数。"""
+        now = time.time()
+        lowest_ratio = 1.0
+        for info in self._resources.values():
+            # 已过重置时间的配额视为已恢复
+            if info["limit"] and info["reset_at"] > now:
+                lowest_ratio = min(lowest_ratio, info["remaining"] / info["limit"])
+
+        if lowest_ratio <= CRITICAL_QUOTA_RATIO:
+            return 1
+        if lowest_ratio <= LOW_QUOTA_RATIO:
+            return max(1, self.max_concurrency // 4)
+        return self.max_concurrency
+
+    def _notify(self):
+        """唤醒所有正在等待并发名额的调用方。"""
+        waiter, self._wakeup = self._wakeup, asyncio.Event()
+        waiter.set()
+
+    def _pause(self, seconds: float, reason: str):
+        """让所有调用方暂停指定秒数，已有更长的暂停时不缩短。"""
+        until = time.time() + max(0.0, seconds)
+        if until > self._paused_until:
+            self._paused_until = until
+            self._pause_reason = reason
+            logger.warning(f"GitHub {reason}. All GitHub requests are paused for {seconds:.0f}s.")
+
+    async def acquire(self, max_wait: float = DEFAULT_MAX_WAIT_SECONDS):
+        """
+        获取一个请求名额。处于暂停期时等待暂停结束，并发已满时等待其他请求完成。
+        异常:
+            GitHubRateLimitError: 需要等待的时间超过 max_wait。
+        """
+        deadline = time.monotonic() + max_wait
+        while True:
+            pause_left = self._paused_until - time.time()
+            if pause_left > 0:
+                if time.monotonic() + pause_left > deadline:
+                    raise GitHubRateLimitError(
+                        f"GitHub {self._pause_reason or 'rate limit'}, requests are paused for another {pause_left:.0f}s"
+                    )
+                await asyncio.sleep(pause_left)
+                continue
+
+            if self._in_flight < self._allowed_concurrency():
+                self._in_flight += 1
+                return
+
+            # 并发已满：等待其他请求释放名额（设置超时以便重新检查暂停状态和配额）
+            waiter = self._wakeup
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self):
+        """归还请求名额。"""
+        self._in_flight = max(0, self._in_flight - 1)
+        self._notify()
+
+    def update_from_response(self, response: httpx.Response) -> bool:
+        """
+        根据响应头更新配额状态。
+        返回:
+            True 表示该响应是限流响应（请求应在暂停结束后重试），否则为 False。
+        """
+        headers = response.headers
+        remaining = headers.get("x-ratelimit-remaining")
+        limit = headers.get("x-ratelimit-limit")
+        reset = headers.get("x-ratelimit-reset")
+        resource = headers.get("x-ratelimit-resource", "core")
+
+        if remaining is not None and limit is not None and reset is not None:
+            try:
+                self._resources[resource] = {
+                    "limit": int(limit),
+                    "remaining": int(remaining),
+                    "reset_at": float(reset),
+                }
+            except ValueError:
+                logger.debug(f"Ignoring malformed rate limit headers: {remaining}/{limit}/{reset}")
+
+        # 配额已耗尽：无论本次是否成功，都暂停到重置时间
+        if remaining == "0" and reset:
+            try:
+                self._pause(float(reset) - time.time() + 1, f"primary rate limit exhausted ({resource})")
+            except ValueError:
+                pass
+
+        if response.status_code not in (403, 429):
+            return False
+
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                self._pause(float(retry_after), "secondary rate limit (Retry-After)")
+            except ValueError:
+                self._pause(SECONDARY_LIMIT_DEFAULT_PAUSE, "secondary rate limit")
+            return True
+        if remaining == "0":
+            return True
+        if response.status_code == 429 or "secondary rate limit" in response.text.lower():
+            self._pause(SECONDARY_LIMIT_DEFAULT_PAUSE, "secondary rate limit")
+            return True
+        # 其他 403（如权限不足）不属于限流
+        return False
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        max_wait: float = DEFAULT_MAX_WAIT_SECONDS,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        通过调度器发送一个 GitHub 请求。
+        被限流时会等待共同的暂停结束后重试，最多 MAX_RATE_LIMIT_RETRIES 次；重试用尽后返回最后一次的限流响应。
+        异常:
+            GitHubRateLimitError: 需要等待的时间超过 max_wait。
+            httpx.RequestError: 网络层面的错误，由调用方处理。
+        """
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            await self.acquire(max_wait=max_wait)
+            try:
+                response = await client.request(method, url, **kwargs)
+            finally:
+                self.release()
+
+            if not self.update_from_response(response) or attempt == MAX_RATE_LIMIT_RETRIES:
+                return response
+            logger.info(f"Request to {url} was rate limited, will retry after the shared pause (attempt {attempt + 1}).")
+        return response
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回当前的配额与调度状态，供 API 展示。"""
+        now = time.time()
+        paused_for = max(0.0, self._paused_until - now)
+        return {
+            "resources": {
+                name: {
+                    "limit": info["limit"],
+                    "remaining": info["remaining"],
+                    "reset_at": int(info["reset_at"]),
+                }
+                for name, info in self._resources.items()
+            },
+            "is_paused": paused_for > 0,
+            "paused_for_seconds": round(paused_for, 1),
+            "pause_reason": self._pause_reason if paused_for > 0 else None,
+            "in_flight": self._in_flight,
+            "allowed_concurrency": self._allowed_concurrency(),
+            "max_concurrency": self.max_concurrency,
+        }
+
+
+# 全局唯一的调度器实例，所有 GitHub 调用共享
+github_governor = GitHubRateGovernor(max_concurrency=settings.GITHUB_MAX_CONCURRENCY)
@@ -0,0 +1,135 @@
+"""
+进程级共享的 HTTP 客户端注册表。
+所有对外 HTTP 调用（GitHub API、README、推送通知、AI 接口、版本检查）都从这里获取长连接的 httpx.AsyncClient，
+同一目标地址和代理设置复用同一个连接池，避免每次调用都重新建立 TCP 和 TLS 连接。
+注册表在 main.lifespan 中启动，应用关闭时统一关闭所有客户端。
+"""
+import asyncio
+import logging
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 未指定时使用的默认请求超时（秒），调用方可以在单次请求中通过 timeout 参数覆盖
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+
+def _origin_of(url: str) -> str:
+    """提取 URL 的 scheme://host[:port] 部分，作为连接池的目标地址。"""
+    parsed = httpx.URL(url)
+    origin = f"{parsed.scheme}://{parsed.host}"
+    if parsed.port:
+        origin += f":{parsed.port}"
+    return origin
+
+
+def _build_proxies() -> Optional[Dict[str, str]]:
+    """根据全局配置构建 httpx 代理字典，没有配置代理时返回 None。"""
+    proxies = {}
+    if settings.HTTP_PROXY:
+        proxies["http://"] = settings.HTTP_PROXY
+    if settings.HTTPS_PROXY:
+        proxies["https://"] = settings.HTTPS_PROXY
+    return proxies or None
+
+
+def _describe_proxies(proxies: Dict[str, str]) -> Dict[str, str]:
+    """用于日志的代理描述，只保留代理的 scheme://host[:port]，不输出其中的用户名和密码。"""
+    return {pattern: _origin_of(proxy_url) for pattern, proxy_url in proxies.items()}
+
+
+def _no_cookie_jar() -> CookieJar:
+    """
+    不保存任何 Cookie 的 CookieJar。
+    共享客户端被不同用户和 Token 的请求共用，服务端返回的 Cookie 不能保存下来带到其他调用方的请求中。
+    """
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+def _http2_available() -> bool:
+    """HTTP/2 需要可选依赖 h2，未安装时回退到 HTTP/1.1。"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HttpClientRegistry:
+    """
+    按 (目标地址, 实际使用的代理) 缓存 httpx.AsyncClient 的注册表。
+    未配置代理时，use_proxy 为 True 和 False 的调用共享同一个客户端。
+    客户端的 base_url 为目标地址，调用方既可以传相对路径也可以传完整 URL。
+    客户端由注册表统一管理生命周期，调用方不应自行关闭。
+    客户端不保存响应中的 Cookie，需要 Cookie 的调用方应在单次请求中显式传入。
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple[str, Optional[Tuple]], httpx.AsyncClient] = {}
+        # 每个客户端创建时所在的事件循环；连接池绑定事件循环，循环变化时需要重新创建
+        self._loops: Dict[Tuple[str, Optional[Tuple]], asyncio.AbstractEventLoop] = {}
+        self._http2 = False
+
+    def start(self):
+        """在应用启动时调用，确定 HTTP/2 是否可用并记录连接池配置。"""
+        self._http2 = settings.HTTP2_ENABLED and _http2_available()
+        if settings.HTTP2_ENABLED and not self._http2:
+            logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed, falling back to HTTP/1.1.")
+        logger.info(
+            f"Shared HTTP client registry started. HTTP/2: {self._http2}, "
+            f"max connections per destination: {settings.HTTP_POOL_MAX_CONNECTIONS}"
+        )
+
+    def get(self, url: str, use_proxy: bool = True) -> httpx.AsyncClient:
+        """
+        获取指向 url 所在目标地址的共享客户端，不存在时创建。
+        参数:
+            url: 目标地址或该地址下的任意完整 URL。
+            use_proxy: 是否通过配置的 HTTP_PROXY / HTTPS_PROXY 访问。
+        """
+        proxies = _build_proxies() if use_proxy else None
+        key = (_origin_of(url), tuple(sorted(proxies.items())) if proxies else None)
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(key)
+        if client is not None and not client.is_closed and self._loops.get(key) is loop:
+            return client
+
+        client = httpx.AsyncClient(
+            base_url=key[0],
+            timeout=DEFAULT_TIMEOUT_SECONDS,
+            proxies=proxies,
+            cookies=_no_cookie_jar(),
+            http2=self._http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+            ),
+        )
+        self._clients[key] = client
+        self._loops[key] = loop
+        if proxies:
+            logger.info(f"Created shared HTTP client for {key[0]} using proxies: {_describe_proxies(proxies)}")
+        else:
+            logger.debug(f"Created shared HTTP client for {key[0]}")
+        return client
+
+    async def aclose(self):
+        """关闭所有客户端，在应用关闭时调用。"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._loops.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close shared HTTP client {client.base_url}: {e}")
+        logger.info(f"Shared HTTP client registry closed ({len(clients)} client(s)).")
+
+
+# 全局唯一的客户端注册表
+http_clients = HttpClientRegistry()
@@ -0,0 +1,75 @@
+"""
+GitHub 身份验证结果的进程内缓存。
+受保护的接口都依赖 get_current_github_user，如果每次请求都调用 GET /user，接口延迟中总会包含一次 GitHub 往返。
+缓存以 token 的哈希为键保存 /user 的响应和 ETag：
+1. 在 IDENTITY_CACHE_TTL_SECONDS 内直接使用缓存结果，不访问 GitHub。
+2. 过期后携带 If-None-Match 重新验证，GitHub 返回 304 时延长有效期（304 不消耗 API 配额）。
+3. 登出或任意 GitHub 调用返回 401 时立即失效。
+"""
+import hashlib
+import time
+import logging
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 最多缓存的 token 数量，超过时淘汰最早验证的条目
+MAX_CACHED_IDENTITIES = 16
+
+
+def _token_key(token: str) -> str:
+    """缓存键使用 token 的 SHA-256 哈希，避免在内存中以明文索引 token。"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class IdentityCache:
+    """以 token 为键的 GitHub 用户信息缓存。"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = max(0.0, ttl_seconds)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def get_fresh(self, token: str) -> Optional[dict]:
+        """返回仍在有效期内的用户信息，过期或不存在时返回 None。"""
+        entry = self._entries.get(_token_key(token))
+        if entry and time.monotonic() - entry["validated_at"] < self.ttl_seconds:
+            return entry["user"]
+        return None
+
+    def get_etag(self, token: str) -> Optional[str]:
+        """返回已过期条目的 ETag，用于条件请求重新验证。"""
+        entry = self._entries.get(_token_key(token))
+        return entry["etag"] if entry else None
+
+    def revalidated(self, token: str) -> Optional[dict]:
+        """GitHub 返回 304 时调用：延长条目有效期并返回缓存的用户信息。"""
+        entry = self._entries.get(_token_key(token))
+        if not entry:
+            return None
+        entry["validated_at"] = time.monotonic()
+        return entry["user"]
+
+    def store(self, token: str, user: dict, etag: Optional[str]):
+        """保存一次成功验证的结果。"""
+        if len(self._entries) >= MAX_CACHED_IDENTITIES:
+            oldest_key = min(self._entries, key=lambda key: self._entries[key]["validated_at"])
+            self._entries.pop(oldest_key, None)
+        self._entries[_token_key(token)] = {
+            "user": user,
+            "etag": etag,
+            "validated_at": time.monotonic(),
+        }
+
+    def invalidate(self, token: Optional[str] = None):
+        """使指定 token 的缓存失效；不指定 token 时清空所有缓存。"""
+        if token is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(_token_key(token), None)
+        logger.debug("GitHub identity cache invalidated.")
+
+
+# 全局唯一的身份缓存实例
+identity_cache = IdentityCache(ttl_seconds=settings.IDENTITY_CACHE_TTL_SECONDS)
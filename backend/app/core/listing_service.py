@@ -0,0 +1,171 @@
+"""
+星标仓库的服务端分页列表。
+支持与前端侧边栏一致的筛选（系统分组、标签、语言）和排序（收藏时间、更新时间、Star 数、名称），
+使用 (排序字段, id) 的游标分页：翻页条件直接落在索引上，任意页的查询代价都与页大小成正比，与仓库总数无关。
+"""
+import base64
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import status
+from sqlalchemy import exists, func, tuple_
+from sqlmodel import Session, select
+
+from app.exceptions import ApiException
+from app.models import Repo, RepoFacet, RepoTag
+from app.schemas import RepoCompactResponse, RepoResponse
+
+logger = logging.getLogger(__name__)
+
+# 支持的排序字段：(排序表达式, 是否降序)。与前端一致，日期和 Star 数从大到小，名称按字母顺序（忽略大小写）
+SORT_COLUMNS = {
+    "starred_at": (Repo.starred_at, True),
+    "pushed_at": (Repo.pushed_at, True),
+    "stargazers_count": (Repo.stargazers_count, True),
+    "name": (Repo.name.collate("NOCASE"), False),
+}
+
+# 内部使用的收藏标签，不计入用户可见的标签
+FAVORITE_TAG = "_favorite"
+
+# API 返回的仓库字段。列表类接口只查询这些列，并直接把行转换为字典交给 fast_json 编码，
+# 不再经过 Repo -> model_dump -> RepoResponse 的两次 Pydantic 转换。
+# compact 视图只包含列表和卡片需要的字段，备注和 AI 总结在打开详情时通过 GET /api/stars/{id} 获取。
+REPO_RESPONSE_FIELDS = tuple(RepoResponse.model_fields)
+REPO_COMPACT_FIELDS = tuple(RepoCompactResponse.model_fields)
+
+
+def select_repo_rows(compact: bool = False):
+    """查询 API 返回字段的 select 语句，行可以通过 repo_row_to_dict 转换为响应字典。"""
+    fields = REPO_COMPACT_FIELDS if compact else REPO_RESPONSE_FIELDS
+    return select(*(getattr(Repo, field) for field in fields))
+
+
+def repo_row_to_dict(row) -> Dict[str, Any]:
+    """把 select_repo_rows 查询到的一行转换为与 RepoResponse（或 RepoCompactResponse）结构一致的字典。"""
+    repo = dict(row._mapping)
+    repo["tags"] = repo["tags"] or []
+    return repo
+
+
+def _has_tag(condition):
+    """仓库至少有一个满足 condition 的标签。子查询按 repotag 的主键 (repo_id, tag) 与外层的 repo 行关联。"""
+    return exists(select(1).where(RepoTag.repo_id == Repo.id, condition))
+
+
+def build_filter_clause(filter_type: str, filter_value: Optional[str]):
+    """
+    根据侧边栏的筛选条件生成 WHERE 子句，不需要筛选时返回 None。
+    - system/all: 全部仓库
+    - system/constellation: 带有收藏标签的仓库
+    - system/untagged: 没有任何用户标签的仓库（收藏标签不算）
+    - tag/<标签>: 带有指定标签的仓库
+    - language/<语言>: 主要语言为指定语言的仓库
+    """
+    if filter_type == "system":
+        if filter_value == "constellation":
+            return _has_tag(RepoTag.tag == FAVORITE_TAG)
+        if filter_value == "untagged":
+            return ~_has_tag(RepoTag.tag != FAVORITE_TAG)
+        return None
+    if filter_type == "tag":
+        return _has_tag(RepoTag.tag == filter_value)
+    if filter_type == "language":
+        return Repo.language == filter_value
+    return None
+
+
+def encode_cursor(sort: str, repo: Dict[str, Any]) -> str:
+    """把当前页最后一个仓库的排序值和 id 编码为下一页的游标。"""
+    payload = {"sort": sort, "value": repo[sort], "id": repo["id"]}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(sort: str, cursor: str) -> Tuple[Any, int]:
+    """解析游标，返回 (排序值, id)。游标格式错误或与当前排序方式不匹配时抛出 400 错误。"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if payload["sort"] != sort or not isinstance(payload["id"], int):
+            raise ValueError("cursor does not match the requested sort")
+        return payload["value"], payload["id"]
+    except Exception as e:
+        raise ApiException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            code="INVALID_CURSOR",
+            message_zh="分页游标无效，请从第一页重新加载",
+            message_en="Invalid pagination cursor, please reload from the first page",
+            details=str(e),
+        )
+
+
+def list_repos_page(
+    session: Session,
+    filter_type: str,
+    filter_value: Optional[str],
+    sort: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    compact: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+    """
+    查询一页仓库。
+    参数:
+        session: 数据库会话对象。
+        filter_type / filter_value: 筛选条件，见 build_filter_clause。
+        sort: SORT_COLUMNS 中的排序字段。
+        limit: 每页数量。
+        cursor: 上一页返回的游标，为空时返回第一页。
+        compact: 为 True 时只返回列表视图需要的字段。
+    返回:
+        (本页仓库字典列表, 下一页游标（没有下一页时为 None）, 满足筛选条件的仓库总数)
+    """
+    sort_column, descending = SORT_COLUMNS[sort]
+    filter_clause = build_filter_clause(filter_type, filter_value)
+
+    statement = select_repo_rows(compact)
+    count_statement = select(func.count()).select_from(Repo)
+    if filter_clause is not None:
+        statement = statement.where(filter_clause)
+        count_statement = count_statement.where(filter_clause)
+    # 按单个标签筛选时直接在 repotag 的 (tag, repo_id) 索引上计数，不需要逐行关联 repo
+    if filter_type == "tag":
+        count_statement = select(func.count()).select_from(RepoTag).where(RepoTag.tag == filter_value)
+    elif filter_type == "system" and filter_value == "constellation":
+        count_statement = select(func.count()).select_from(RepoTag).where(RepoTag.tag == FAVORITE_TAG)
+
+    if cursor:
+        last_value, last_id = decode_cursor(sort, cursor)
+        position, last_position = tuple_(sort_column, Repo.id), tuple_(last_value, last_id)
+        statement = statement.where(position < last_position if descending else position > last_position)
+
+    if descending:
+        statement = statement.order_by(sort_column.desc(), Repo.id.desc())
+    else:
+        statement = statement.order_by(sort_column, Repo.id)
+
+    # 多取一条用于判断是否还有下一页
+    repos = [repo_row_to_dict(row) for row in session.exec(statement.limit(limit + 1)).all()]
+    next_cursor = None
+    if len(repos) > limit:
+        repos = repos[:limit]
+        next_cursor = encode_cursor(sort, repos[-1])
+
+    total = session.exec(count_statement).one()
+    return repos, next_cursor, total
+
+
+def get_facet_counts(session: Session) -> Dict[str, Any]:
+    """
+    读取由触发器维护的筛选项计数，结构与前端侧边栏使用的计数一致：
+    {"all": int, "constellation": int, "untagged": int, "tags": {标签: 数量}, "languages": {语言: 数量}}
+    """
+    counts: Dict[str, Any] = {"all": 0, "constellation": 0, "untagged": 0, "tags": {}, "languages": {}}
+    for kind, value, count in session.exec(select(RepoFacet.kind, RepoFacet.value, RepoFacet.count)).all():
+        if kind == "system":
+            counts[value] = count
+        elif kind == "tag":
+            counts["tags"][value] = count
+        elif kind == "language":
+            counts["languages"][value] = count
+    return counts
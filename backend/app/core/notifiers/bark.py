@@ -4,10 +4,9 @@ Bark 推送通知服务的实现。
 支持官方服务器和自建服务器，并能从消息内容中自动提取跳转链接。
 """
 import re
-import httpx
 import logging
 from .base import Notifier
-from app.config import settings
+from app.core.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -50,37 +49,32 @@ class BarkNotifier(Notifier):
             payload["url"] = jump_url
             logger.info(f"[{self.channel_name}] Extracted jump URL for Bark: {jump_url}")
 
-        # 动态构建代理配置
-        proxies = {}
-        if self.use_proxy:
-            if settings.HTTP_PROXY: proxies["http://"] = settings.HTTP_PROXY
-            if settings.HTTPS_PROXY: proxies["https://"] = settings.HTTPS_PROXY
-
         try:
-            async with httpx.AsyncClient(proxies=proxies if proxies else None, timeout=15.0) as client:
-                response = await client.post(url, json=payload)
+            # 使用共享连接池，代理由注册表根据 use_proxy 配置
+            client = http_clients.get(url, use_proxy=self.use_proxy)
+            response = await client.post(url, json=payload, timeout=15.0)
 
-                # 检查 HTTP 状态码，处理网络或服务器层面的错误
-                if response.status_code != 200:
-                    logger.error(
-                        f"[{self.channel_name}] Request to Bark server failed with HTTP status {response.status_code}. "
-                        f"Response: {response.text}"
-                    )
-                    return False
+            # 检查 HTTP 状态码，处理网络或服务器层面的错误
+            if response.status_code != 200:
+                logger.error(
+                    f"[{self.channel_name}] Request to Bark server failed with HTTP status {response.status_code}. "
+                    f"Response: {response.text}"
+                )
+                return False
                 
-                # 解析 JSON，处理 Bark API 的业务逻辑错误
-                res_json = response.json()
-                if res_json.get("code") == 200:
-                    logger.info(f"[{self.channel_name}] Notification sent successfully via Bark.")
-                    return True
-                else:
-                    error_message = res_json.get("message", "Unknown Bark API error")
-                    error_code = res_json.get("code", "N/A")
-                    logger.error(
-                        f"[{self.channel_name}] Failed to send notification. "
-                        f"Bark API returned a business error: {error_message} (Code: {error_code})"
-                    )
-                    return False
+            # 解析 JSON，处理 Bark API 的业务逻辑错误
+            res_json = response.json()
+            if res_json.get("code") == 200:
+                logger.info(f"[{self.channel_name}] Notification sent successfully via Bark.")
+                return True
+            else:
+                error_message = res_json.get("message", "Unknown Bark API error")
+                error_code = res_json.get("code", "N/A")
+                logger.error(
+                    f"[{self.channel_name}] Failed to send notification. "
+                    f"Bark API returned a business error: {error_message} (Code: {error_code})"
+                )
+                return False
 
         except Exception as e:
             logger.error(f"[{self.channel_name}] An unexpected error occurred while sending notification. Error: {e}", exc_info=True)
@@ -3,10 +3,9 @@ Gotify 推送通知服务的实现。
 定义了 GotifyNotifier 类，用于通过自建的 Gotify 服务器发送推送通知。
 支持 Markdown 格式的消息内容。
 """
-import httpx
 import logging
 from .base import Notifier
-from app.config import settings
+from app.core.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -56,18 +55,14 @@ class GotifyNotifier(Notifier):
             }
         }
 
-        proxies = {}
-        if self.use_proxy:
-            if settings.HTTP_PROXY: proxies["http://"] = settings.HTTP_PROXY
-            if settings.HTTPS_PROXY: proxies["https://"] = settings.HTTPS_PROXY
-
         try:
-            async with httpx.AsyncClient(proxies=proxies if proxies else None, timeout=15.0) as client:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
+            # 使用共享连接池，代理由注册表根据 use_proxy 配置
+            client = http_clients.get(url, use_proxy=self.use_proxy)
+            response = await client.post(url, json=payload, timeout=15.0)
+            response.raise_for_status()
 
-                logger.info(f"[{self.channel_name}] Notification sent successfully to {base_url}")
-                return True
+            logger.info(f"[{self.channel_name}] Notification sent successfully to {base_url}")
+            return True
 
         except Exception as e:
             logger.error(f"[{self.channel_name}] Failed to send notification. Error: {e}", exc_info=True)
@@ -86,11 +86,9 @@ async def create_notification_message(
     # 构建 commits_section
     commits_section = ""
     if old_pushed_at and github_token:
+        # 客户端使用共享连接池，无需关闭
         github_client = GitHubApiClient(token=github_token)
-        try:
-            commits = await github_client.get_recent_commits(repo.full_name, since=old_pushed_at)
-        finally:
-            await github_client.client.aclose()
+        commits = await github_client.get_recent_commits(repo.full_name, since=old_pushed_at)
 
         if commits:
             header = repo_update.get("commits_header", "📝 Recent Updates")
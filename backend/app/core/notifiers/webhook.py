@@ -9,7 +9,7 @@ import json
 from typing import Dict, Any
 
 from .base import Notifier
-from app.config import settings
+from app.core.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -42,17 +42,6 @@ class WebhookNotifier(Notifier):
             logger.error(f"[{self.channel_name}] Webhook URL is not configured.")
             return False
 
-        # 动态构建代理配置
-        proxies = {}
-        if self.use_proxy:
-            # 当用户为推送开启了代理时，读取环境变量中的代理设置
-            if settings.HTTP_PROXY:
-                proxies["http://"] = settings.HTTP_PROXY
-            if settings.HTTPS_PROXY:
-                proxies["https://"] = settings.HTTPS_PROXY
-            if proxies:
-                logger.info(f"[{self.channel_name}] Sending notification via proxy.")
-
         try:
             # 步骤 1: 解析用户定义的 JSON 模板字符串
             try:
@@ -79,19 +68,20 @@ class WebhookNotifier(Notifier):
             payload = fill_template(template_obj)
 
             # 步骤 3: 使用 httpx 发送请求
-            async with httpx.AsyncClient(proxies=proxies if proxies else None, timeout=15.0) as client:
-                if method == 'POST':
-                    # httpx 的 json 参数会自动处理序列化和 Content-Type header
-                    response = await client.post(url, json=payload)
-                elif method == 'GET':
-                    # GET 请求通常使用 params 来传递查询参数
-                    response = await client.get(url, params=payload)
-                else:
-                    logger.error(f"[{self.channel_name}] Unsupported HTTP method: {method}")
-                    return False
+            # 使用共享连接池，代理由注册表根据 use_proxy 配置
+            client = http_clients.get(url, use_proxy=self.use_proxy)
+            if method == 'POST':
+                # httpx 的 json 参数会自动处理序列化和 Content-Type header
+                response = await client.post(url, json=payload, timeout=15.0)
+            elif method == 'GET':
+                # GET 请求通常使用 params 来传递查询参数
+                response = await client.get(url, params=payload, timeout=15.0)
+            else:
+                logger.error(f"[{self.channel_name}] Unsupported HTTP method: {method}")
+                return False
 
-                # 检查响应状态码，如果不是 2xx，则会抛出异常
-                response.raise_for_status()
+            # 检查响应状态码，如果不是 2xx，则会抛出异常
+            response.raise_for_status()
 
             logger.info(f"[{self.channel_name}] Notification sent successfully to {url}")
             return True
@@ -10,6 +10,9 @@ import logging
 from typing import Optional, Tuple
 
 from app.exceptions import GitHubApiError, InvalidGitHubTokenError
+from app.core.github_governor import github_governor
+from app.core.http_clients import http_clients
+from app.core.identity_cache import identity_cache
 
 logger = logging.getLogger(__name__)
 
@@ -40,45 +43,48 @@ async def get_readme_content(
         "Authorization": f"token {github_token}"
     }
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.get(url, headers=headers)
+    # 与其他 GitHub 调用共享 api.github.com 的连接池和代理配置
+    client = http_clients.get(url)
+    try:
+        # 经过全局限流调度器发送，与其他 GitHub 调用共享配额状态
+        response = await github_governor.request(client, "GET", url, headers=headers)
 
-            if response.status_code == 404:
-                logger.info(f"仓库无 README：{full_name}")
-                return None, None
+        if response.status_code == 404:
+            logger.info(f"仓库无 README：{full_name}")
+            return None, None
 
-            if response.status_code == 200:
-                data = response.json()
-                sha = data.get("sha")
+        if response.status_code == 200:
+            data = response.json()
+            sha = data.get("sha")
 
-                # base64 解码获取原始 Markdown 内容
-                encoded_content = data.get("content", "")
-                encoding = data.get("encoding", "base64")
+            # base64 解码获取原始 Markdown 内容
+            encoded_content = data.get("content", "")
+            encoding = data.get("encoding", "base64")
 
-                if encoding == "base64" and encoded_content:
-                    content = base64.b64decode(encoded_content).decode("utf-8")
-                else:
-                    content = encoded_content
+            if encoding == "base64" and encoded_content:
+                content = base64.b64decode(encoded_content).decode("utf-8")
+            else:
+                content = encoded_content
 
-                logger.info(f"获取 README 成功：{full_name}，SHA：{sha}")
-                return content, sha
+            logger.info(f"获取 README 成功：{full_name}，SHA：{sha}")
+            return content, sha
 
-            if response.status_code == 401:
-                logger.error(f"GitHub Token 无效：{full_name}，状态码：401")
-                raise InvalidGitHubTokenError("GitHub Access Token 无效或过期")
+        if response.status_code == 401:
+            logger.error(f"GitHub Token 无效：{full_name}，状态码：401")
+            identity_cache.invalidate(github_token)
+            raise InvalidGitHubTokenError("GitHub Access Token 无效或过期")
 
-            # 其他错误（500, 503 等）
-            logger.error(f"GitHub API 失败：{full_name}，状态码：{response.status_code}")
-            raise GitHubApiError(f"GitHub API 返回 {response.status_code}")
+        # 其他错误（500, 503 等）
+        logger.error(f"GitHub API 失败：{full_name}，状态码：{response.status_code}")
+        raise GitHubApiError(f"GitHub API 返回 {response.status_code}")
 
-        except httpx.TimeoutException:
-            logger.error(f"获取 README 超时：{full_name}")
-            raise GitHubApiError(f"获取 README 超时：{full_name}")
+    except httpx.TimeoutException:
+        logger.error(f"获取 README 超时：{full_name}")
+        raise GitHubApiError(f"获取 README 超时：{full_name}")
 
-        except GitHubApiError:
-            raise
+    except GitHubApiError:
+        raise
 
-        except Exception as e:
-            logger.error(f"获取 README 异常：{full_name}，错误：{e}")
-            raise GitHubApiError(f"获取 README 异常：{str(e)}")
+    except Exception as e:
+        logger.error(f"获取 README 异常：{full_name}，错误：{e}")
+        raise GitHubApiError(f"获取 README 异常：{str(e)}")
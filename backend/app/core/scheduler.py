@@ -2,6 +2,7 @@
 后台定时任务调度器。
 基于 asyncio 实现，用于周期性地执行数据同步和推送通知。
 包含智能休眠逻辑，支持免打扰(DND)时段。
+每 FULL_SYNC_EVERY_N_RUNS 次同步执行一次完整同步，其余周期执行只拉取新星标的增量同步。
 """
 import asyncio
 import logging
@@ -9,12 +10,14 @@ import random
 from datetime import datetime, time, timedelta
 from sqlmodel import Session
 from app.db import engine
+from app.config import settings
 
 from app.core.settings_service import get_app_settings, increment_failed_push_count, get_access_token
-from app.core.sync_service import run_full_sync
+from app.core.sync_service import run_full_sync, run_incremental_sync
 from app.core.notifiers.factory import create_notifier
 from app.core.notifiers.message import create_notification_message
-from app.core.summary_service import get_repos_to_summarize, summarize_repos_batch
+from app.core.summary_service import get_repos_to_summarize
+from app.core.summary_jobs import enqueue_summary_job, summary_worker
 from app.models import AppSettings
 
 logger = logging.getLogger(__name__)
@@ -38,11 +41,13 @@ def _is_in_dnd_hours(dnd_enabled: bool, start_hour: int, end_hour: int) -> bool:
         # DND 时段跨天（如 23:00 - 07:00）
         return now_time >= start_time or now_time < end_time
 
-async def _perform_sync_and_notify_actions(session: Session) -> AppSettings:
+async def _perform_sync_and_notify_actions(session: Session, full_sync: bool = True) -> AppSettings:
     """
     执行单次后台同步周期的核心业务逻辑。
     该函数在一个给定的数据库会话中完成所有操作，并返回最新的应用设置。
     这是被定时调度器和测试脚本共同调用的核心。
+    参数:
+        full_sync: True 时执行完整同步，False 时执行只拉取新星标的增量同步。
     """
     app_settings = get_app_settings(session)
     access_token = get_access_token(session)
@@ -61,57 +66,52 @@ async def _perform_sync_and_notify_actions(session: Session) -> AppSettings:
 
     # --- 核心任务执行 ---
     if not should_skip_sync:
-        logger.info("Executing scheduled background sync...")
+        sync_func = run_full_sync if full_sync else run_incremental_sync
+        logger.info(f"Executing scheduled background sync (mode: {'full' if full_sync else 'incremental'})...")
         # 1. 执行核心同步逻辑（只准备数据库更改，不提交）
-        stats, updated_repos = await run_full_sync(session=session, access_token=access_token)
+        stats, updated_repos = await sync_func(session=session, access_token=access_token)
         logger.info(f"Scheduled sync finished. Staged changes: {stats}")
 
-        # 刷新设置，确保获取最新的推送配置
-        try:
-            session.refresh(app_settings)
-            logger.info("Refreshed app_settings from DB before checking push notifications.")
-        except Exception:
-            # 如果刷新失败，重新获取一次作为备用方案
-            app_settings = get_app_settings(session)
-
-        # 2. 检查是否需要发送通知
-        if app_settings.is_push_enabled and updated_repos:
-            # V24.05.20 根据用户需求，仅推送被标记为"特别关注"的仓库
-            favorite_repos_to_notify = [
-                repo for repo in updated_repos if repo.tags and "_favorite" in repo.tags
-            ]
-
-            if favorite_repos_to_notify:
-                logger.info(f"Found {len(favorite_repos_to_notify)} updated 'Favorite' repos to notify.")
-                notifier = create_notifier(session, app_settings)
-
-                if notifier:
-                    old_pushed_at_map = stats.get("old_pushed_at_map", {})
-                    # 先异步生成所有消息，再并发发送
-                    notification_tasks = []
-                    for repo in favorite_repos_to_notify:
-                        old_pushed_at = old_pushed_at_map.get(repo.id)
-                        title, content = await create_notification_message(
-                            repo,
-                            lang=app_settings.ui_language,
-                            github_token=access_token,
-                            old_pushed_at=old_pushed_at,
-                        )
-                        notification_tasks.append(notifier.send(title, content))
-                    results = await asyncio.gather(*notification_tasks, return_exceptions=True)
-                    
-                    # 处理发送结果，为失败的通知增加失败计数
-                    failed_sends = sum(1 for res in results if isinstance(res, Exception) or res is False)
-                    if failed_sends > 0:
-                        for _ in range(failed_sends):
-                            increment_failed_push_count(session)
-                        logger.error(f"{failed_sends} notification(s) failed to send. Details in previous logs.")
-                else:
-                    logger.warning("Push is enabled, but no valid notifier could be created from settings.")
+        # V24.05.20 根据用户需求，仅推送被标记为"特别关注"的仓库。
+        # 在提交前筛选，提交后对象过期，只有需要通知的仓库会被重新读取
+        favorite_repos_to_notify = [
+            repo for repo in updated_repos if repo.tags and "_favorite" in repo.tags
+        ]
 
-        # 3. 在一次事务中提交所有数据库更改（包括同步数据和失败计数）
+        # 2. 立即提交同步数据。生成和发送通知都要请求网络，不能在此期间持有写锁，阻塞界面的写入。
+        #    提交后 app_settings 已过期，下面访问时会重新读取最新的推送配置
         session.commit()
-        logger.info("All database changes for this cycle have been committed.")
+        logger.info("Sync changes for this cycle have been committed.")
+
+        # 3. 检查是否需要发送通知
+        if app_settings.is_push_enabled and favorite_repos_to_notify:
+            logger.info(f"Found {len(favorite_repos_to_notify)} updated 'Favorite' repos to notify.")
+            notifier = create_notifier(session, app_settings)
+
+            if notifier:
+                old_pushed_at_map = stats.get("old_pushed_at_map", {})
+                # 先异步生成所有消息，再并发发送
+                notification_tasks = []
+                for repo in favorite_repos_to_notify:
+                    old_pushed_at = old_pushed_at_map.get(repo.id)
+                    title, content = await create_notification_message(
+                        repo,
+                        lang=app_settings.ui_language,
+                        github_token=access_token,
+                        old_pushed_at=old_pushed_at,
+                    )
+                    notification_tasks.append(notifier.send(title, content))
+                results = await asyncio.gather(*notification_tasks, return_exceptions=True)
+
+                # 处理发送结果，为失败的通知增加失败计数，在单独的短事务中提交
+                failed_sends = sum(1 for res in results if isinstance(res, Exception) or res is False)
+                if failed_sends > 0:
+                    for _ in range(failed_sends):
+                        increment_failed_push_count(session)
+                    session.commit()
+                    logger.error(f"{failed_sends} notification(s) failed to send. Details in previous logs.")
+            else:
+                logger.warning("Push is enabled, but no valid notifier could be created from settings.")
 
         # 4. 检查是否需要触发 AI 自动总结
         if app_settings.is_ai_enabled and app_settings.is_auto_analysis_enabled:
@@ -123,11 +123,16 @@ async def _perform_sync_and_notify_actions(session: Session) -> AppSettings:
                     updated_repo_ids=updated_repo_ids
                 )
 
-                if repos_to_summarize:
-                    logger.info(f"开始自动 AI 总结，共 {len(repos_to_summarize)} 个仓库")
-                    await summarize_repos_batch(repos_to_summarize, app_settings, readme_cache)
-                else:
-                    logger.info("没有需要自动总结的仓库")
+                # 加入持久化的总结队列，由后台 worker 执行，不阻塞同步周期。
+                # 使用独立的会话提交，避免使本周期的 app_settings 过期
+                with Session(engine) as job_session:
+                    job = enqueue_summary_job(job_session, "auto", [repo.id for repo in repos_to_summarize])
+                    if job is not None:
+                        job_session.commit()
+                        summary_worker.notify(job.id, readme_cache)
+                        logger.info(f"已创建自动 AI 总结任务，共 {job.total} 个仓库")
+                    else:
+                        logger.info("没有需要自动总结的仓库")
 
             except Exception as e:
                 logger.error(f"自动 AI 总结失败：{e}", exc_info=True)
@@ -147,6 +152,10 @@ async def periodic_sync_scheduler(initial_delay: int = 0):
         logger.info(f"Initial delay of {initial_delay} seconds before first run.")
         await asyncio.sleep(initial_delay)
 
+    # 周期计数器：第一个周期总是完整同步，之后每 N 个周期执行一次完整同步
+    full_sync_every = max(1, settings.FULL_SYNC_EVERY_N_RUNS)
+    cycle_count = 0
+
     while True:
         app_settings: AppSettings | None = None
         session: Session | None = None
@@ -154,7 +163,8 @@ async def periodic_sync_scheduler(initial_delay: int = 0):
         try:
             with Session(engine) as session:
                 # 调用被重构的、可测试的核心函数
-                app_settings = await _perform_sync_and_notify_actions(session)
+                full_sync = cycle_count % full_sync_every == 0
+                app_settings = await _perform_sync_and_notify_actions(session, full_sync=full_sync)
 
         except asyncio.CancelledError:
             # 捕获取消信号，正常退出循环
@@ -168,6 +178,8 @@ async def periodic_sync_scheduler(initial_delay: int = 0):
                 logger.info("Transaction has been rolled back due to an error.")
         
         finally:
+            cycle_count += 1
+
             # --- 智能休眠：无论任务成功、跳过或失败，都必须执行 ---
             sleep_seconds = 2 * 3600  # 默认休眠 2 小时
 
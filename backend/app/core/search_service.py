@@ -0,0 +1,115 @@
+"""
+基于 SQLite FTS5 全文索引的仓库搜索。
+索引表及其维护触发器在 db.create_db_and_tables 中创建，这里只负责把用户输入转换为 MATCH 查询，
+并按 bm25 相关性返回仓库、得分和高亮片段。
+"""
+import html
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.db import REPO_FTS_TABLE, get_search_tokenizer
+from app.core.search_tokenizer import TOKENIZER_NGRAM, build_match_query, split_query_terms
+from app.core.listing_service import repo_row_to_dict, select_repo_rows
+from app.models import Repo
+
+logger = logging.getLogger(__name__)
+
+# bm25 列权重，顺序与 db.REPO_FTS_COLUMNS 一致：name, full_name, alias, description, notes, ai_summary, tags
+BM25_WEIGHTS = (10.0, 5.0, 10.0, 2.0, 2.0, 2.5, 4.0)
+# 高亮片段包含的最多词元数
+SNIPPET_TOKENS = 12
+# snippet() 使用控制字符标记命中位置，转义 HTML 后再替换为 <mark> 标签，避免仓库文本中的 HTML 被原样输出
+_HIGHLIGHT_OPEN, _HIGHLIGHT_CLOSE = "\x02", "\x03"
+
+# ngram 模式下命中的是索引中追加的 bigram，高亮片段改为从仓库原文生成，取命中词前后的字符数
+SNIPPET_CONTEXT_CHARS = 30
+# 生成片段时检查的字段，顺序与 bm25 权重从高到低大致一致
+_SNIPPET_FIELDS = ("name", "alias", "full_name", "ai_summary", "description", "notes", "tags")
+
+
+def _highlight(snippet: Optional[str]) -> Optional[str]:
+    """转义片段中的 HTML，并把命中标记替换为 <mark> 标签。"""
+    if not snippet:
+        return None
+    escaped = html.escape(snippet, quote=False)
+    return escaped.replace(_HIGHLIGHT_OPEN, "<mark>").replace(_HIGHLIGHT_CLOSE, "</mark>")
+
+
+def _snippet_from_repo(repo: Dict[str, Any], terms: List[str]) -> Optional[str]:
+    """在仓库原文中找到第一个命中的字段，截取命中位置附近的文本，并以 <mark> 标记所有命中词。"""
+    if not terms:
+        return None
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    for field in _SNIPPET_FIELDS:
+        value = repo[field]
+        if field == "tags":
+            value = " ".join(value or [])
+        match = pattern.search(value) if value else None
+        if not match:
+            continue
+        start = max(0, match.start() - SNIPPET_CONTEXT_CHARS)
+        end = min(len(value), match.end() + SNIPPET_CONTEXT_CHARS)
+        marked = pattern.sub(lambda m: f"{_HIGHLIGHT_OPEN}{m.group()}{_HIGHLIGHT_CLOSE}", value[start:end])
+        return _highlight(("…" if start > 0 else "") + marked + ("…" if end < len(value) else ""))
+    return None
+
+
+def search_repos(session: Session, query: str, limit: int, offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    在全文索引中搜索仓库。
+    参数:
+        session: 数据库会话对象。
+        query: 用户输入的搜索词。
+        limit: 返回的最大结果数。
+        offset: 跳过的结果数，用于分页。
+    返回:
+        (匹配总数, 结果列表)。结果按相关性从高到低排列，每项包含 repo（与 RepoResponse 结构一致的字典）、score（越大越相关）和 snippet。
+    """
+    tokenizer = get_search_tokenizer()
+    match_query = build_match_query(query, tokenizer)
+    if match_query is None:
+        return 0, []
+
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    rows = session.exec(
+        text(
+            f"SELECT rowid AS id, bm25({REPO_FTS_TABLE}, {weights}) AS rank, "
+            f"snippet({REPO_FTS_TABLE}, -1, :open, :close, '…', :tokens) AS snippet "
+            f"FROM {REPO_FTS_TABLE} WHERE {REPO_FTS_TABLE} MATCH :query "
+            f"ORDER BY rank LIMIT :limit OFFSET :offset"
+        ),
+        params={
+            "open": _HIGHLIGHT_OPEN, "close": _HIGHLIGHT_CLOSE, "tokens": SNIPPET_TOKENS,
+            "query": match_query, "limit": limit, "offset": offset,
+        },
+    ).all()
+    total = session.exec(
+        text(f"SELECT count(*) FROM {REPO_FTS_TABLE} WHERE {REPO_FTS_TABLE} MATCH :query"),
+        params={"query": match_query},
+    ).scalar_one()
+
+    repos_by_id = {}
+    if rows:
+        repo_ids = [row.id for row in rows]
+        statement = select_repo_rows().where(Repo.id.in_(repo_ids))
+        repos_by_id = {repo["id"]: repo for repo in map(repo_row_to_dict, session.exec(statement).all())}
+
+    results = []
+    for row in rows:
+        repo = repos_by_id.get(row.id)
+        if repo is None:
+            # 索引与 repo 表由触发器保持一致，这里只是防御性检查
+            logger.warning(f"Search index contains repo {row.id} which no longer exists in the database.")
+            continue
+        if tokenizer == TOKENIZER_NGRAM:
+            snippet = _snippet_from_repo(repo, split_query_terms(query, tokenizer))
+        else:
+            snippet = _highlight(row.snippet)
+        # bm25() 越小越相关，取反后作为得分返回
+        results.append({"repo": repo, "score": -row.rank, "snippet": snippet})
+    logger.debug(f"Search '{query}' matched {total} repos, returned {len(results)}.")
+    return total, results
@@ -0,0 +1,80 @@
+"""
+全文搜索的中日韩文字 n-gram 切分。
+FTS5 的 unicode61 分词器把连续的中文当作一个词，无法按其中的词语检索；Python 的 sqlite3 又不能注册自定义分词器。
+因此 ngram 模式在写入索引时，把每个字段中的中日韩文字展开为相邻两字的 bigram（以空格分隔）追加到原文之后，再交给 unicode61 分词：
+"向量数据库" 额外索引为 "向量 量数 数据 据库 库"，末尾的单字使任意一个字都能作为前缀命中。
+展开由 cjk_ngrams_sql 生成的纯 SQL 表达式在触发器中完成，不依赖应用注册的自定义函数，
+任何连接（包括 sqlite3 命令行和备份脚本）写入 repo 表都会正常维护索引。
+查询时对搜索词做同样的切分，多字词语转换为 bigram 短语查询，从而直接命中索引。
+本模块不依赖应用的其他部分。
+"""
+import re
+from typing import List, Optional
+
+# 支持的分词模式
+TOKENIZER_UNICODE61 = "unicode61"
+TOKENIZER_NGRAM = "ngram"
+SUPPORTED_TOKENIZERS = (TOKENIZER_UNICODE61, TOKENIZER_NGRAM)
+
+# 中日韩文字的码位范围：日文假名、CJK 统一表意文字扩展 A、CJK 统一表意文字、韩文音节、兼容表意文字。
+# 这些字符在 UTF-8 中都占 3 个字节，cjk_ngrams_sql 依赖这一点按字节定位。
+CJK_RANGES = ((0x3040, 0x30FF), (0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xAC00, 0xD7AF), (0xF900, 0xFAFF))
+
+_CJK_CHARS = "".join(f"{chr(start)}-{chr(end)}" for start, end in CJK_RANGES)
+_CJK_RUN_PATTERN = re.compile(f"[{_CJK_CHARS}]+")
+_QUERY_TERM_PATTERN = re.compile(f"[{_CJK_CHARS}]+|[^\\W{_CJK_CHARS}]+")
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def _bigrams(run: str) -> List[str]:
+    """返回一段连续中日韩文字的相邻两字切分结果。"""
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def _is_cjk_sql(code_point: str) -> str:
+    """判断码位表达式是否为中日韩文字的 SQL 条件。"""
+    return "(" + " OR ".join(f"{code_point} BETWEEN {start} AND {end}" for start, end in CJK_RANGES) + ")"
+
+
+def cjk_ngrams_sql(value: str) -> str:
+    """
+    生成把 value（SQL 表达式）中的中日韩文字展开为 bigram 的 SQL 表达式，结果与 Python 的切分方式一致：
+    每段连续的中日韩文字输出相邻两字的 bigram，并以该段的最后一个字结尾，以空格分隔；不含中日韩文字时为 NULL。
+    触发器中不能使用 WITH 递归查询，因此用 json_each 遍历一个与 value 的 UTF-8 字节数等长的数组来生成位置序列。
+    按字节截取的 substr 是常数时间，整体耗时与文本长度成正比；只有 UTF-8 首字节为 E3-EF 的位置才需要解码判断，
+    不含中日韩文字的值由 GLOB 直接跳过。
+    """
+    text_bytes = f"CAST({value} AS BLOB)"
+    positions = f"json_each('[' || rtrim(replace(printf('%.*c', length(b), 'x'), 'x', '0,'), ',') || ']')"
+    return (
+        f"CASE WHEN {value} GLOB '*[{_CJK_CHARS}]*' THEN ("
+        f"SELECT group_concat(CAST(substr(b, pos, CASE WHEN {_is_cjk_sql('next')} THEN 6 ELSE 3 END) AS TEXT), ' ') "
+        f"FROM (SELECT b, key + 1 AS pos, unicode(CAST(substr(b, key + 1, 3) AS TEXT)) AS current, "
+        f"unicode(CAST(substr(b, key + 4, 3) AS TEXT)) AS next "
+        f"FROM (SELECT {text_bytes} AS b LIMIT 1), {positions} "
+        f"WHERE substr(b, key + 1, 1) BETWEEN x'E3' AND x'EF') "
+        f"WHERE {_is_cjk_sql('current')}) END"
+    )
+
+
+def split_query_terms(query: str, tokenizer: str) -> List[str]:
+    """把用户输入拆分为搜索词，ngram 模式下中日韩文字与相邻的其他文字分开。"""
+    if tokenizer == TOKENIZER_NGRAM:
+        return _QUERY_TERM_PATTERN.findall(query)
+    return _WORD_PATTERN.findall(query)
+
+
+def build_match_query(query: str, tokenizer: str) -> Optional[str]:
+    """
+    将用户输入转换为 FTS5 MATCH 表达式。
+    每个词作为带引号的前缀查询（"词"*），多个词之间为 AND 关系；ngram 模式下多字的中日韩词语转换为
+    bigram 短语（"数据 据库"），要求在索引中相邻出现，等价于子串匹配。
+    FTS5 查询语法中的运算符和标点都被忽略，因此任意输入都不会导致语法错误。没有可搜索的词时返回 None。
+    """
+    expressions = []
+    for term in split_query_terms(query, tokenizer):
+        if tokenizer == TOKENIZER_NGRAM and len(term) > 1 and _CJK_RUN_PATTERN.fullmatch(term):
+            expressions.append('"' + " ".join(_bigrams(term)) + '"')
+        else:
+            expressions.append(f'"{term}"*')
+    return " ".join(expressions) or None
@@ -0,0 +1,68 @@
+"""
+GET /api/stars 响应体的进程内缓存。
+完整列表的序列化需要对每个仓库做 Pydantic 校验和 JSON 编码，仓库较多时是接口的主要 CPU 开销。
+响应内容只取决于数据版本号（repo 表的任何写入都会使其递增，见 db._CHANGE_TRACKING_TRIGGERS）
+和用户自定义的标签/语言排序，因此以二者为键缓存序列化后的字节和对应的强 ETag：
+- 键不变时直接返回缓存的字节，客户端携带匹配的 If-None-Match 时返回 304。
+- 任何写入都会改变键，下次请求时重新生成，不需要在各个写入路径中手动失效。
+"""
+import hashlib
+import logging
+from typing import Dict, Hashable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CachedPayload(NamedTuple):
+    """一份缓存的响应体。"""
+    key: Hashable   # 生成时的缓存键
+    etag: str       # 带引号的强 ETag
+    body: bytes     # 序列化后的 JSON 响应体
+
+
+def make_etag(body: bytes) -> str:
+    """根据响应体内容生成强 ETag。"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断请求的 If-None-Match 头是否与 etag 匹配（支持多个值、弱比较前缀 W/ 和 *）。"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class StarsPayloadCache:
+    """
+    每种响应形式（slot，例如 full 和 compact 视图）只保存最新一份响应体的缓存；
+    键变化后旧内容不会再被使用，直接替换。
+    """
+
+    def __init__(self):
+        self._payloads: Dict[Hashable, CachedPayload] = {}
+
+    def get(self, slot: Hashable, key: Hashable) -> Optional[CachedPayload]:
+        """返回 slot 中与 key 对应的缓存，不存在或已过期时返回 None。"""
+        payload = self._payloads.get(slot)
+        if payload is not None and payload.key == key:
+            return payload
+        return None
+
+    def store(self, slot: Hashable, key: Hashable, body: bytes) -> CachedPayload:
+        """保存新生成的响应体并返回缓存条目。"""
+        payload = CachedPayload(key=key, etag=make_etag(body), body=body)
+        self._payloads[slot] = payload
+        logger.debug(f"Cached /api/stars payload ({slot}) for key {key}: {len(body)} bytes, ETag {payload.etag}")
+        return payload
+
+    def clear(self):
+        """清空缓存。"""
+        self._payloads.clear()
+
+
+# 全局唯一的 /api/stars 响应缓存实例
+stars_payload_cache = StarsPayloadCache()
@@ -0,0 +1,269 @@
+"""
+持久化的 AI 总结任务队列。
+任务（SummaryJob）和其中每个仓库的状态（SummaryJobItem）保存在数据库中，由应用启动时创建的后台 worker 依次处理：
+- 每个仓库处理完成后立即写入结果，/api/summary/status 直接统计数据库中的实时进度。
+- 可重试的失败按退避时间设置 retry_at，到期后重新处理，超过最大尝试次数后标记为失败。
+- 服务重启时，处于 running 状态的仓库恢复为 pending，worker 从中断处继续执行未完成的任务。
+"""
+import asyncio
+import logging
+from datetime import timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.exceptions import InvalidApiKeyError, InvalidGitHubTokenError
+from app.models import Repo, SummaryJob, SummaryJobItem, utc_now
+from app.core.settings_service import get_app_settings
+from app.core.summary_service import summarize_repos_batch
+
+logger = logging.getLogger(__name__)
+
+# 任务和仓库的状态
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+ACTIVE_JOB_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+# 单个仓库最多尝试的次数，以及第 n 次失败后等待的秒数（超出列表长度时使用最后一项）
+MAX_ATTEMPTS = 3
+RETRY_DELAYS_SECONDS = (60, 300)
+
+# 导致整个任务中止的致命错误
+_FATAL_ERRORS = (InvalidApiKeyError, InvalidGitHubTokenError)
+
+
+def get_active_job(session: Session) -> Optional[SummaryJob]:
+    """返回最早创建的未完成任务（pending 或 running），没有时返回 None。"""
+    statement = select(SummaryJob).where(SummaryJob.status.in_(ACTIVE_JOB_STATUSES)).order_by(SummaryJob.id)
+    return session.exec(statement).first()
+
+
+def enqueue_summary_job(session: Session, mode: str, repo_ids: List[int]) -> Optional[SummaryJob]:
+    """
+    创建一个总结任务，已在其他未完成任务中等待处理的仓库不会重复加入。
+    只暂存更改，由调用方提交后再调用 summary_worker.notify 唤醒 worker。
+    返回:
+        新建的任务；没有需要加入的仓库时返回 None。
+    """
+    queued_ids = set(session.exec(
+        select(SummaryJobItem.repo_id)
+        .join(SummaryJob, SummaryJob.id == SummaryJobItem.job_id)
+        .where(SummaryJob.status.in_(ACTIVE_JOB_STATUSES), SummaryJobItem.status.in_(ACTIVE_JOB_STATUSES))
+    ).all())
+    new_ids = list(dict.fromkeys(repo_id for repo_id in repo_ids if repo_id not in queued_ids))
+    if not new_ids:
+        return None
+
+    job = SummaryJob(mode=mode, total=len(new_ids))
+    session.add(job)
+    session.flush()
+    session.add_all(SummaryJobItem(job_id=job.id, repo_id=repo_id) for repo_id in new_ids)
+    logger.info(f"Summary job {job.id} ({mode}) staged with {len(new_ids)} repos.")
+    return job
+
+
+def get_job_progress(session: Session, job: SummaryJob) -> Dict[str, int]:
+    """统计任务中各状态的仓库数量，返回 {total, completed, failed, pending, running}。"""
+    counts = dict(session.exec(
+        select(SummaryJobItem.status, func.count()).where(SummaryJobItem.job_id == job.id).group_by(SummaryJobItem.status)
+    ).all())
+    return {
+        "total": job.total,
+        "completed": counts.get(STATUS_DONE, 0),
+        "failed": counts.get(STATUS_FAILED, 0),
+        "pending": counts.get(STATUS_PENDING, 0),
+        "running": counts.get(STATUS_RUNNING, 0),
+    }
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """第 attempts 次失败后的重试等待时间。"""
+    return timedelta(seconds=RETRY_DELAYS_SECONDS[min(attempts, len(RETRY_DELAYS_SECONDS)) - 1])
+
+
+def _record_result(job_id: int, repo: Repo, result: Union[bool, BaseException]):
+    """把单个仓库的处理结果写入任务表。"""
+    if isinstance(result, _FATAL_ERRORS):
+        # 致命错误会中止整个任务，仓库保持 running，由任务的失败处理统一恢复为 pending
+        return
+    with Session(engine) as session:
+        item = session.get(SummaryJobItem, (job_id, repo.id))
+        if item is None:
+            return
+        item.attempts += 1
+        item.updated_at = utc_now()
+        if result is True:
+            item.status, item.retry_at, item.error = STATUS_DONE, None, None
+        else:
+            item.error = str(result) if isinstance(result, BaseException) else None
+            # summarize_single_repo 对不可修复的错误会写入 analyzed_at（不再重试），其余失败都可以重试
+            db_repo = session.get(Repo, repo.id)
+            permanent = db_repo is None or db_repo.analyzed_at is not None
+            if permanent or item.attempts >= MAX_ATTEMPTS:
+                item.status, item.retry_at = STATUS_FAILED, None
+            else:
+                item.status, item.retry_at = STATUS_PENDING, utc_now() + _retry_delay(item.attempts)
+        session.add(item)
+        session.commit()
+
+
+class SummaryWorker:
+    """
+    在后台依次执行总结任务的常驻协程。
+    有新任务时通过 notify 唤醒；任务中还有等待重试的仓库时休眠到最早的重试时间。
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # auto 模式在筛选时已经下载的 README，只保存在内存中，重启后重新下载
+        self._readme_caches: Dict[int, Dict[int, Tuple[Optional[str], Optional[str]]]] = {}
+
+    def start(self):
+        """恢复上次中断的任务并启动 worker。在应用启动时调用。"""
+        if self._task is not None:
+            return
+        with Session(engine) as session:
+            recovered = session.exec(
+                update(SummaryJobItem)
+                .where(SummaryJobItem.status == STATUS_RUNNING)
+                .values(status=STATUS_PENDING, updated_at=utc_now())
+            ).rowcount
+            session.commit()
+            if recovered:
+                logger.info(f"Recovered {recovered} interrupted summary items, they will be processed again.")
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Summary worker started.")
+
+    async def stop(self):
+        """停止 worker。正在处理的仓库保持 running，下次启动时恢复。"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Summary worker stopped.")
+
+    def notify(self, job_id: Optional[int] = None,
+               readme_cache: Optional[Dict[int, Tuple[Optional[str], Optional[str]]]] = None):
+        """有新任务时唤醒 worker，可以附带该任务已预取的 README。"""
+        if job_id is not None and readme_cache:
+            self._readme_caches[job_id] = readme_cache
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                delay = await self._process_next_job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Unexpected error in summary worker: {e}", exc_info=True)
+                delay = RETRY_DELAYS_SECONDS[0]
+            if delay == 0:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _process_next_job(self) -> Optional[float]:
+        """
+        处理最早的未完成任务中所有已到期的仓库。
+        返回:
+            下一次需要检查的等待秒数：0 表示立即继续，None 表示没有任务、等待唤醒。
+        """
+        with Session(engine) as session:
+            job = get_active_job(session)
+            if job is None:
+                return None
+            now = utc_now()
+            if job.status == STATUS_PENDING:
+                job.status, job.started_at = STATUS_RUNNING, now
+                session.add(job)
+
+            due_ids = list(session.exec(
+                select(SummaryJobItem.repo_id).where(
+                    SummaryJobItem.job_id == job.id,
+                    SummaryJobItem.status == STATUS_PENDING,
+                    (SummaryJobItem.retry_at == None) | (SummaryJobItem.retry_at <= now),
+                )
+            ).all())
+            if not due_ids:
+                next_retry = session.exec(
+                    select(func.min(SummaryJobItem.retry_at))
+                    .where(SummaryJobItem.job_id == job.id, SummaryJobItem.status == STATUS_PENDING)
+                ).one()
+                if next_retry is not None:
+                    session.commit()
+                    # 时间以 UTC 存储，数据库返回不带时区的值时按 UTC 解释
+                    if next_retry.tzinfo is None:
+                        next_retry = next_retry.replace(tzinfo=timezone.utc)
+                    return max(1.0, (next_retry - utc_now()).total_seconds())
+                self._finish_job(session, job, STATUS_DONE)
+                return 0
+
+            session.exec(
+                update(SummaryJobItem)
+                .where(SummaryJobItem.job_id == job.id, SummaryJobItem.repo_id.in_(due_ids))
+                .values(status=STATUS_RUNNING, updated_at=now)
+            )
+
+            job_id = job.id
+            # 加入任务后被取消收藏的仓库直接标记为失败
+            missing_ids = set(due_ids) - set(session.exec(select(Repo.id).where(Repo.id.in_(due_ids))).all())
+            if missing_ids:
+                session.exec(
+                    update(SummaryJobItem)
+                    .where(SummaryJobItem.job_id == job_id, SummaryJobItem.repo_id.in_(missing_ids))
+                    .values(status=STATUS_FAILED, error="repository no longer exists", updated_at=now)
+                )
+            session.commit()
+
+            # 提交之后再加载仓库和设置，会话关闭后这些对象仍可在整个任务期间使用
+            repos = list(session.exec(select(Repo).where(Repo.id.in_(due_ids))).all())
+            settings = get_app_settings(session)
+            session.refresh(settings)
+
+        logger.info(f"Summary job {job_id}: processing {len(repos)} repos.")
+        try:
+            await summarize_repos_batch(
+                repos, settings, self._readme_caches.get(job_id),
+                on_result=lambda repo, result: _record_result(job_id, repo, result),
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 配置缺失或 API 密钥、GitHub Token 无效：中止任务，未处理的仓库恢复为 pending 便于查看
+            logger.error(f"Summary job {job_id} aborted: {e}")
+            with Session(engine) as session:
+                session.exec(
+                    update(SummaryJobItem)
+                    .where(SummaryJobItem.job_id == job_id, SummaryJobItem.status == STATUS_RUNNING)
+                    .values(status=STATUS_PENDING, updated_at=utc_now())
+                )
+                self._finish_job(session, session.get(SummaryJob, job_id), STATUS_FAILED, error=str(e))
+        return 0
+
+    def _finish_job(self, session: Session, job: SummaryJob, status: str, error: Optional[str] = None):
+        """结束任务并提交。"""
+        job.status, job.error, job.finished_at = status, error, utc_now()
+        session.add(job)
+        session.commit()
+        self._readme_caches.pop(job.id, None)
+        progress = get_job_progress(session, job)
+        logger.info(f"Summary job {job.id} finished with status '{status}': {progress}")
+
+
+# 全局唯一的总结任务 worker
+summary_worker = SummaryWorker()
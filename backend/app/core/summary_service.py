@@ -1,13 +1,15 @@
 """
 总结任务服务：负责批量总结仓库的核心逻辑
+批量总结分为两个阶段：README 预取和 AI 调用，各自有独立的并发数，中间通过有界队列衔接，
+GitHub 和 AI 接口的等待时间相互重叠，整体速度取决于较慢的阶段。
 """
 import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from sqlmodel import Session, select
 
-from app.models import Repo, AppSettings
+from app.config import settings as app_config
+from app.models import Repo, AppSettings, utc_now
 from app.core.ai_service import AIService
 from app.core.readme_service import get_readme_content
 from app.core.notifiers.factory import create_notifier
@@ -108,18 +110,30 @@ async def get_repos_to_summarize(
             raise ValueError(f"未知的总结模式：{mode}")
 
 
+# 单个仓库处理完成后的回调，参数为仓库和 summarize_single_repo 的结果（成功/失败或抛出的异常）
+SummaryResultCallback = Callable[[Repo, Union[bool, BaseException]], None]
+
+# 预取的 README：(content, sha)，获取失败时为异常对象，交给 summarize_single_repo 按错误类型处理
+PrefetchedReadme = Union[Tuple[Optional[str], Optional[str]], BaseException]
+
+
 async def summarize_repos_batch(
     repos: List[Repo],
     settings: AppSettings,
-    readme_cache: Optional[Dict[int, Tuple[Optional[str], Optional[str]]]] = None
+    readme_cache: Optional[Dict[int, Tuple[Optional[str], Optional[str]]]] = None,
+    on_result: Optional[SummaryResultCallback] = None
 ) -> dict:
     """
     批量总结仓库
+    SUMMARY_README_CONCURRENCY 个预取协程提前获取 README 放入有界队列，
+    settings.ai_concurrency 个 AI 槽位从队列领取仓库，任一槽位空闲后立即开始下一个仓库。
+    调用速率由 AI 接口共享的速率限制器按 RPM/TPM 控制，不再使用固定的组间和批次间等待。
 
     Args:
         repos: 需要总结的仓库列表
         settings: 应用设置
         readme_cache: 预取的 README 缓存（auto 模式下由 get_repos_to_summarize 提供）
+        on_result: 每个仓库处理完成后立即调用，用于实时记录进度
 
     Returns:
         总结结果统计
@@ -158,12 +172,54 @@ async def summarize_repos_batch(
     success_count = 0
     failed_count = 0
 
-    # 获取并发数
-    concurrency = settings.ai_concurrency
-
-    # 分批处理
-    batch_size = 50
-    logger.info(f"开始批量总结，共 {total} 个仓库，并发数：{concurrency}")
+    # 两个阶段的并发数：AI 调用的速率另由 AIService 共享的速率限制器控制，README 请求经过 GitHub 调度器
+    concurrency = max(1, min(settings.ai_concurrency, total))
+    readme_concurrency = max(1, min(app_config.SUMMARY_README_CONCURRENCY, total))
+    logger.info(f"开始批量总结，共 {total} 个仓库，AI 并发数：{concurrency}，README 预取并发数：{readme_concurrency}")
+
+    pending_repos = iter(repos)
+    # 有界队列：README 预取最多领先 AI 调用队列容量个仓库，避免占用过多内存
+    prefetched: asyncio.Queue = asyncio.Queue(maxsize=2 * (concurrency + readme_concurrency))
+
+    async def prefetch_worker():
+        """第一阶段：获取 README 放入队列，队列已满时等待 AI 阶段消费。"""
+        for repo in pending_repos:
+            if readme_cache and repo.id in readme_cache:
+                readme = readme_cache[repo.id]
+            else:
+                try:
+                    readme = await get_readme_content(repo.full_name, github_token)
+                except Exception as e:
+                    readme = e
+            await prefetched.put((repo, readme))
+
+    async def close_queue():
+        """所有 README 预取完成后，为每个 AI 槽位放入一个结束标记。"""
+        await asyncio.gather(*prefetchers)
+        for _ in range(concurrency):
+            await prefetched.put(None)
+
+    async def ai_worker():
+        """第二阶段：一个 AI 并发槽位，处理完一个仓库后立即从队列领取下一个。"""
+        nonlocal success_count, failed_count
+        while (item := await prefetched.get()) is not None:
+            repo, readme = item
+            try:
+                result = await summarize_single_repo(repo, github_token, settings, ai_service, readme=readme)
+            except Exception as e:
+                result = e
+            if on_result:
+                on_result(repo, result)
+            if isinstance(result, Exception):
+                failed_count += 1
+                # 致命错误：API 密钥无效或 GitHub Token 无效，停止整个批量任务
+                if isinstance(result, (InvalidApiKeyError, InvalidGitHubTokenError)):
+                    logger.error(f"致命错误，停止总结：{result}")
+                    raise result
+            elif result:
+                success_count += 1
+            else:
+                failed_count += 1
 
     # 创建共享的 AIService 实例，复用连接池
     async with AIService(
@@ -172,42 +228,17 @@ async def summarize_repos_batch(
         model=settings.ai_model,
         language=settings.ui_language
     ) as ai_service:
-        for batch_idx in range(0, total, batch_size):
-            batch_repos = repos[batch_idx:batch_idx + batch_size]
-            batch_num = batch_idx // batch_size + 1
-            logger.info(f"处理批次 {batch_num}，共 {len(batch_repos)} 个仓库")
-
-            # 并发处理当前批次
-            for i in range(0, len(batch_repos), concurrency):
-                concurrent_repos = batch_repos[i:i + concurrency]
-                tasks = [
-                    summarize_single_repo(repo, github_token, settings, ai_service, readme_cache)
-                    for repo in concurrent_repos
-                ]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                # 统计结果
-                for result in results:
-                    if isinstance(result, Exception):
-                        failed_count += 1
-                        # 致命错误：API 密钥无效或 GitHub Token 无效，停止整个批量任务
-                        if isinstance(result, (InvalidApiKeyError, InvalidGitHubTokenError)):
-                            logger.error(f"致命错误，停止总结：{result}")
-                            raise result
-                    elif result:
-                        success_count += 1
-                    else:
-                        failed_count += 1
-
-                # 并发组间延迟
-                if i + concurrency < len(batch_repos):
-                    logger.info("并发组完成，等待 20 秒...")
-                    await asyncio.sleep(20)
-
-            # 批次间延迟
-            if batch_idx + batch_size < total:
-                logger.info(f"批次 {batch_num} 完成，等待 60 秒...")
-                await asyncio.sleep(60)
+        prefetchers = [asyncio.create_task(prefetch_worker()) for _ in range(readme_concurrency)]
+        workers = [asyncio.create_task(ai_worker()) for _ in range(concurrency)]
+        closer = asyncio.create_task(close_queue())
+        tasks = prefetchers + workers + [closer]
+        try:
+            await asyncio.gather(*workers, closer)
+        finally:
+            # 出现致命错误或任务被取消时，停止两个阶段的所有任务
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     logger.info(f"批量总结完成：总数 {total}，成功 {success_count}，失败 {failed_count}")
     return {"total": total, "success": success_count, "failed": failed_count}
@@ -218,7 +249,8 @@ async def summarize_single_repo(
     github_token: str,
     settings: AppSettings,
     ai_service: AIService,
-    readme_cache: Optional[Dict[int, Tuple[Optional[str], Optional[str]]]] = None
+    readme_cache: Optional[Dict[int, Tuple[Optional[str], Optional[str]]]] = None,
+    readme: Optional[PrefetchedReadme] = None
 ) -> bool:
     """
     总结单个仓库的完整流程
@@ -229,6 +261,7 @@ async def summarize_single_repo(
         settings: 应用设置（用于发送通知）
         ai_service: 共享的 AI 服务实例
         readme_cache: 预取的 README 缓存
+        readme: 批量总结的预取阶段已获取的 README（或获取时的异常），提供时不再请求 GitHub
 
     Returns:
         True: 总结成功
@@ -237,8 +270,13 @@ async def summarize_single_repo(
     logger.info(f"开始总结仓库：{repo.full_name}")
 
     try:
-        # 步骤 1：优先使用预取的 README 缓存，否则请求 GitHub API
-        if readme_cache and repo.id in readme_cache:
+        # 步骤 1：优先使用预取的 README，否则请求 GitHub API
+        if isinstance(readme, BaseException):
+            # 预取阶段的异常在这里抛出，与直接请求时的失败走相同的处理
+            raise readme
+        if readme is not None:
+            readme_content, readme_sha = readme
+        elif readme_cache and repo.id in readme_cache:
             readme_content, readme_sha = readme_cache[repo.id]
             logger.info(f"使用预取的 README：{repo.full_name}")
         else:
@@ -253,7 +291,7 @@ async def summarize_single_repo(
                 db_repo = session.get(Repo, repo.id)
                 if db_repo:
                     db_repo.ai_summary = None
-                    db_repo.analyzed_at = datetime.now()
+                    db_repo.analyzed_at = utc_now()
                     db_repo.analysis_failed = False
                     db_repo.readme_sha = None
                     session.add(db_repo)
@@ -284,7 +322,7 @@ async def summarize_single_repo(
                     return False
 
                 db_repo.ai_summary = summary
-                db_repo.analyzed_at = datetime.now()
+                db_repo.analyzed_at = utc_now()
                 db_repo.analysis_failed = False
                 db_repo.readme_sha = readme_sha
                 session.add(db_repo)
@@ -321,7 +359,7 @@ async def summarize_single_repo(
             db_repo = session.get(Repo, repo.id)
             if db_repo:
                 db_repo.analysis_failed = True
-                db_repo.analyzed_at = datetime.now()
+                db_repo.analyzed_at = utc_now()
                 session.add(db_repo)
                 session.commit()
         logger.error(f"AI 返回内容异常，标记为失败且不再重试：{repo.full_name}")
@@ -2,14 +2,22 @@
 核心同步服务逻辑。
 负责执行从 GitHub 到本地数据库的数据同步流程。
 包括获取远程数据、与本地数据进行比对、准备数据库操作（增、删、改）。
+提供两种同步模式：
+- 完整同步 (run_full_sync): 拉取全部星标，处理新增、取消收藏和元数据刷新。
+- 增量同步 (run_incremental_sync): 只拉取比本地最新收藏更新的星标，通常只需一到两次请求。
 """
+import time
+import hashlib
 import logging
+import operator
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
-from sqlmodel import Session, select, delete
+from typing import Any, Callable, Dict, List, Tuple, Optional, Set
+from sqlmodel import Session, select, delete, update, func
+from sqlalchemy import Row
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-from app.models import Repo
-from app.core.github import GitHubApiClient
+from app.models import Repo, StarPageCache, utc_now
+from app.core.github import StarPage, StarRecord, create_github_client
 from app.exceptions import ApiException
 from fastapi import status
 
@@ -18,98 +26,269 @@ logger = logging.getLogger(__name__)
 # 在内存中存储上次成功同步的时间戳
 LAST_SUCCESSFUL_SYNC_AT: Optional[datetime] = None
 
-def _diff_and_prepare_operations(
-    github_repos_data: List[Dict],
-    db_repos: List[Repo]
-) -> Tuple[List[Dict], List[Repo], List[int], List[Repo], List[int], Dict[int, Optional[str]]]:
+def _load_page_cache(session: Session) -> Dict[int, Dict[str, Any]]:
     """
-    比对 GitHub 数据和本地数据，生成数据库操作指令。
-    参数:
-        github_repos_data: 从 GitHub API 获取的仓库数据列表。
-        db_repos: 从本地数据库查询出的仓库对象列表。
-    返回:
-        一个元组，包含:
-        - to_add (List[Dict]): 需要新增的仓库的数据字典列表。
-        - to_update (List[Repo]): 需要更新的所有仓库对象列表。
-        - to_remove_ids (List[int]): 需要删除的仓库 ID 列表。
-        - substantive_updated_repos (List[Repo]): 发生了实质性更新的仓库对象列表，用于发送通知。
-        - pushed_at_changed_ids (List[int]): pushed_at 变化的仓库 ID 列表，用于 AI 总结。
-        - old_pushed_at_map (Dict[int, Optional[str]]): 仓库 ID 到旧 pushed_at 值的映射，用于获取 commit 列表。
+    从数据库读取 GitHub 星标分页缓存的元数据（etag、body_hash），转换为 GitHubApiClient 使用的字典格式。
+    页面数据本身不预先加载，只在 GitHub 返回 304 时由 _load_cached_page 按需读取。
+    临时页面（provisional）所属的同步没有提交，本地数据可能与之不一致，不参与条件请求，下次同步重新下载。
     """
-    logger.info("Starting diff calculation...")
+    rows = session.exec(
+        select(StarPageCache.page, StarPageCache.etag, StarPageCache.body_hash)
+        .where(StarPageCache.provisional.is_not(True))
+    ).all()
+    return {page: {"etag": etag, "body_hash": body_hash} for page, etag, body_hash in rows}
+
+def _load_cached_page(session: Session, page: int) -> Optional[List[StarRecord]]:
+    """读取单个缓存页面的星标记录，缓存不存在时返回 None。"""
+    items = session.exec(select(StarPageCache.items).where(StarPageCache.page == page)).first()
+    if items is None:
+        return None
+    return [StarRecord(**item) for item in items]
+
+def _save_provisional_page(session: Session, star_page: StarPage):
+    """
+    将一个重新下载的页面标记为临时页面写入缓存。使用独立的会话并立即提交，写锁只持有一次 upsert 的时间，
+    页面数据写入后即可释放，内存中不需要保留。同步提交时由 _confirm_page_cache 清除临时标记。
+    """
+    cache_table = StarPageCache.__table__
+    statement = sqlite_insert(cache_table).values(
+        page=star_page.page,
+        etag=star_page.cache_entry["etag"],
+        body_hash=star_page.cache_entry["body_hash"],
+        items=[record._asdict() for record in star_page.records],
+        fetched_at=utc_now(),
+        provisional=True,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[cache_table.c.page],
+        set_={key: statement.excluded[key] for key in ("etag", "body_hash", "items", "fetched_at", "provisional")},
+    )
+    with Session(session.get_bind()) as cache_session:
+        cache_session.exec(statement)
+        cache_session.commit()
+
+def _confirm_page_cache(session: Session, pages: List[int]):
+    """清除本次同步写入页面的临时标记。只暂存更改，不提交事务，与同步数据在同一事务中提交或回滚。"""
+    for start in range(0, len(pages), 500):
+        session.exec(
+            update(StarPageCache)
+            .where(StarPageCache.page.in_(pages[start:start + 500]))
+            .values(provisional=None)
+        )
+
+# 从 GitHub 同步、需要随比对结果写回的字段（不含 owner 信息，与比对范围一致）
+SYNCED_UPDATE_FIELDS = ['name', 'full_name', 'description', 'language', 'html_url', 'pushed_at', 'stargazers_count', 'starred_at']
+# 指纹不一致时，每次按主键批量读取完整比对列的仓库数量
+DIFF_ROWS_BATCH_SIZE = 500
 
-    # 将列表转换为以 repo.id 为键的字典，以提高查找效率
-    github_repos_map = {repo['id']: repo for repo in github_repos_data}
-    db_repos_map = {repo.id: repo for repo in db_repos}
+_get_synced_values = operator.attrgetter(*SYNCED_UPDATE_FIELDS)
 
-    # 提取两边的 ID 集合，用于快速计算差集
-    github_ids = set(github_repos_map.keys())
-    db_ids = set(db_repos_map.keys())
+def _content_hash(record: StarRecord) -> str:
+    """计算一条星标记录中同步字段的稳定指纹，与 Repo.content_hash 比较即可判断仓库是否变化。"""
+    # 同步字段只包含 str、int 和 None，其 repr 是稳定的，比 json.dumps 快一倍以上
+    payload = repr(_get_synced_values(record))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+def _select_content_hashes(session: Session, repo_ids: Optional[List[int]] = None) -> Dict[int, Optional[str]]:
+    """
+    读取本地仓库的 id 和同步字段指纹，作为比对的第一步。
+    参数:
+        repo_ids: 只读取这些仓库；为 None 时读取全部。
+    """
+    statement = select(Repo.id, Repo.content_hash)
+    if repo_ids is not None:
+        statement = statement.where(Repo.id.in_(repo_ids))
+    return dict(session.exec(statement).all())
 
-    add_ids = github_ids - db_ids
-    remove_ids = db_ids - github_ids
-    common_ids = github_ids.intersection(db_ids)
+def _select_diff_rows(session: Session, repo_ids: List[int]) -> List[Row]:
+    """
+    以轻量元组读取指定仓库参与逐字段比对的数据：只包含 id 和 SYNCED_UPDATE_FIELDS，
+    不加载 notes、ai_summary、tags 等用户数据，比对的内存和耗时不随用户编写的内容增长。
+    """
+    statement = select(Repo.id, *(getattr(Repo, field) for field in SYNCED_UPDATE_FIELDS)).where(Repo.id.in_(repo_ids))
+    return list(session.exec(statement).all())
 
-    # 准备新增和删除列表
-    to_add = [github_repos_map[id] for id in add_ids]
-    to_remove_ids = list(remove_ids)
-    
-    to_update: List[Repo] = []
-    substantive_updated_repos: List[Repo] = []
-    pushed_at_changed_ids: List[int] = []  # 记录 pushed_at 变化的仓库 ID
-    old_pushed_at_map: Dict[int, Optional[str]] = {}  # 保存旧 pushed_at 值，用于获取 commit 列表
+class _StarDiff:
+    """
+    增量式的比对器：逐页接收 GitHub 星标记录，与本地数据比对并累积数据库操作指令。
+    1. 每个仓库先只比较一次同步字段指纹（content_hash），指纹一致即视为未变化。
+    2. 指纹不一致的仓库在 result() 中按批读取本地的比对列，再逐字段比对，判断是否为实质性更新。
+    只保留新增仓库的记录和有变化仓库的更新行，不需要先把全部星标收集到内存中。
+    """
 
     # 定义"实质性更新"字段，这些字段的变化会触发通知
     substantive_fields = ['name', 'full_name', 'description', 'language', 'html_url', 'pushed_at']
 
-    # 遍历共同的仓库，检查更新
-    for repo_id in common_ids:
-        github_repo = github_repos_map[repo_id]
-        db_repo = db_repos_map[repo_id]
+    def __init__(self, db_hashes: Dict[int, Optional[str]], load_rows: Callable[[List[int]], List[Row]]):
+        """
+        参数:
+            db_hashes: 本地仓库 ID 到 content_hash 的映射。
+            load_rows: 按仓库 ID 列表读取比对列的回调（通常为 _select_diff_rows）。
+        """
+        self.db_hashes = db_hashes
+        self.load_rows = load_rows
+        self.seen_ids: Set[int] = set()  # 已经从 GitHub 收到的仓库 ID，用于计算删除和去重
+        self.total_from_github = 0
+        # 指纹不一致、等待逐字段比对的仓库：id -> (GitHub 记录, 新指纹)
+        self._pending: Dict[int, Tuple[StarRecord, str]] = {}
 
-        has_substantive_update = False
-        pushed_at_changed = False
+        self.to_add: List[Dict] = []
+        self.to_update: List[Dict] = []
+        self.substantive_updated_ids: List[int] = []
+        self.pushed_at_changed_ids: List[int] = []  # 记录 pushed_at 变化的仓库 ID
+        self.old_pushed_at_map: Dict[int, Optional[str]] = {}  # 保存旧 pushed_at 值，用于获取 commit 列表
 
-        # 检查实质性字段是否有变化
-        for field in substantive_fields:
-            if getattr(db_repo, field) != github_repo.get(field):
-                # 在覆写前保存旧 pushed_at 值
-                if field == 'pushed_at':
-                    old_pushed_at_map[repo_id] = getattr(db_repo, field)
-                setattr(db_repo, field, github_repo.get(field))
-                has_substantive_update = True
+    def feed(self, records: List[StarRecord], unchanged: bool = False):
+        """
+        比对一批 GitHub 星标记录。
+        参数:
+            records: 清理后的星标记录。
+            unchanged: 这批记录来自未变化的页面（304 或内容哈希一致），已有指纹的仓库直接跳过。
+        """
+        db_hashes = self.db_hashes
+        for record in records:
+            repo_id = record.id
+            if repo_id in self.seen_ids:
+                # 同步过程中收藏列表发生变化时，同一仓库可能出现在两个页面中
+                continue
+            self.seen_ids.add(repo_id)
+            self.total_from_github += 1
 
-                # 记录 pushed_at 变化
-                if field == 'pushed_at':
-                    pushed_at_changed = True
+            if repo_id not in db_hashes:
+                repo_data = record._asdict()
+                repo_data["content_hash"] = _content_hash(record)
+                self.to_add.append(repo_data)
+                continue
 
-        # Star 数只更新，不计入实质性更新
-        if db_repo.stargazers_count != github_repo.get('stargazers_count'):
-            db_repo.stargazers_count = github_repo.get('stargazers_count')
+            db_hash = db_hashes[repo_id]
+            if unchanged and db_hash is not None:
+                # 页面内容与上次同步时一致，本地数据无需更新
+                continue
+            new_hash = _content_hash(record)
+            if new_hash != db_hash:
+                self._pending[repo_id] = (record, new_hash)
 
-        # starred_at 时间只更新，不计入实质性更新
-        if db_repo.starred_at != github_repo.get('starred_at'):
-            db_repo.starred_at = github_repo.get('starred_at')
+    def _compare(self, db_row: Row, github_repo: StarRecord, new_hash: str):
+        """逐字段比对指纹不一致的仓库，并生成一条更新行（同时写入新指纹）。"""
+        has_substantive_update = False
+
+        # 检查实质性字段是否有变化；Star 数和 starred_at 时间只更新，不计入实质性更新
+        for field in self.substantive_fields:
+            if getattr(db_row, field) != getattr(github_repo, field):
+                has_substantive_update = True
+                # 保存旧 pushed_at 值，并记录 pushed_at 变化的仓库 ID
+                if field == 'pushed_at':
+                    self.old_pushed_at_map[db_row.id] = db_row.pushed_at
+                    self.pushed_at_changed_ids.append(db_row.id)
 
         if has_substantive_update:
             # 如果有实质性更新，加入到专门用于通知的列表
-            substantive_updated_repos.append(db_repo)
+            self.substantive_updated_ids.append(db_row.id)
 
-        if pushed_at_changed:
-            # 记录 pushed_at 变化的仓库 ID
-            pushed_at_changed_ids.append(repo_id)
+        # 所有更新行包含相同的字段，便于批量执行。
+        # 字段完全一致（例如升级前没有指纹的旧数据）时也会写回，以补全指纹。
+        row = dict(zip(SYNCED_UPDATE_FIELDS, _get_synced_values(github_repo)))
+        row["id"] = db_row.id
+        row["content_hash"] = new_hash
+        self.to_update.append(row)
 
-        # 无论是否有实质性更新，都将其加入 to_update 列表，以确保 star 数等非实质性字段也被更新
-        to_update.append(db_repo)
+    def result(self) -> Tuple[List[Dict], List[Dict], List[int], List[int], List[int], Dict[int, Optional[str]]]:
+        """
+        对指纹不一致的仓库逐字段比对，返回比对结果，格式与 _diff_and_prepare_operations 相同。
+        本地存在但没有从 GitHub 收到的仓库视为需要删除。
+        """
+        pending_ids = list(self._pending)
+        for start in range(0, len(pending_ids), DIFF_ROWS_BATCH_SIZE):
+            for db_row in self.load_rows(pending_ids[start:start + DIFF_ROWS_BATCH_SIZE]):
+                record, new_hash = self._pending[db_row.id]
+                self._compare(db_row, record, new_hash)
+        self._pending.clear()
 
-    logger.info(
-        f"Diff complete. To add: {len(to_add)}, "
-        f"To substantively update: {len(substantive_updated_repos)}, "
-        f"To remove: {len(to_remove_ids)}, "
-        f"Pushed_at changed: {len(pushed_at_changed_ids)}"
-    )
+        to_remove_ids = [repo_id for repo_id in self.db_hashes if repo_id not in self.seen_ids]
+
+        logger.info(
+            f"Diff complete. To add: {len(self.to_add)}, "
+            f"To update: {len(self.to_update)}, "
+            f"To substantively update: {len(self.substantive_updated_ids)}, "
+            f"To remove: {len(to_remove_ids)}, "
+            f"Pushed_at changed: {len(self.pushed_at_changed_ids)}"
+        )
+
+        return (
+            self.to_add, self.to_update, to_remove_ids,
+            self.substantive_updated_ids, self.pushed_at_changed_ids, self.old_pushed_at_map
+        )
+
+def _diff_and_prepare_operations(
+    session: Session,
+    github_repos_data: List[StarRecord],
+    db_hashes: Dict[int, Optional[str]]
+) -> Tuple[List[Dict], List[Dict], List[int], List[int], List[int], Dict[int, Optional[str]]]:
+    """
+    比对 GitHub 数据和本地数据，生成数据库操作指令。
+    参数:
+        session: 数据库会话，用于读取指纹不一致仓库的比对列。
+        github_repos_data: 从 GitHub API 获取的仓库记录列表。
+        db_hashes: 由 _select_content_hashes 查询出的本地仓库 ID 到指纹的映射。
+    返回:
+        一个元组，包含:
+        - to_add (List[Dict]): 需要新增的仓库的数据字典列表（包含 content_hash）。
+        - to_update (List[Dict]): 指纹有变化的仓库的更新行（id、SYNCED_UPDATE_FIELDS 和 content_hash）。
+        - to_remove_ids (List[int]): 需要删除的仓库 ID 列表。
+        - substantive_updated_ids (List[int]): 发生了实质性更新的仓库 ID 列表，用于发送通知。
+        - pushed_at_changed_ids (List[int]): pushed_at 变化的仓库 ID 列表，用于 AI 总结。
+        - old_pushed_at_map (Dict[int, Optional[str]]): 仓库 ID 到旧 pushed_at 值的映射，用于获取 commit 列表。
+    """
+    logger.info("Starting diff calculation...")
+    diff = _StarDiff(db_hashes, load_rows=lambda repo_ids: _select_diff_rows(session, repo_ids))
+    diff.feed(github_repos_data)
+    return diff.result()
 
-    return to_add, to_update, to_remove_ids, substantive_updated_repos, pushed_at_changed_ids, old_pushed_at_map
+def _write_operations(
+    session: Session,
+    to_add: List[Dict],
+    to_update: List[Dict],
+    to_remove_ids: List[int]
+) -> float:
+    """
+    批量暂存比对结果对应的数据库写操作（不提交），返回写入耗时（毫秒）。
+    - 删除：一条 DELETE ... WHERE id IN (...)。
+    - 更新：只针对有变化的仓库，按主键 executemany 执行 UPDATE。
+    - 新增：executemany 执行 INSERT ... ON CONFLICT(id) DO UPDATE，用户自定义字段取默认值，
+      已存在的行（例如并发同步写入的）只刷新同步字段。
+    """
+    started = time.perf_counter()
+
+    if to_remove_ids:
+        session.exec(delete(Repo).where(Repo.id.in_(to_remove_ids)))
+
+    if to_update:
+        session.exec(update(Repo), params=to_update)
+
+    if to_add:
+        # 批量插入绕过了模型默认值，需要显式提供非空的用户字段默认值
+        rows = [{**repo_data, "tags": [], "analysis_failed": False} for repo_data in to_add]
+        repo_table = Repo.__table__
+        insert_statement = sqlite_insert(repo_table)
+        insert_statement = insert_statement.on_conflict_do_update(
+            index_elements=[repo_table.c.id],
+            set_={key: insert_statement.excluded[key] for key in to_add[0] if key != "id"},
+        )
+        session.exec(insert_statement, params=rows)
+
+    write_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Staged sync writes in {write_ms} ms (added: {len(to_add)}, updated: {len(to_update)}, removed: {len(to_remove_ids)}).")
+    return write_ms
+
+def _load_repos_for_notification(session: Session, repo_ids: List[int]) -> List[Repo]:
+    """
+    重新加载发生实质性更新的仓库，用于发送通知。
+    批量写入不会刷新会话中已加载的对象，因此使用 populate_existing 读取写入后的值。
+    """
+    if not repo_ids:
+        return []
+    statement = select(Repo).where(Repo.id.in_(repo_ids)).execution_options(populate_existing=True)
+    return list(session.exec(statement).all())
 
 async def run_full_sync(session: Session, access_token: str) -> Tuple[Dict, List[Repo]]:
     """
@@ -127,36 +306,57 @@ async def run_full_sync(session: Session, access_token: str) -> Tuple[Dict, List
     logger.info("Core sync service: Starting full sync process.")
 
     try:
-        # 1. 从 GitHub 并发获取所有星标数据
-        github_client = GitHubApiClient(token=access_token)
-        github_repos_data = await github_client.get_all_starred_repos()
-
-        # 2. 从本地数据库获取所有现有数据
-        db_repos = session.exec(select(Repo)).all()
+        # 1. 从本地数据库读取所有仓库的同步字段指纹
+        diff = _StarDiff(
+            _select_content_hashes(session),
+            load_rows=lambda repo_ids: _select_diff_rows(session, repo_ids),
+        )
 
-        # 3. 执行核心比对算法，获取操作指令和待通知列表
-        to_add, to_update, to_remove_ids, updated_repos_for_notification, pushed_at_changed_ids, old_pushed_at_map = _diff_and_prepare_operations(
-            github_repos_data=github_repos_data,
-            db_repos=db_repos
+        # 2. 从 GitHub 流式获取星标数据（未变化的页面通过 ETag 命中本地缓存），每收到一页就立即比对，
+        #    内存中不保留完整的星标列表。重新下载的页面各自在一个短事务中写入缓存并标记为临时页面，
+        #    请求 GitHub（包括重试和退避等待）期间不持有数据库写锁；同步提交时才清除临时标记
+        github_client = create_github_client(
+            token=access_token,
+            page_cache=_load_page_cache(session),
+            load_cached_page=lambda page: _load_cached_page(session, page),
         )
-        
-        # 4. 准备数据库操作（暂存更改，不提交）
-        if to_remove_ids:
-            delete_statement = delete(Repo).where(Repo.id.in_(to_remove_ids))
-            session.exec(delete_statement)
-        
-        for repo_data in to_add:
-            session.add(Repo.model_validate(repo_data))
-            
-        for repo in to_update:
-            session.add(repo)
-        
+        refreshed_pages: List[int] = []
+        logger.info("Starting diff calculation...")
+        async for star_page in github_client.iter_starred_pages():
+            diff.feed(star_page.records, unchanged=star_page.unchanged)
+            if github_client.uses_page_cache and star_page.cache_entry:
+                _save_provisional_page(session, star_page)
+                refreshed_pages.append(star_page.page)
+
+        # 3. 汇总比对结果，获取操作指令和待通知列表
+        to_add, to_update, to_remove_ids, substantive_updated_ids, pushed_at_changed_ids, old_pushed_at_map = diff.result()
+
+        # 部分页面没有拿到最新数据时，无法确定缺失的仓库是否已取消收藏，本次跳过删除
+        if to_remove_ids and not github_client.is_complete:
+            logger.warning(f"Star list is incomplete, skipping removal of {len(to_remove_ids)} repos in this sync.")
+            to_remove_ids = []
+
+        # 4. 批量准备数据库操作（暂存更改，不提交）
+        write_ms = _write_operations(session, to_add, to_update, to_remove_ids)
+        updated_repos_for_notification = _load_repos_for_notification(session, substantive_updated_ids)
+
+        # 确认重新下载的页面，并清理超出当前总页数的旧缓存页面
+        if github_client.uses_page_cache:
+            _confirm_page_cache(session, refreshed_pages)
+            session.exec(delete(StarPageCache).where(StarPageCache.page > github_client.total_pages))
+
         # 5. 构建统计结果
         stats = {
+            "mode": "full",
             "added": len(to_add),
             "updated": len(updated_repos_for_notification),
             "removed": len(to_remove_ids),
-            "total_from_github": len(github_repos_data),
+            "total_from_github": diff.total_from_github,
+            "page_cache_hits": github_client.page_cache_hits,
+            "page_cache_misses": github_client.page_cache_misses,
+            "page_latency_ms": github_client.page_latency_summary(),
+            "incomplete_pages": sorted(github_client.stale_pages | github_client.failed_pages),
+            "write_ms": write_ms,
             "updated_repo_ids": pushed_at_changed_ids,
             "old_pushed_at_map": old_pushed_at_map,
         }
@@ -180,3 +380,72 @@ async def run_full_sync(session: Session, access_token: str) -> Tuple[Dict, List
             message_zh="执行同步时发生未知内部错误",
             message_en="An unexpected internal error occurred during sync execution.",
         )
+
+async def run_incremental_sync(session: Session, access_token: str) -> Tuple[Dict, List[Repo]]:
+    """
+    执行一次增量同步：只获取比本地最新 starred_at 更新的星标仓库。
+    不处理取消收藏和已有仓库的元数据刷新，这些由频率更低的完整同步负责。
+    如果本地数据库为空，则自动退化为完整同步。
+    参数:
+        session: 数据库会话对象。
+        access_token: 用于认证的 GitHub access token。
+    返回:
+        与 run_full_sync 相同格式的 (stats, updated_repos) 元组。
+    异常:
+        ApiException: 如果在同步过程中发生任何不可恢复的错误。
+    """
+    latest_starred_at = session.exec(select(func.max(Repo.starred_at))).one()
+    if latest_starred_at is None:
+        logger.info("Core sync service: Local DB is empty, falling back to full sync.")
+        return await run_full_sync(session=session, access_token=access_token)
+
+    logger.info(f"Core sync service: Starting incremental sync for stars newer than {latest_starred_at}.")
+
+    try:
+        # 1. 按收藏时间倒序获取新星标，遇到已知的 starred_at 即停止
+        github_client = create_github_client(token=access_token)
+        new_repos_data = await github_client.get_new_starred_repos(latest_starred_at)
+
+        # 2. 只加载与新星标 ID 相同的本地记录（取消后重新收藏的仓库），确保不会产生删除操作
+        new_ids = [repo.id for repo in new_repos_data]
+        db_hashes = _select_content_hashes(session, new_ids) if new_ids else {}
+
+        # 3. 复用完整同步的比对算法
+        to_add, to_update, _to_remove_ids, substantive_updated_ids, pushed_at_changed_ids, old_pushed_at_map = _diff_and_prepare_operations(
+            session=session,
+            github_repos_data=new_repos_data,
+            db_hashes=db_hashes
+        )
+
+        # 4. 批量准备数据库操作（暂存更改，不提交）
+        write_ms = _write_operations(session, to_add, to_update, to_remove_ids=[])
+        updated_repos_for_notification = _load_repos_for_notification(session, substantive_updated_ids)
+
+        # 5. 构建统计结果
+        stats = {
+            "mode": "incremental",
+            "added": len(to_add),
+            "updated": len(updated_repos_for_notification),
+            "removed": 0,
+            "total_from_github": len(new_repos_data),
+            "write_ms": write_ms,
+            "updated_repo_ids": pushed_at_changed_ids,
+            "old_pushed_at_map": old_pushed_at_map,
+        }
+
+        # 6. 更新内存中的成功同步时间戳
+        global LAST_SUCCESSFUL_SYNC_AT
+        LAST_SUCCESSFUL_SYNC_AT = datetime.now()
+
+        return stats, updated_repos_for_notification
+
+    except ApiException:
+        raise
+    except Exception as e:
+        logger.error(f"An unexpected error occurred in incremental sync: {e}", exc_info=True)
+        raise ApiException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            code="CORE_SYNC_UNEXPECTED_ERROR",
+            message_zh="执行同步时发生未知内部错误",
+            message_en="An unexpected internal error occurred during sync execution.",
+        )
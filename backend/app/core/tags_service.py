@@ -1,12 +1,18 @@
 """
 处理与用户自定义标签（Tags）相关的业务逻辑。
-提供全局删除标签的服务。
+提供全局删除、重命名标签，以及在多个仓库上批量添加、移除、重命名标签的服务。
 所有函数都只准备数据库更改，而不提交事务，将事务控制权交给上层的 API 路由。
 """
 import logging
+from typing import List, Optional
+
+from fastapi import status
+from sqlalchemy import bindparam, text, update
 from sqlmodel import Session, select
 
-from app.models import Repo, AppSettings
+from app.exceptions import ApiException
+from app.models import Repo, AppSettings, RepoTag
+from app.core.listing_service import FAVORITE_TAG, build_filter_clause
 from app.core.settings_service import get_app_settings
 
 logger = logging.getLogger(__name__)
@@ -33,8 +39,8 @@ def delete_tag_globally(session: Session, tag_name: str):
     else:
         logger.warning(f"Tag '{tag_name}' not found in AppSettings.tags_order, skipping update to settings.")
 
-    # 步骤 2: 更新所有包含该标签的 Repo.tags
-    statement = select(Repo).where(Repo.tags.contains(tag_name))
+    # 步骤 2: 更新所有包含该标签的 Repo.tags，通过 repotag 的标签索引精确定位，不会误匹配包含该名称的其他标签
+    statement = select(Repo).where(Repo.id.in_(select(RepoTag.repo_id).where(RepoTag.tag == tag_name)))
     repos_to_update = session.exec(statement).all()
 
     if not repos_to_update:
@@ -51,3 +57,94 @@ def delete_tag_globally(session: Session, tag_name: str):
             session.add(repo)
     
     logger.info(f"Global deletion for tag '{tag_name}' has been staged in the session. Awaiting commit.")
+
+# 批量操作直接在 SQL 中改写 repo.tags 的 JSON 数组，每种操作对所有目标仓库只执行一条 UPDATE。
+# 移除和重命名按原数组的顺序（json_each 的 key）重新组装；重命名时如果仓库已有新标签，则只删除旧标签。
+# 写入 repo.tags 后，repotag、筛选项计数、全文索引和数据版本号都由触发器同步更新。
+_ADD_TAG_SQL = "json_insert(coalesce(repo.tags, '[]'), '$[#]', :bulk_tag)"
+_REMOVE_TAG_SQL = (
+    "(SELECT json_group_array(value) FROM (SELECT value FROM json_each(coalesce(repo.tags, '[]')) "
+    "WHERE value != :bulk_tag ORDER BY key))"
+)
+_RENAME_TAG_SQL = (
+    "(SELECT json_group_array(value) FROM (SELECT CASE WHEN value = :bulk_tag THEN :bulk_new_tag ELSE value END AS value "
+    "FROM json_each(coalesce(repo.tags, '[]')) WHERE value != :bulk_tag "
+    "OR NOT EXISTS (SELECT 1 FROM json_each(coalesce(repo.tags, '[]')) WHERE value = :bulk_new_tag) ORDER BY key))"
+)
+
+def bulk_update_tags(
+    session: Session,
+    action: str,
+    tag_name: str,
+    new_tag_name: Optional[str] = None,
+    repo_ids: Optional[List[int]] = None,
+    filter_type: Optional[str] = None,
+    filter_value: Optional[str] = None,
+) -> int:
+    """
+    在多个仓库上批量添加、移除或重命名一个标签，用一条 UPDATE 语句完成。
+    参数:
+        session: 数据库会话对象。
+        action: add / remove / rename。
+        tag_name: 要添加或移除的标签，重命名时为原标签名。
+        new_tag_name: 重命名后的标签名，仅 rename 使用。
+        repo_ids: 限定仓库 ID 范围，为 None 时不限定。
+        filter_type / filter_value: 限定侧边栏筛选范围（见 listing_service.build_filter_clause），为 None 时不限定。
+    返回:
+        实际发生变化的仓库数量（已有该标签的仓库不会重复添加，没有该标签的仓库不会被移除或重命名）。
+    """
+    if action == "rename" and (not new_tag_name or FAVORITE_TAG in (tag_name, new_tag_name)):
+        raise ApiException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            code="INVALID_TAG_RENAME",
+            message_zh="重命名标签时必须提供新名称，且不能重命名内部标签",
+            message_en="A new name is required and internal tags cannot be renamed",
+        )
+    if action == "rename" and new_tag_name == tag_name:
+        return 0
+
+    # 仓库是否已有该标签通过 repotag 的主键判断
+    has_tag = build_filter_clause("tag", tag_name)
+    if action == "add":
+        new_tags, conditions = _ADD_TAG_SQL, [~has_tag]
+    elif action == "remove":
+        new_tags, conditions = _REMOVE_TAG_SQL, [has_tag]
+    else:
+        new_tags, conditions = _RENAME_TAG_SQL, [has_tag]
+    if repo_ids is not None:
+        conditions.append(Repo.id.in_(repo_ids))
+    if filter_type is not None:
+        filter_clause = build_filter_clause(filter_type, filter_value)
+        if filter_clause is not None:
+            conditions.append(filter_clause)
+
+    new_tags_clause = text(new_tags).bindparams(
+        bindparam("bulk_tag", value=tag_name),
+        *([bindparam("bulk_new_tag", value=new_tag_name)] if action == "rename" else []),
+    )
+    statement = update(Repo).where(*conditions).values(tags=new_tags_clause).execution_options(synchronize_session=False)
+    updated = session.exec(statement).rowcount
+    logger.info(f"Bulk tag {action} '{tag_name}'{f' -> {new_tag_name!r}' if action == 'rename' else ''} staged for {updated} repos.")
+    return updated
+
+def rename_tag_globally(session: Session, tag_name: str, new_tag_name: str) -> int:
+    """
+    全局重命名一个自定义标签。新名称已存在时两个标签合并。
+    1. 在 AppSettings.tags_order 中把旧名称替换为新名称（新名称已在列表中时只移除旧名称）。
+    2. 在所有带有旧标签的仓库上重命名该标签。
+    返回:
+        实际发生变化的仓库数量。
+    """
+    logger.info(f"Starting global rename for tag: '{tag_name}' -> '{new_tag_name}'")
+    updated = bulk_update_tags(session, "rename", tag_name, new_tag_name)
+
+    settings = get_app_settings(session)
+    if tag_name in settings.tags_order and tag_name != new_tag_name:
+        new_order = []
+        for tag in settings.tags_order:
+            tag = new_tag_name if tag == tag_name else tag
+            if tag not in new_order:
+                new_order.append(tag)
+        settings.tags_order = new_order
+        session.add(settings)
+    return updated
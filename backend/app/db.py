@@ -2,9 +2,16 @@
 数据库初始化和会话管理。
 负责创建数据库引擎、建立表结构，并提供 FastAPI 依赖注入所需的数据库会话。
 """
-from sqlmodel import create_engine, Session, SQLModel
+import logging
+from typing import Dict
+from sqlalchemy import bindparam, event, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import create_engine, select, Session, SQLModel
 from app.config import settings
-from app.models import Repo, AppSettings
+from app.models import Repo, AppSettings, StarPageCache, DataVersion, RepoTombstone, RepoFacet
+from app.core.search_tokenizer import SUPPORTED_TOKENIZERS, TOKENIZER_NGRAM, TOKENIZER_UNICODE61, cjk_ngrams_sql
+
+logger = logging.getLogger(__name__)
 
 # 根据配置创建数据库引擎。
 # - echo=settings.DEBUG: 在调试模式下打印 SQL 语句。
@@ -15,9 +22,311 @@ engine = create_engine(
     connect_args={"check_same_thread": False}
 )
 
+def get_sqlite_pragmas() -> Dict[str, str]:
+    """根据配置生成每个连接建立时执行的 PRAGMA，值为空的项不设置。"""
+    pragmas = {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+    }
+    return {name: str(value).strip() for name, value in pragmas.items() if value is not None and str(value).strip()}
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, str]):
+    """在一个原始 SQLite 连接上执行 PRAGMA。"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+if engine.dialect.name == "sqlite":
+    _SQLITE_PRAGMAS = get_sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _on_sqlite_connect(dbapi_connection, connection_record):
+        """每个新建立的连接都应用 SQLite 调优参数。"""
+        apply_sqlite_pragmas(dbapi_connection, _SQLITE_PRAGMAS)
+
+    logger.info(f"SQLite connection pragmas: {_SQLITE_PRAGMAS}")
+
+def _add_missing_columns():
+    """
+    为已存在的表补充模型中新增的列。
+    SQLModel.metadata.create_all 只会创建缺失的表，不会修改已有表的结构；
+    新增的列都允许为空，直接通过 ALTER TABLE ... ADD COLUMN 添加即可。
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                logger.info(f"Added missing column '{column.name}' to table '{table.name}'.")
+
+def _replace_schema_objects(connection, statements: Dict[str, str]) -> bool:
+    """
+    确保 statements 中的触发器和表与给定的建表语句一致（键为 sqlite_master 中的对象名）。
+    全部一致时不做任何修改并返回 False；否则删除这些对象后按语句重新创建，返回 True，由调用方重新填充数据。
+    """
+    existing = dict(connection.execute(
+        text("SELECT name, sql FROM sqlite_master WHERE name IN :names").bindparams(bindparam("names", expanding=True)),
+        {"names": list(statements)},
+    ).all())
+    if existing == statements:
+        return False
+    # 先删除触发器再删除表
+    for name, statement in sorted(statements.items(), key=lambda item: not item[1].startswith("CREATE TRIGGER")):
+        object_type = "TRIGGER" if statement.startswith("CREATE TRIGGER") else "TABLE"
+        connection.execute(text(f"DROP {object_type} IF EXISTS {name}"))
+    for statement in statements.values():
+        connection.execute(text(statement))
+    return True
+
+# 全文搜索索引：FTS5 虚拟表的 rowid 与 repo.id 一致，tags 展开为以空格分隔的文本。
+# 索引由 repo 表上的触发器维护，同步、PATCH 以及任何直接写入都会自动反映到索引中。
+REPO_FTS_TABLE = "repo_fts"
+REPO_FTS_COLUMNS = ("name", "full_name", "alias", "description", "notes", "ai_summary", "tags")
+_REPO_FTS_TAGS_EXPR = "(SELECT group_concat(value, ' ') FROM json_each(coalesce({row}.tags, '[]')))"
+
+def get_search_tokenizer() -> str:
+    """返回配置的全文搜索分词模式，无法识别的值回退到 unicode61。"""
+    tokenizer = (settings.SEARCH_TOKENIZER or "").strip().lower()
+    if tokenizer not in SUPPORTED_TOKENIZERS:
+        logger.warning(f"Unknown SEARCH_TOKENIZER '{settings.SEARCH_TOKENIZER}', falling back to '{TOKENIZER_UNICODE61}'.")
+        return TOKENIZER_UNICODE61
+    return tokenizer
+
+def _repo_fts_values(row: str, tokenizer: str) -> str:
+    """
+    生成从 repo 表的 new/old 行或查询行取出索引列值的 SQL 表达式列表。
+    ngram 模式下在原文之后追加中日韩文字的 bigram，原文中的英文单词照常按词索引。
+    """
+    values = [f"{row}.{column}" for column in REPO_FTS_COLUMNS if column != "tags"]
+    values.append(_REPO_FTS_TAGS_EXPR.format(row=row))
+    if tokenizer == TOKENIZER_NGRAM:
+        values = [f"{value} || coalesce(' ' || {cjk_ngrams_sql(value)}, '')" for value in values]
+    return ", ".join(values)
+
+def _search_index_statements(tokenizer: str) -> Dict[str, str]:
+    """返回索引表和维护触发器的建表语句，键为 sqlite_master 中的对象名。"""
+    columns = ", ".join(REPO_FTS_COLUMNS)
+    return {
+        REPO_FTS_TABLE: (
+            f"CREATE VIRTUAL TABLE {REPO_FTS_TABLE} USING fts5("
+            f"{columns}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        ),
+        "repo_fts_after_insert": (
+            f"CREATE TRIGGER repo_fts_after_insert AFTER INSERT ON repo BEGIN "
+            f"INSERT INTO {REPO_FTS_TABLE} (rowid, {columns}) VALUES (new.id, {_repo_fts_values('new', tokenizer)}); END"
+        ),
+        "repo_fts_after_delete": (
+            f"CREATE TRIGGER repo_fts_after_delete AFTER DELETE ON repo BEGIN "
+            f"DELETE FROM {REPO_FTS_TABLE} WHERE rowid = old.id; END"
+        ),
+        "repo_fts_after_update": (
+            f"CREATE TRIGGER repo_fts_after_update AFTER UPDATE OF {columns} ON repo BEGIN "
+            f"DELETE FROM {REPO_FTS_TABLE} WHERE rowid = old.id; "
+            f"INSERT INTO {REPO_FTS_TABLE} (rowid, {columns}) VALUES (new.id, {_repo_fts_values('new', tokenizer)}); END"
+        ),
+    }
+
+def _ensure_search_index():
+    """
+    创建全文搜索索引及其维护触发器。
+    已有的索引表和触发器与当前分词模式生成的语句完全一致时不做任何修改；
+    不存在或定义不同（例如修改了 SEARCH_TOKENIZER）时删除后重建，并从 repo 表全量填充。
+    SQLite 未编译 FTS5 时只记录警告，搜索接口会返回不可用错误。
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    tokenizer = get_search_tokenizer()
+    statements = _search_index_statements(tokenizer)
+    columns = ", ".join(REPO_FTS_COLUMNS)
+    try:
+        with engine.begin() as connection:
+            if not _replace_schema_objects(connection, statements):
+                return
+            connection.execute(text(
+                f"INSERT INTO {REPO_FTS_TABLE} (rowid, {columns}) "
+                f"SELECT repo.id, {_repo_fts_values('repo', tokenizer)} FROM repo"
+            ))
+            logger.info(f"Built full-text search index with tokenizer '{tokenizer}' from existing repos.")
+    except OperationalError as e:
+        logger.warning(f"Full-text search index is unavailable (SQLite FTS5 support is required): {e}")
+        # 删除旧版本遗留的维护触发器，索引不可用时 repo 表的写入不受影响
+        with engine.begin() as connection:
+            for name in statements:
+                if name != REPO_FTS_TABLE:
+                    connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+
+# 规范化的仓库标签表：repo.tags 仍是 API 读写的字段，触发器把它展开到 repotag 中，
+# 标签的筛选、删除和重命名通过 repotag 上的索引定位仓库，不再对每一行解析 JSON 或做 LIKE 匹配。
+_REPO_TAG_INSERT = (
+    "INSERT OR IGNORE INTO repotag (repo_id, tag) SELECT {row}.id, value "
+    "FROM json_each(coalesce({row}.tags, '[]'));"
+)
+_REPO_TAG_TRIGGERS = {
+    "repo_tag_after_insert": (
+        f"CREATE TRIGGER repo_tag_after_insert AFTER INSERT ON repo BEGIN {_REPO_TAG_INSERT.format(row='new')} END"
+    ),
+    "repo_tag_after_update": (
+        f"CREATE TRIGGER repo_tag_after_update AFTER UPDATE OF id, tags ON repo "
+        f"WHEN old.id IS NOT new.id OR old.tags IS NOT new.tags BEGIN "
+        f"DELETE FROM repotag WHERE repo_id = old.id; {_REPO_TAG_INSERT.format(row='new')} END"
+    ),
+    "repo_tag_after_delete": (
+        "CREATE TRIGGER repo_tag_after_delete AFTER DELETE ON repo BEGIN DELETE FROM repotag WHERE repo_id = old.id; END"
+    ),
+}
+
+def _ensure_repo_tags():
+    """创建 repotag 的维护触发器；触发器首次创建或定义变化时从 repo.tags 重新填充整张表。"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as connection:
+        if not _replace_schema_objects(connection, _REPO_TAG_TRIGGERS):
+            return
+        connection.execute(text("DELETE FROM repotag"))
+        connection.execute(text(
+            "INSERT OR IGNORE INTO repotag (repo_id, tag) SELECT repo.id, tag.value "
+            "FROM repo, json_each(coalesce(repo.tags, '[]')) AS tag"
+        ))
+        logger.info("Rebuilt repo tag table from existing repos.")
+
+# 筛选项计数：repo 表的 language 和 tags 变化时，触发器从 repofacet 中减去旧行的贡献、加上新行的贡献。
+# 同步、PATCH、标签删除等所有写入路径都会自动更新计数，计数归零的标签和语言会被删除。
+# 同一写入上各触发器的执行顺序不确定，因此增量维护直接读取 new/old 行的 tags，而不是 repotag。
+_FAVORITE_TAG = "_favorite"
+_FACET_UPSERT = "ON CONFLICT(kind, value) DO UPDATE SET count = count + excluded.count;"
+
+def _facet_delta_statements(row: str, delta: int, include_all: bool = True) -> str:
+    """生成把 row（new 或 old）对各筛选项的贡献加上 delta 的 SQL 语句序列。"""
+    tags = f"json_each(coalesce({row}.tags, '[]'))"
+    statements = []
+    if include_all:
+        statements.append(f"INSERT INTO repofacet (kind, value, count) VALUES ('system', 'all', {delta}) {_FACET_UPSERT}")
+    statements += [
+        f"INSERT INTO repofacet (kind, value, count) SELECT 'system', 'constellation', {delta} "
+        f"WHERE EXISTS (SELECT 1 FROM {tags} WHERE value = '{_FAVORITE_TAG}') {_FACET_UPSERT}",
+        f"INSERT INTO repofacet (kind, value, count) SELECT 'system', 'untagged', {delta} "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {tags} WHERE value != '{_FAVORITE_TAG}') {_FACET_UPSERT}",
+        f"INSERT INTO repofacet (kind, value, count) SELECT 'language', {row}.language, {delta} "
+        f"WHERE coalesce({row}.language, '') != '' {_FACET_UPSERT}",
+        f"INSERT INTO repofacet (kind, value, count) SELECT DISTINCT 'tag', value, {delta} FROM {tags} "
+        f"WHERE value != '{_FAVORITE_TAG}' {_FACET_UPSERT}",
+    ]
+    if delta < 0:
+        statements.append("DELETE FROM repofacet WHERE kind != 'system' AND count <= 0;")
+    return " ".join(statements)
+
+_FACET_TRIGGERS = {
+    "repo_facet_after_insert": (
+        f"CREATE TRIGGER repo_facet_after_insert AFTER INSERT ON repo BEGIN {_facet_delta_statements('new', 1)} END"
+    ),
+    "repo_facet_after_update": (
+        f"CREATE TRIGGER repo_facet_after_update AFTER UPDATE OF language, tags ON repo "
+        f"WHEN old.language IS NOT new.language OR old.tags IS NOT new.tags BEGIN "
+        f"{_facet_delta_statements('old', -1, include_all=False)} {_facet_delta_statements('new', 1, include_all=False)} END"
+    ),
+    "repo_facet_after_delete": (
+        f"CREATE TRIGGER repo_facet_after_delete AFTER DELETE ON repo BEGIN {_facet_delta_statements('old', -1)} END"
+    ),
+}
+
+_FACET_REBUILD_STATEMENTS = (
+    "DELETE FROM repofacet",
+    "INSERT INTO repofacet (kind, value, count) SELECT 'system', 'all', count(*) FROM repo",
+    f"INSERT INTO repofacet (kind, value, count) SELECT 'system', 'constellation', count(*) FROM repotag "
+    f"WHERE tag = '{_FAVORITE_TAG}'",
+    f"INSERT INTO repofacet (kind, value, count) SELECT 'system', 'untagged', count(*) FROM repo "
+    f"WHERE NOT EXISTS (SELECT 1 FROM repotag WHERE repo_id = repo.id AND tag != '{_FAVORITE_TAG}')",
+    "INSERT INTO repofacet (kind, value, count) SELECT 'language', language, count(*) FROM repo "
+    "WHERE coalesce(language, '') != '' GROUP BY language",
+    f"INSERT INTO repofacet (kind, value, count) SELECT 'tag', tag, count(*) FROM repotag "
+    f"WHERE tag != '{_FAVORITE_TAG}' GROUP BY tag",
+)
+
+def _ensure_facet_counts():
+    """创建筛选项计数的维护触发器；触发器首次创建或定义变化时从 repo 和 repotag 表重新统计所有计数。"""
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as connection:
+        if not _replace_schema_objects(connection, _FACET_TRIGGERS):
+            return
+        for statement in _FACET_REBUILD_STATEMENTS:
+            connection.execute(text(statement))
+        logger.info("Rebuilt sidebar facet counts from existing repos.")
+
+def _add_missing_indexes():
+    """为已存在的表创建模型中新增的索引（create_all 只在建表时创建索引）。"""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing_indexes:
+                    continue
+                index.create(connection)
+                logger.info(f"Created missing index '{index.name}' on table '{table.name}'.")
+
+# 变更追踪触发器：repo 表的每次写入都把 dataversion 加一，并把新版本号记录到该行或墓碑表中。
+# 同步、PATCH、标签批量修改和 AI 总结写入都经过这里，无需在各个写入路径中分别维护版本号。
+# 更新触发器只在 version 未被显式修改时生效，避免触发器自身写入 version 时再次触发。
+_NEXT_DATA_VERSION = "UPDATE dataversion SET version = version + 1 WHERE id = 1;"
+_CURRENT_DATA_VERSION = "(SELECT version FROM dataversion WHERE id = 1)"
+_CHANGE_TRACKING_TRIGGERS = {
+    "repo_version_after_insert": (
+        f"CREATE TRIGGER repo_version_after_insert AFTER INSERT ON repo BEGIN {_NEXT_DATA_VERSION} "
+        f"UPDATE repo SET version = {_CURRENT_DATA_VERSION} WHERE id = new.id; "
+        f"DELETE FROM repotombstone WHERE id = new.id; END"
+    ),
+    "repo_version_after_update": (
+        f"CREATE TRIGGER repo_version_after_update AFTER UPDATE ON repo WHEN new.version IS old.version BEGIN "
+        f"{_NEXT_DATA_VERSION} UPDATE repo SET version = {_CURRENT_DATA_VERSION} WHERE id = new.id; END"
+    ),
+    "repo_version_after_delete": (
+        f"CREATE TRIGGER repo_version_after_delete AFTER DELETE ON repo BEGIN {_NEXT_DATA_VERSION} "
+        f"INSERT OR REPLACE INTO repotombstone (id, version) VALUES (old.id, {_CURRENT_DATA_VERSION}); END"
+    ),
+}
+
+def _ensure_change_tracking():
+    """
+    初始化全局版本号并创建变更追踪触发器。
+    触发器不存在或定义变化时重新创建；已记录的版本号和墓碑保持不变，不需要重新填充。
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as connection:
+        connection.execute(text("INSERT OR IGNORE INTO dataversion (id, version) VALUES (1, 0)"))
+        if _replace_schema_objects(connection, _CHANGE_TRACKING_TRIGGERS):
+            logger.info("Created change tracking triggers.")
+
+def get_data_version(session: Session) -> int:
+    """返回当前的全局数据版本号。"""
+    version = session.exec(select(DataVersion.version).where(DataVersion.id == 1)).first()
+    return version or 0
+
 def create_db_and_tables():
-    """创建数据库文件和所有定义的表结构。"""
+    """创建数据库文件和所有定义的表结构，为已有的表补充新增的列和索引，并创建变更追踪、标签表、筛选项计数触发器和全文搜索索引。"""
     SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
+    _add_missing_indexes()
+    _ensure_change_tracking()
+    _ensure_repo_tags()
+    _ensure_facet_counts()
+    _ensure_search_index()
 
 def get_session():
     """为 FastAPI 依赖注入系统提供数据库会话的生成器。"""
@@ -3,6 +3,7 @@
 定义项目中所有业务逻辑相关的自定义异常，继承自 FastAPI 的 HTTPException。
 以及 AI/README 服务层的非 HTTP 业务异常。
 """
+from typing import Optional
 from fastapi import HTTPException, status
 from .schemas import ErrorResponse
 from .config import settings
@@ -60,7 +61,10 @@ class InvalidApiKeyError(AIServiceError):
 
 class RateLimitError(AIServiceError):
     """API 限流（可重试）"""
-    pass
+
+    def __init__(self, message: str = "", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after  # 服务端通过 Retry-After 要求等待的秒数，未提供时为 None
 
 
 class ApiEndpointError(AIServiceError):
@@ -86,3 +90,8 @@ class GitHubApiError(Exception):
 class InvalidGitHubTokenError(GitHubApiError):
     """GitHub Access Token 无效或过期（致命错误，应停止整个批量任务）"""
     pass
+
+
+class GitHubRateLimitError(GitHubApiError):
+    """GitHub API 限流，且需要等待的时间超过调用方允许的上限（可稍后重试）"""
+    pass
@@ -15,9 +15,11 @@ from app.config import settings
 from app.version import __version__ as APP_VERSION
 from posthog import Posthog
 
-from app.api import auth, users, stars, settings as api_settings, tags as api_tags, version as api_version, summary as api_summary
+from app.api import auth, users, stars, settings as api_settings, tags as api_tags, version as api_version, summary as api_summary, rate_limit as api_rate_limit
 from app.db import create_db_and_tables
 from app.core.scheduler import periodic_sync_scheduler
+from app.core.summary_jobs import summary_worker
+from app.core.http_clients import http_clients
 
 # 用于持有后台定时同步任务的句柄
 background_task = None
@@ -112,9 +114,15 @@ async def lifespan(app: FastAPI):
     # 初始化数据库和表结构
     create_db_and_tables()
 
+    # 启动共享的对外 HTTP 连接池
+    http_clients.start()
+
     # 处理匿名遥测
     _handle_telemetry()
     
+    # 启动 AI 总结任务的后台 worker，继续执行上次未完成的任务
+    summary_worker.start()
+
     # 创建并启动后台同步任务，但让它延迟5秒再执行第一次
     print("Starting background sync scheduler with initial delay...")
     # 我们给一个短暂的延迟（例如5秒），以确保FastAPI完全启动完毕
@@ -138,6 +146,12 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             print("Background sync scheduler cancelled successfully.")
 
+    # 停止 AI 总结 worker，未处理完的仓库在下次启动时继续
+    await summary_worker.stop()
+
+    # 关闭所有共享的 HTTP 客户端
+    await http_clients.aclose()
+
 # 创建并配置 FastAPI 应用实例
 app = FastAPI(
     title="StarGazer API - 星眸 API",
@@ -154,6 +168,7 @@ app.include_router(api_settings.router) # 挂载 settings 相关的路由
 app.include_router(api_tags.router) # 挂载自定义标签的相关路由
 app.include_router(api_version.router) # 挂载版本检查相关的路由
 app.include_router(api_summary.router) # 挂载 AI 总结相关的路由
+app.include_router(api_rate_limit.router) # 挂载 GitHub 配额查询的路由
 
 # --- 静态文件 ---
 # 挂载前端静态文件，实现单页应用 (SPA) 托管
@@ -2,11 +2,23 @@
 定义所有与数据库表结构对应的 SQLModel 模型。
 - Repo: 对应数据库中的 'repo' 表，存储每个 GitHub 星标仓库的详细信息。
 - AppSettings: 对应数据库中的 'appsettings' 表，用于存储应用的各项配置。
+- StarPageCache: 对应数据库中的 'starpagecache' 表，缓存 GitHub 星标列表每一页的 ETag 和数据。
+- DataVersion: 对应数据库中的 'dataversion' 表，保存仓库数据当前的全局版本号。
+- RepoTombstone: 对应数据库中的 'repotombstone' 表，记录被删除的仓库及删除时的版本号。
+- RepoFacet: 对应数据库中的 'repofacet' 表，保存侧边栏各筛选项（系统分组、标签、语言）的仓库数量。
+- RepoTag: 对应数据库中的 'repotag' 表，Repo.tags 的规范化副本，每个 (仓库, 标签) 一行。
+- SummaryJob: 对应数据库中的 'summaryjob' 表，记录每次 AI 总结任务的模式和状态。
+- SummaryJobItem: 对应数据库中的 'summaryjobitem' 表，记录总结任务中每个仓库的处理状态。
 """
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, JSON, Column, String
 
+def utc_now() -> datetime:
+    """当前的 UTC 时间（带时区信息）。SQLModel 的日期时间列只接受带时区的值，以 UTC 存储。"""
+    return datetime.now(timezone.utc)
+
 class Repo(SQLModel, table=True):
     """代表一个 GitHub 星标仓库的数据库模型。"""
     # 主键
@@ -23,6 +35,11 @@ class Repo(SQLModel, table=True):
     stargazers_count: int = Field(description="Star 数量")
     pushed_at: str = Field(description="最后一次 push 的时间 (ISO 8601 字符串)")
     starred_at: str = Field(index=True, description="用户收藏此仓库的时间 (ISO 8601 字符串)")
+    content_hash: Optional[str] = Field(
+        default=None,
+        max_length=32,
+        description="上述从 GitHub 同步字段的指纹，同步时只对指纹变化的仓库逐字段比对"
+    )
 
     # --- 用户在应用内自定义的字段 ---
     alias: Optional[str] = Field(
@@ -63,6 +80,25 @@ class Repo(SQLModel, table=True):
         description="README 文件的 SHA 值（用于检测变化）"
     )
 
+    # --- 变更追踪 ---
+    version: Optional[int] = Field(
+        default=None,
+        index=True,
+        description="该行最后一次被新增或修改时的数据版本号，由数据库触发器维护"
+    )
+
+# 分页列表（/api/stars/page）使用的索引。
+# repo.id 是 rowid 的别名，SQLite 的每个索引条目都隐含 rowid，因此 (排序字段) 的单列索引就能支持
+# 按 (排序字段, id) 的游标翻页；按语言筛选时需要以 language 开头的组合索引。
+_repo_columns = Repo.__table__.c
+Index("ix_repo_pushed_at", _repo_columns.pushed_at)
+Index("ix_repo_stargazers_count", _repo_columns.stargazers_count)
+Index("ix_repo_name_nocase", _repo_columns.name.collate("NOCASE"))
+Index("ix_repo_language_starred_at", _repo_columns.language, _repo_columns.starred_at)
+Index("ix_repo_language_pushed_at", _repo_columns.language, _repo_columns.pushed_at)
+Index("ix_repo_language_stargazers_count", _repo_columns.language, _repo_columns.stargazers_count)
+Index("ix_repo_language_name_nocase", _repo_columns.language, _repo_columns.name.collate("NOCASE"))
+
 class AppSettings(SQLModel, table=True):
     """代表应用全局配置的数据库模型，设计为单行表。"""
     # 使用固定的主键 1，确保这张表只有一行记录
@@ -123,3 +159,87 @@ class AppSettings(SQLModel, table=True):
         le=5,
         description="AI 分析并发数（1-5）"
     )
+
+
+class StarPageCache(SQLModel, table=True):
+    """
+    GitHub `/user/starred` 分页数据的本地缓存，每页一行。
+    同步时携带 ETag 发起条件请求，GitHub 返回 304 时直接使用缓存的页面数据。
+    """
+    page: int = Field(primary_key=True, description="页码（从 1 开始）")
+    etag: Optional[str] = Field(default=None, description="GitHub 返回的 ETag，用于 If-None-Match 条件请求")
+    body_hash: str = Field(description="清理后页面数据的 SHA-1 哈希，用于识别 ETag 变化但内容未变的页面")
+    items: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        sa_column=Column(JSON),
+        description="清理后的页面数据，每个元素为 StarRecord 的字段字典"
+    )
+    fetched_at: datetime = Field(default_factory=utc_now, description="该页最后一次从 GitHub 下载的时间")
+    provisional: Optional[bool] = Field(
+        default=None,
+        description="为 True 表示该页由尚未提交的同步写入，同步提交时才清除；此前不能用于条件请求和内容比对"
+    )
+
+class DataVersion(SQLModel, table=True):
+    """
+    仓库数据的全局版本号，设计为单行表。
+    repo 表的每次新增、修改和删除都由触发器把版本号加一，并把新版本号写入对应行的 version 或墓碑记录。
+    """
+    id: Optional[int] = Field(default=1, primary_key=True)
+    version: int = Field(default=0, description="当前的数据版本号，单调递增")
+
+class RepoTombstone(SQLModel, table=True):
+    """被删除仓库的墓碑记录，供 /api/stars/changes 告知客户端删除本地副本。仓库被重新收藏时删除对应记录。"""
+    id: int = Field(primary_key=True, description="被删除仓库的 GitHub ID")
+    version: int = Field(index=True, description="删除发生时的数据版本号")
+
+class RepoFacet(SQLModel, table=True):
+    """
+    侧边栏筛选项的仓库数量，由 repo 表上的触发器增量维护，读取时无需扫描所有仓库。
+    - kind='system': value 为 all（全部）、constellation（特别关注）、untagged（未分类）
+    - kind='tag': value 为用户标签名（不含内部标签 _favorite）
+    - kind='language': value 为编程语言
+    """
+    kind: str = Field(primary_key=True, description="筛选项类型：system / tag / language")
+    value: str = Field(primary_key=True, description="筛选项的值")
+    count: int = Field(default=0, description="满足该筛选项的仓库数量")
+
+class RepoTag(SQLModel, table=True):
+    """
+    仓库与标签的对应关系，是 Repo.tags 的规范化副本，由 repo 表上的触发器维护，不直接写入。
+    主键 (repo_id, tag) 支持按仓库查找标签，(tag, repo_id) 索引支持按标签查找仓库，
+    标签筛选、删除和重命名因此只需查找索引，不再解析每一行的 JSON 列。
+    """
+    repo_id: int = Field(primary_key=True, description="仓库的 GitHub ID")
+    tag: str = Field(primary_key=True, description="标签名称（包括内部标签 _favorite）")
+
+Index("ix_repotag_tag_repo_id", RepoTag.__table__.c.tag, RepoTag.__table__.c.repo_id)
+
+class SummaryJob(SQLModel, table=True):
+    """
+    一次 AI 总结任务。任务和其中每个仓库的状态都保存在数据库中，由后台 worker 依次处理，服务重启后继续执行。
+    status: pending（等待执行）/ running（执行中）/ done（全部仓库处理完毕）/ failed（因致命错误中止）
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    mode: str = Field(description="总结模式：all / unanalyzed / auto")
+    status: str = Field(default="pending", index=True, description="任务状态")
+    total: int = Field(default=0, description="任务包含的仓库数量")
+    error: Optional[str] = Field(default=None, description="任务中止的原因")
+    created_at: datetime = Field(default_factory=utc_now, description="任务创建时间")
+    started_at: Optional[datetime] = Field(default=None, description="任务开始执行的时间")
+    finished_at: Optional[datetime] = Field(default=None, description="任务结束的时间")
+
+class SummaryJobItem(SQLModel, table=True):
+    """
+    总结任务中的一个仓库。
+    status: pending（等待处理，retry_at 不为空时表示等待到该时间后重试）/ running（处理中）/ done（成功）/ failed（失败且不再重试）
+    """
+    job_id: int = Field(primary_key=True, foreign_key="summaryjob.id", description="所属任务的 ID")
+    repo_id: int = Field(primary_key=True, description="仓库的 GitHub ID")
+    status: str = Field(default="pending", description="处理状态")
+    attempts: int = Field(default=0, description="已尝试的次数")
+    retry_at: Optional[datetime] = Field(default=None, description="下一次重试的最早时间")
+    error: Optional[str] = Field(default=None, description="最后一次失败的原因")
+    updated_at: datetime = Field(default_factory=utc_now, description="状态最后一次变化的时间")
+
+Index("ix_summaryjobitem_job_id_status", SummaryJobItem.__table__.c.job_id, SummaryJobItem.__table__.c.status)
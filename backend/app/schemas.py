@@ -2,10 +2,12 @@
 定义应用中用于数据传输（API 输入和输出）的 Pydantic 模型。
 这些模型不直接与数据库交互，而是作为 API 路由的请求体（输入）和响应体（输出）的结构定义和数据验证层。
 """
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
+TAG_MAX_LENGTH = 30 # 单个标签的最大长度限制
+
 class ErrorResponse(BaseModel):
     """标准化的 API 错误响应结构。"""
     code: str         # 错误码
@@ -20,8 +22,8 @@ class UserResponse(BaseModel):
     html_url: str       # GitHub 主页 URL
     name: Optional[str] = None # GitHub 显示名称
 
-class RepoResponse(BaseModel):
-    """API 响应中单个仓库的数据结构。"""
+class RepoCompactResponse(BaseModel):
+    """列表和卡片视图所需的仓库数据结构（view=compact），不包含备注和 AI 总结等长文本。"""
     id: int                     # GitHub 仓库的唯一 ID
     name: str                   # 仓库名称
     full_name: str              # 仓库全名 (owner/name)
@@ -34,24 +36,78 @@ class RepoResponse(BaseModel):
     pushed_at: str              # 最后一次 push 的时间 (ISO 8601 格式)
     starred_at: str             # 用户收藏仓库的时间 (ISO 8601 格式)
     alias: Optional[str] = None     # 用户设置的别名
-    notes: Optional[str] = None     # 用户的详细备注 (支持 Markdown)
     tags: List[str] = []            # 用户打的标签列表
-    ai_summary: Optional[str] = None  # AI 生成的仓库总结
     analyzed_at: Optional[datetime] = None  # AI 分析时间戳
     analysis_failed: Optional[bool] = None  # AI 分析是否失败
 
+class RepoResponse(RepoCompactResponse):
+    """API 响应中单个仓库的完整数据结构。"""
+    notes: Optional[str] = None     # 用户的详细备注 (支持 Markdown)
+    ai_summary: Optional[str] = None  # AI 生成的仓库总结
+
 class StarsResponse(BaseModel):
     """`/api/stars` 接口的完整响应体结构。"""
-    stars: List[RepoResponse]       # 仓库列表
+    stars: List[RepoResponse]       # 仓库列表（view=compact 时不含 notes、ai_summary）
     metadata: Dict[str, Any]       # 用于前端筛选的预聚合元数据
+    version: int = 0               # 本次数据对应的版本号，用于 /api/stars/changes 增量更新
+
+class StarsChangesResponse(BaseModel):
+    """`/api/stars/changes` 接口的响应体结构。"""
+    version: int                                # 服务器当前的数据版本号，下次请求时作为 since
+    reset: bool = False                         # 为 true 时客户端应丢弃本地数据并重新获取完整列表
+    stars: List[RepoResponse] = []              # since 之后新增或修改的仓库（view=compact 时不含 notes、ai_summary）
+    deleted_ids: List[int] = []                 # since 之后被删除的仓库 ID
+    metadata: Dict[str, Any] = {}               # 最新的筛选元数据（语言列表、标签列表）
+
+class FacetsResponse(BaseModel):
+    """`/api/stars/facets` 接口的响应体结构，各筛选项对应的仓库数量。"""
+    all: int                        # 全部仓库数量
+    constellation: int             # 特别关注（带有 _favorite 标签）的仓库数量
+    untagged: int                  # 未分类（除 _favorite 外没有标签）的仓库数量
+    tags: Dict[str, int]           # 每个标签的仓库数量
+    languages: Dict[str, int]      # 每种语言的仓库数量
+
+class StarsPageResponse(BaseModel):
+    """`/api/stars/page` 接口的响应体结构。"""
+    stars: List[RepoResponse]           # 当前页的仓库列表（view=compact 时不含 notes、ai_summary）
+    next_cursor: Optional[str] = None   # 下一页的游标，没有下一页时为 null
+    total: int                          # 满足筛选条件的仓库总数
+
+class SearchResult(BaseModel):
+    """`/api/stars/search` 接口中的单条搜索结果。"""
+    repo: RepoResponse              # 命中的仓库
+    score: float                    # 相关性得分 (bm25 取反，越大越相关)
+    snippet: Optional[str] = None   # 命中片段，HTML 已转义，命中词以 <mark> 标签包裹
+
+class SearchResponse(BaseModel):
+    """`/api/stars/search` 接口的响应体结构。"""
+    query: str                      # 原始搜索词
+    total: int                      # 匹配的仓库总数
+    results: List[SearchResult]     # 按相关性排序的当前页结果
 
 class SyncResponse(BaseModel):
     """`/api/sync` 接口的响应体结构。"""
     status: str = "ok"          # 操作状态
+    mode: str = "full"          # 同步模式: "full" 或 "incremental"
     added: int                  # 新增的仓库数量
     updated: int                # 更新的仓库数量
     removed: int                # 移除的仓库数量
-    total_from_github: int      # 从 GitHub API 获取的仓库总数
+    total_from_github: int      # 从 GitHub API 获取的仓库总数（增量模式下为新获取的仓库数）
+    page_cache_hits: int = 0    # GitHub 返回 304、直接使用本地缓存的页数
+    page_cache_misses: int = 0  # 重新下载了完整数据的页数
+    page_latency_ms: Dict[str, float] = {}  # 分页请求耗时汇总 (avg/p95/max，毫秒)
+    incomplete_pages: List[int] = []        # 重试用尽后未拿到最新数据的页码（本次同步跳过删除）
+    write_ms: float = 0.0                   # 暂存数据库写操作（批量新增、更新、删除）的耗时（毫秒）
+
+class RateLimitResponse(BaseModel):
+    """`/api/rate-limit` 接口的响应体结构。"""
+    resources: Dict[str, Dict[str, int]]  # 各配额类型 (core/graphql/...) 的 limit、remaining、reset_at (Unix 时间戳)
+    is_paused: bool                     # 是否因限流处于全局暂停状态
+    paused_for_seconds: float           # 距离暂停结束的剩余秒数
+    pause_reason: Optional[str] = None  # 暂停原因
+    in_flight: int                      # 正在进行的 GitHub 请求数
+    allowed_concurrency: int            # 根据剩余配额计算出的当前并发上限
+    max_concurrency: int                # 配额充足时的并发上限
 
 class RepoUpdateRequest(BaseModel):
     """更新仓库信息 (`PATCH /api/stars/{repo_id}`) 的请求体结构。"""
@@ -68,7 +124,6 @@ class RepoUpdateRequest(BaseModel):
         if tags_list is None:
             return None
 
-        TAG_MAX_LENGTH = 30 # 单个标签的最大长度限制
         for tag in tags_list:
             if len(tag) > TAG_MAX_LENGTH:
                 # Pydantic 会捕获此 ValueError 并返回一个标准的 422 校验错误响应
@@ -76,6 +131,37 @@ class RepoUpdateRequest(BaseModel):
         
         return tags_list
 
+class TagBulkFilter(BaseModel):
+    """批量标签操作的筛选条件，含义与侧边栏筛选（/api/stars/page 的 filter_type / filter_value）一致。"""
+    type: Literal["system", "tag", "language"]
+    value: str
+
+class TagBulkRequest(BaseModel):
+    """批量修改标签 (`POST /api/tags/bulk`) 的请求体结构。"""
+    action: Literal["add", "remove", "rename"] = Field(..., description="操作类型：添加、移除或重命名标签")
+    tag: str = Field(..., min_length=1, max_length=TAG_MAX_LENGTH, description="要添加或移除的标签，重命名时为原标签名")
+    new_tag: Optional[str] = Field(None, min_length=1, max_length=TAG_MAX_LENGTH, description="重命名后的标签名")
+    repo_ids: Optional[List[int]] = Field(None, max_length=10000, description="要修改的仓库 ID 列表")
+    filter: Optional[TagBulkFilter] = Field(None, description="要修改的仓库的筛选条件，与 repo_ids 同时提供时取交集")
+
+    @model_validator(mode="after")
+    def validate_action_arguments(self) -> "TagBulkRequest":
+        """重命名必须提供新标签名；添加标签必须指定仓库范围，避免误操作给所有仓库打上标签。"""
+        if self.action == "rename" and not self.new_tag:
+            raise ValueError("重命名标签时必须提供 new_tag。")
+        if self.action == "add" and self.repo_ids is None and self.filter is None:
+            raise ValueError("添加标签时必须提供 repo_ids 或 filter。")
+        return self
+
+class TagBulkResponse(BaseModel):
+    """批量修改标签的响应体结构。"""
+    updated: int    # 实际发生变化的仓库数量
+    version: int    # 修改后的数据版本号
+
+class TagRenameRequest(BaseModel):
+    """重命名标签 (`PATCH /api/tags/{tag_name}`) 的请求体结构。"""
+    new_name: str = Field(..., min_length=1, max_length=TAG_MAX_LENGTH, description="新的标签名称")
+
 class AppSettingsUpdateRequest(BaseModel):
     """更新应用设置的请求体结构。"""
     # 后台任务相关
@@ -0,0 +1,103 @@
+"""
+JSON 编码性能基准：对比 10k 个仓库的列表响应在不同序列化路径下的耗时。
+- pydantic:  Repo -> model_dump -> RepoResponse.model_validate -> StarsResponse.model_dump_json（引入 fast_json 之前 /api/stars 的做法）。
+- fastapi:   RepoResponse 列表经 jsonable_encoder 后由标准库 json 编码（未指定 response_class 时 FastAPI 的默认路径）。
+- rows+json: 直接从行字典用标准库 json 编码（fast_json 在未安装 orjson 时的回退路径）。
+- rows+orjson: 直接从行字典用 orjson 编码（fast_json 的默认路径，需要安装 orjson）。
+
+用法（在 backend 目录下执行）:
+    python -m benchmarks.json_encode_benchmark --repos 10000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+_TMP_DIR = tempfile.mkdtemp(prefix="stargazer-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/bench.db"
+os.environ.setdefault("GITHUB_CLIENT_ID", "benchmark")
+os.environ.setdefault("GITHUB_CLIENT_SECRET", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from app.core import fast_json  # noqa: E402
+from app.core.listing_service import REPO_RESPONSE_FIELDS  # noqa: E402
+from app.models import Repo  # noqa: E402
+from app.schemas import RepoResponse, StarsResponse  # noqa: E402
+
+
+def _make_rows(count: int) -> list:
+    """生成 count 个模拟仓库的行字典，字段与 RepoResponse 一致。"""
+    rows = []
+    for i in range(1, count + 1):
+        rows.append({
+            "id": i, "name": f"repo-{i}", "full_name": f"owner-{i % 997}/repo-{i}", "owner_login": f"owner-{i % 997}",
+            "owner_avatar_url": f"https://avatars.githubusercontent.com/u/{i % 997}",
+            "html_url": f"https://github.com/owner-{i % 997}/repo-{i}",
+            "description": f"Synthetic repository number {i} used for benchmarking JSON encoding.",
+            "language": ("Python", "Go", "Rust", "TypeScript", None)[i % 5], "stargazers_count": i * 7 % 100000,
+            "pushed_at": "2024-01-01T00:00:00Z", "starred_at": "2023-01-01T00:00:00Z",
+            "alias": f"别名 {i}" if i % 3 == 0 else None, "notes": "一些备注 " * (i % 20) or None,
+            "tags": ["_favorite", "工具"] if i % 4 == 0 else [], "ai_summary": "这是一个用于测试的仓库总结。" if i % 2 else None,
+            "analyzed_at": datetime(2024, 1, 1, 12, 0, 0) if i % 2 else None, "analysis_failed": False,
+        })
+    assert set(rows[0]) == set(REPO_RESPONSE_FIELDS)
+    return rows
+
+
+def _best_of(runs: int, func) -> tuple:
+    """执行 runs 次，返回 (最短耗时毫秒, 结果字节数)。"""
+    best, size = float("inf"), 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        size = len(func())
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=10000, help="模拟的仓库数量")
+    parser.add_argument("--runs", type=int, default=5, help="每种方式重复执行的次数（取最短耗时）")
+    args = parser.parse_args()
+
+    rows = _make_rows(args.repos)
+    repos = [Repo(**row) for row in rows]
+    metadata = {"languages": ["Python", "Go", "Rust", "TypeScript"], "tags": ["工具"]}
+
+    def pydantic_path():
+        stars = [RepoResponse.model_validate(repo.model_dump()) for repo in repos]
+        return StarsResponse(stars=stars, metadata=metadata).model_dump_json().encode("utf-8")
+
+    def fastapi_default_path():
+        stars = [RepoResponse.model_validate(row) for row in rows]
+        return json.dumps(jsonable_encoder({"stars": stars, "metadata": metadata}), ensure_ascii=False).encode("utf-8")
+
+    def rows_json_path():
+        return json.dumps(
+            {"stars": rows, "metadata": metadata}, ensure_ascii=False, separators=(",", ":"), default=fast_json._default
+        ).encode("utf-8")
+
+    results = [
+        ("pydantic", _best_of(args.runs, pydantic_path)),
+        ("fastapi", _best_of(args.runs, fastapi_default_path)),
+        ("rows+json", _best_of(args.runs, rows_json_path)),
+    ]
+    if fast_json.HAS_ORJSON:
+        results.append(("rows+orjson", _best_of(args.runs, lambda: fast_json.dumps({"stars": rows, "metadata": metadata}))))
+    else:
+        print("orjson is not installed, skipping rows+orjson.")
+
+    print(f"repos: {args.repos}")
+    for label, (elapsed_ms, size) in results:
+        print(f"{label:12s} {elapsed_ms:8.1f} ms  ({size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
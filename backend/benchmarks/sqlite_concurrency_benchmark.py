@@ -0,0 +1,165 @@
+"""
+SQLite 读写并发基准：模拟后台同步期间界面读请求和小写入的延迟。
+- 同步线程：在一个事务中批量更新所有仓库，再等待一段时间（模拟生成和发送通知）。
+- 读线程：持续执行仓库列表查询（相当于 GET /api/stars）。
+- 写线程：持续修改单个仓库的备注并提交（相当于 PATCH /api/stars/{id}）。
+依次运行三种情况：
+- sqlite defaults：SQLite 默认参数（rollback journal），通知期间不提交，即旧的调度器行为。
+- tuned pragmas：db.get_sqlite_pragmas() 的调优参数（WAL），通知期间仍不提交。
+  WAL 只解除了读请求的阻塞；写入仍要等待整个同步事务结束，最长等待时间与前一种情况相同。
+- tuned pragmas, commit before notify：调优参数，写入完成后立即提交再等待，即当前调度器的行为。
+  写入只需等待批量更新本身，不再等待通知。
+读写线程在批量更新执行完之后才开始，结果不包含批量更新期间的等待；这段时间包含在输出的 write transaction 中，
+随仓库数量增长，三种情况下都没有改变。
+
+用法（在 backend 目录下执行）:
+    python -m benchmarks.sqlite_concurrency_benchmark --repos 20000 --hold 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+_TMP_DIR = tempfile.mkdtemp(prefix="stargazer-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/app.db"
+os.environ.setdefault("GITHUB_CLIENT_ID", "benchmark")
+os.environ.setdefault("GITHUB_CLIENT_SECRET", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, text, update  # noqa: E402
+from sqlmodel import Session, SQLModel, create_engine, select  # noqa: E402
+
+from app.db import apply_sqlite_pragmas, get_sqlite_pragmas  # noqa: E402
+from app.models import Repo  # noqa: E402
+
+
+def _create_engine(path: str, pragmas: dict):
+    """创建指向 path 的引擎，pragmas 非空时在每个连接上应用。"""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    if pragmas:
+        event.listen(engine, "connect", lambda dbapi_connection, _record: apply_sqlite_pragmas(dbapi_connection, pragmas))
+    return engine
+
+
+def _populate(engine, count: int):
+    """创建表并写入 count 个模拟仓库。"""
+    SQLModel.metadata.create_all(engine)
+    rows = [
+        {
+            "id": i, "name": f"repo-{i}", "full_name": f"owner/repo-{i}", "owner_login": "owner",
+            "owner_avatar_url": "https://avatars.githubusercontent.com/u/1", "html_url": f"https://github.com/owner/repo-{i}",
+            "description": f"Synthetic repository {i}", "language": ("Python", "Go", "Rust", None)[i % 4],
+            "stargazers_count": i, "pushed_at": "2024-01-01T00:00:00Z", "starred_at": "2023-01-01T00:00:00Z",
+            "tags": [], "analysis_failed": False,
+        }
+        for i in range(1, count + 1)
+    ]
+    with engine.begin() as connection:
+        connection.execute(Repo.__table__.insert(), rows)
+
+
+def _percentile(values: list, ratio: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def _run(label: str, engine, repo_count: int, hold_seconds: float, commit_before_hold: bool) -> None:
+    """在同步进行期间测量读写延迟并打印结果。commit_before_hold 为 True 时写入后立即提交，再模拟发送通知。"""
+    stop = threading.Event()
+    sync_started = threading.Event()
+    read_ms, write_ms, write_errors = [], [], []
+    lock_seconds = []
+
+    def sync_worker():
+        with Session(engine) as session:
+            rows = [{"id": i, "stargazers_count": i + 1} for i in range(1, repo_count + 1)]
+            started = time.perf_counter()
+            session.exec(update(Repo), params=rows)
+            sync_started.set()
+            if commit_before_hold:
+                session.commit()
+                lock_seconds.append(time.perf_counter() - started)
+            time.sleep(hold_seconds)
+            if not commit_before_hold:
+                session.commit()
+                lock_seconds.append(time.perf_counter() - started)
+
+    def reader():
+        sync_started.wait()
+        while not stop.is_set():
+            started = time.perf_counter()
+            with Session(engine) as session:
+                session.exec(select(Repo.id, Repo.name, Repo.stargazers_count).where(Repo.language == "Python").limit(200)).all()
+            read_ms.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+
+    def writer():
+        sync_started.wait()
+        index = 0
+        while not stop.is_set():
+            index += 1
+            started = time.perf_counter()
+            try:
+                with Session(engine) as session:
+                    session.exec(update(Repo).where(Repo.id == 1).values(notes=f"note {index}"))
+                    session.commit()
+                write_ms.append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                write_errors.append(str(e).splitlines()[0])
+            time.sleep(0.1)
+
+    threads = [threading.Thread(target=target) for target in (reader, writer)]
+    for thread in threads:
+        thread.start()
+    sync_thread = threading.Thread(target=sync_worker)
+    sync_started_at = time.perf_counter()
+    sync_thread.start()
+    sync_thread.join()
+    sync_seconds = time.perf_counter() - sync_started_at
+    # 同步提交后再观察一小段时间，让等待中的写入完成
+    time.sleep(0.5)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"[{label}] sync: {sync_seconds:.2f}s, write transaction: {lock_seconds[0]:.2f}s")
+    print(
+        f"  reads : {len(read_ms):5d} ok, p50 {_percentile(read_ms, 0.5):7.1f} ms, "
+        f"p95 {_percentile(read_ms, 0.95):7.1f} ms, max {max(read_ms, default=0):7.1f} ms"
+    )
+    print(
+        f"  writes: {len(write_ms):5d} ok, {len(write_errors)} failed, p50 {_percentile(write_ms, 0.5):7.1f} ms, "
+        f"max {max(write_ms, default=0):7.1f} ms"
+    )
+    if write_errors:
+        print(f"  first write error: {write_errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=20000, help="模拟的仓库数量")
+    parser.add_argument("--hold", type=float, default=2.0, help="写入后模拟发送通知的秒数")
+    args = parser.parse_args()
+
+    profiles = [
+        ("sqlite defaults", {}, False),
+        ("tuned pragmas", get_sqlite_pragmas(), False),
+        ("tuned pragmas, commit before notify", get_sqlite_pragmas(), True),
+    ]
+    for index, (label, pragmas, commit_before_hold) in enumerate(profiles):
+        engine = _create_engine(f"{_TMP_DIR}/bench-{index}.db", pragmas)
+        _populate(engine, args.repos)
+        with engine.connect() as connection:
+            journal_mode = connection.execute(text("PRAGMA journal_mode")).scalar()
+        _run(f"{label}, journal_mode={journal_mode}", engine, args.repos, args.hold, commit_before_hold)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
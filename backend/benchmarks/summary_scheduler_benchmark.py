@@ -0,0 +1,178 @@
+"""
+AI 总结调度性能基准：用模拟的 README 请求和 AI 调用对比批量总结的三种调度方式。
+- groups:   引入速率限制器之前的做法，每次并发处理 ai_concurrency 个仓库，整组完成后才开始下一组，
+            组间固定等待 20 秒、每 50 个仓库等待 60 秒（--gap-scale 控制这两个等待按多大比例计入，默认 0 只比较排队损失）。
+- slots:    滑动窗口，但每个槽位内先获取 README 再调用 AI，两者的等待时间相加。
+- pipeline: summarize_repos_batch 当前的两阶段流水线，README 预取和 AI 调用各自并发，中间通过有界队列衔接。
+三种方式都执行真实的 summarize_single_repo（包括写入数据库），只把 GitHub README 请求和 AI 调用替换为
+按给定耗时（0.5 到 3 倍之间随机分布）等待的模拟调用；AI 调用仍经过 RPM 速率限制器。
+任何一个仓库总结失败都会中止基准，避免把失败的快速返回计入耗时。
+另外输出按真实等待时间（20 秒 / 60 秒）估算的旧调度处理 5000 个仓库所需的时间，以及在给定 RPM 下新调度的理论耗时。
+
+用法（在 backend 目录下执行）:
+    python -m benchmarks.summary_scheduler_benchmark --repos 200 --concurrency 5 --readme-latency-ms 100 --ai-latency-ms 150
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_TMP_DIR = tempfile.mkdtemp(prefix="stargazer-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/bench.db"
+os.environ.setdefault("GITHUB_CLIENT_ID", "benchmark")
+os.environ.setdefault("GITHUB_CLIENT_SECRET", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlmodel import Session  # noqa: E402
+
+from app.config import settings as app_config  # noqa: E402
+from app.core import summary_service  # noqa: E402
+from app.core.ai_rate_limiter import AIRateLimiter, _limiters  # noqa: E402
+from app.core.ai_service import AIService  # noqa: E402
+from app.core.security import encrypt_data  # noqa: E402
+from app.db import create_db_and_tables, engine  # noqa: E402
+from app.models import AppSettings, Repo  # noqa: E402
+
+AI_BASE_URL = "http://benchmark.invalid"
+LEGACY_GROUP_GAP_SECONDS = 20
+LEGACY_BATCH_GAP_SECONDS = 60
+LEGACY_BATCH_SIZE = 50
+
+
+def _latencies(count: int, latency_ms: float, rng: random.Random) -> list:
+    return [latency_ms / 1000 * rng.uniform(0.5, 3.0) for _ in range(count)]
+
+
+def _create_repos(count: int) -> list:
+    """在基准数据库中创建 count 个仓库，返回会话关闭后仍可读取的仓库对象。"""
+    repos = [
+        Repo(id=i, name=f"repo-{i}", full_name=f"owner/repo-{i}", owner_login="owner", owner_avatar_url="",
+             html_url="", stargazers_count=0, pushed_at="2024-01-01T00:00:00Z", starred_at="2024-01-01T00:00:00Z")
+        for i in range(count)
+    ]
+    with Session(engine, expire_on_commit=False) as session:
+        session.add_all(repos)
+        session.commit()
+    return repos
+
+
+def _install_fakes(readme_latencies: list, ai_latencies: list):
+    """把 README 请求和 AI 调用替换为按预设耗时等待的模拟调用。"""
+    async def fake_get_readme_content(full_name, github_token):
+        await asyncio.sleep(readme_latencies[int(full_name.rsplit("-", 1)[1])])
+        return f"# {full_name}\n\nSynthetic README used for benchmarking.", "sha"
+
+    async def fake_summarize(self, full_name, readme_content):
+        await self.rate_limiter.acquire(1)
+        await asyncio.sleep(ai_latencies[int(full_name.rsplit("-", 1)[1])])
+        self.rate_limiter.on_success()
+        return "Synthetic summary used for benchmarking."
+
+    summary_service.get_readme_content = fake_get_readme_content
+    AIService.handle_rate_limit_with_retry = fake_summarize
+
+
+def _reset_limiter(rpm: int):
+    _limiters[AI_BASE_URL] = AIRateLimiter(rpm, 0)
+
+
+async def _run_groups(repos: list, settings: AppSettings, concurrency: int, gap_scale: float) -> float:
+    """旧调度：整组并发，组间和批次间固定等待。"""
+    ai_service = AIService(AI_BASE_URL, "benchmark", "benchmark")
+    started = time.perf_counter()
+    for batch_idx in range(0, len(repos), LEGACY_BATCH_SIZE):
+        batch = repos[batch_idx:batch_idx + LEGACY_BATCH_SIZE]
+        for i in range(0, len(batch), concurrency):
+            results = await asyncio.gather(*(
+                summary_service.summarize_single_repo(repo, "benchmark", settings, ai_service)
+                for repo in batch[i:i + concurrency]
+            ))
+            assert all(results), "summarize_single_repo failed, see the log above"
+            if i + concurrency < len(batch):
+                await asyncio.sleep(LEGACY_GROUP_GAP_SECONDS * gap_scale)
+        if batch_idx + LEGACY_BATCH_SIZE < len(repos):
+            await asyncio.sleep(LEGACY_BATCH_GAP_SECONDS * gap_scale)
+    return time.perf_counter() - started
+
+
+async def _run_slots(repos: list, settings: AppSettings, concurrency: int) -> float:
+    """滑动窗口，README 请求和 AI 调用在同一个槽位内依次进行。"""
+    ai_service = AIService(AI_BASE_URL, "benchmark", "benchmark")
+    pending = iter(repos)
+
+    async def worker():
+        for repo in pending:
+            assert await summary_service.summarize_single_repo(repo, "benchmark", settings, ai_service), \
+                "summarize_single_repo failed, see the log above"
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def _run_pipeline(repos: list, settings: AppSettings) -> float:
+    """当前的两阶段流水线。"""
+    started = time.perf_counter()
+    result = await summary_service.summarize_repos_batch(repos, settings)
+    assert result["success"] == len(repos), result
+    return time.perf_counter() - started
+
+
+def _legacy_projection(repos: int, concurrency: int, group_seconds: float) -> float:
+    """按真实的 20 秒 / 60 秒等待估算旧调度处理 repos 个仓库的秒数。"""
+    groups = sum(-(-min(LEGACY_BATCH_SIZE, repos - start) // concurrency) for start in range(0, repos, LEGACY_BATCH_SIZE))
+    batches = -(-repos // LEGACY_BATCH_SIZE)
+    return groups * group_seconds + (groups - batches) * LEGACY_GROUP_GAP_SECONDS + (batches - 1) * LEGACY_BATCH_GAP_SECONDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=200, help="模拟的仓库数量")
+    parser.add_argument("--concurrency", type=int, default=5, help="AI 并发数（ai_concurrency）")
+    parser.add_argument("--readme-concurrency", type=int, default=app_config.SUMMARY_README_CONCURRENCY,
+                        help="README 预取并发数（SUMMARY_README_CONCURRENCY）")
+    parser.add_argument("--readme-latency-ms", type=float, default=100, help="模拟 README 请求的耗时基准（毫秒）")
+    parser.add_argument("--ai-latency-ms", type=float, default=150, help="模拟 AI 调用的耗时基准（毫秒）")
+    parser.add_argument("--rpm", type=int, default=6000, help="AI 调用的每分钟请求数上限")
+    parser.add_argument("--gap-scale", type=float, default=0.0, help="旧调度固定等待时间的计入比例")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    app_config.SUMMARY_README_CONCURRENCY = args.readme_concurrency
+    rng = random.Random(args.seed)
+    readme_latencies = _latencies(args.repos, args.readme_latency_ms, rng)
+    ai_latencies = _latencies(args.repos, args.ai_latency_ms, rng)
+    _install_fakes(readme_latencies, ai_latencies)
+    create_db_and_tables()
+    repos = _create_repos(args.repos)
+    settings = AppSettings(ai_base_url=AI_BASE_URL, ai_model="benchmark",
+                           github_access_token=encrypt_data("benchmark"), ai_concurrency=args.concurrency)
+
+    results = []
+    _reset_limiter(args.rpm)
+    results.append((f"groups (gap {args.gap_scale:g})", asyncio.run(_run_groups(repos, settings, args.concurrency, args.gap_scale))))
+    _reset_limiter(args.rpm)
+    results.append(("slots", asyncio.run(_run_slots(repos, settings, args.concurrency))))
+    _reset_limiter(args.rpm)
+    results.append(("pipeline", asyncio.run(_run_pipeline(repos, settings))))
+
+    mean_readme = sum(readme_latencies) / args.repos * 1000
+    mean_ai = sum(ai_latencies) / args.repos * 1000
+    print(f"repos: {args.repos}, AI concurrency: {args.concurrency}, README concurrency: {args.readme_concurrency}, "
+          f"mean README latency: {mean_readme:.0f} ms, mean AI latency: {mean_ai:.0f} ms, rpm: {args.rpm}")
+    for label, seconds in results:
+        print(f"{label:16s} {seconds:8.2f} s  ({args.repos / seconds:7.1f} repos/s)")
+
+    # 5000 个仓库、每次调用 5 秒时的估算
+    legacy_hours = _legacy_projection(5000, args.concurrency, group_seconds=5 * 1.5) / 3600
+    print(f"projection for 5000 repos at ~5 s per call: groups with real gaps ≈ {legacy_hours:.1f} h, "
+          f"pipeline at 60 rpm ≈ {5000 / 60 / 60:.1f} h, at 300 rpm ≈ {5000 / 300 / 60:.1f} h")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+同步比对性能基准：在临时 SQLite 数据库中生成大量模拟仓库，对比两种比对方式的耗时。
+- field: 读取所有仓库的同步字段后逐字段比对（引入 content_hash 之前的做法）。
+- hash:  先只读取 id 和 content_hash 比较指纹，仅对指纹变化的仓库逐字段比对（当前的 _StarDiff）。
+
+用法（在 backend 目录下执行）:
+    python -m benchmarks.sync_diff_benchmark --repos 50000 --changed 0.01
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 基准脚本不依赖真实配置，使用临时数据库和占位的必需配置
+_TMP_DIR = tempfile.mkdtemp(prefix="stargazer-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/bench.db"
+os.environ.setdefault("GITHUB_CLIENT_ID", "benchmark")
+os.environ.setdefault("GITHUB_CLIENT_SECRET", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlmodel import Session  # noqa: E402
+
+from app.db import engine, create_db_and_tables  # noqa: E402
+from app.core.github import StarRecord  # noqa: E402
+from app.core.sync_service import (  # noqa: E402
+    SYNCED_UPDATE_FIELDS, _StarDiff, _content_hash, _select_content_hashes, _select_diff_rows, _write_operations,
+)
+from sqlmodel import select  # noqa: E402
+from app.models import Repo  # noqa: E402
+
+
+def _make_records(count: int) -> list:
+    """生成 count 条模拟星标记录。"""
+    return [
+        StarRecord(
+            id=i,
+            name=f"repo-{i}",
+            full_name=f"owner-{i % 997}/repo-{i}",
+            owner_login=f"owner-{i % 997}",
+            owner_avatar_url=f"https://avatars.githubusercontent.com/u/{i % 997}",
+            html_url=f"https://github.com/owner-{i % 997}/repo-{i}",
+            description=f"Synthetic repository number {i} used for benchmarking the sync diff.",
+            language=("Python", "Go", "Rust", "TypeScript", None)[i % 5],
+            stargazers_count=i * 7 % 100000,
+            pushed_at=f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T00:00:00Z",
+            starred_at=f"2023-{i % 12 + 1:02d}-{i % 28 + 1:02d}T00:00:00Z",
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def _field_diff(session: Session, records: list) -> int:
+    """引入指纹之前的比对方式：读取全部同步字段并逐字段比较，返回有变化的仓库数。"""
+    statement = select(Repo.id, *(getattr(Repo, field) for field in SYNCED_UPDATE_FIELDS))
+    db_rows = {row.id: row for row in session.exec(statement).all()}
+    changed = 0
+    for record in records:
+        db_row = db_rows.get(record.id)
+        if db_row is None:
+            continue
+        for field in SYNCED_UPDATE_FIELDS:
+            if getattr(db_row, field) != getattr(record, field):
+                changed += 1
+                break
+    return changed
+
+
+def _hash_diff(session: Session, records: list) -> int:
+    """当前的比对方式，返回有变化的仓库数。"""
+    diff = _StarDiff(
+        _select_content_hashes(session),
+        load_rows=lambda repo_ids: _select_diff_rows(session, repo_ids),
+    )
+    diff.feed(records)
+    _to_add, to_update, *_ = diff.result()
+    return len(to_update)
+
+
+def _best_of(runs: int, func, *args) -> tuple:
+    """执行 runs 次，返回 (最短耗时毫秒, 结果)。"""
+    best, result = float("inf"), None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func(*args)
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=50000, help="模拟的仓库数量")
+    parser.add_argument("--changed", type=float, default=0.01, help="GitHub 侧发生变化的仓库比例")
+    parser.add_argument("--runs", type=int, default=3, help="每种方式重复执行的次数（取最短耗时）")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    records = _make_records(args.repos)
+
+    # 初始化本地数据（包含指纹），模拟一次已完成的同步
+    with Session(engine) as session:
+        rows = []
+        for record in records:
+            repo_data = record._asdict()
+            repo_data["content_hash"] = _content_hash(record)
+            rows.append(repo_data)
+        _write_operations(session, rows, [], [])
+        session.commit()
+
+    # 按比例修改部分仓库的 Star 数，模拟 GitHub 侧的变化
+    step = max(1, int(1 / args.changed)) if args.changed > 0 else 0
+    if step:
+        records = [
+            record._replace(stargazers_count=record.stargazers_count + 1) if record.id % step == 0 else record
+            for record in records
+        ]
+
+    with Session(engine) as session:
+        field_ms, field_changed = _best_of(args.runs, _field_diff, session, records)
+        hash_ms, hash_changed = _best_of(args.runs, _hash_diff, session, records)
+
+    print(f"repos: {args.repos}, changed ratio: {args.changed}")
+    print(f"field-by-field diff: {field_ms:8.1f} ms  (changed: {field_changed})")
+    print(f"content-hash diff:   {hash_ms:8.1f} ms  (changed: {hash_changed})")
+
+
+if __name__ == "__main__":
+    main()
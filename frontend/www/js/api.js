@@ -70,9 +70,38 @@ const api = (() => {
 
         /**
          * 获取所有 Star 数据和元数据 (回滚后的版本)
-         * GET /api/stars
+         * 使用 compact 视图，不包含备注和 AI 总结，详情面板打开时再通过 getRepo 获取。
+         * GET /api/stars?view=compact
          */
-        getStars: () => _request('/api/stars'),
+        getStars: () => _request('/api/stars?view=compact'),
+
+        /**
+         * 获取侧边栏各筛选项的仓库数量
+         * GET /api/stars/facets
+         */
+        getFacets: () => _request('/api/stars/facets'),
+
+        /**
+         * 获取单个仓库的完整信息（包括备注和 AI 总结）
+         * GET /api/stars/{repo_id}
+         * @param {number} repoId - 仓库 ID
+         */
+        getRepo: (repoId) => _request(`/api/stars/${repoId}`),
+
+        /**
+         * 获取指定数据版本之后变更的仓库和被删除的仓库 ID
+         * GET /api/stars/changes?view=compact
+         * @param {number} since - 本地数据对应的版本号
+         */
+        getStarChanges: (since) => _request(`/api/stars/changes?since=${since}&view=compact`),
+
+        /**
+         * 服务端全文搜索，结果按相关性排序
+         * GET /api/stars/search
+         * @param {string} query - 搜索词
+         * @param {number} limit - 返回的最大结果数
+         */
+        searchStars: (query, limit = 1000) => _request(`/api/stars/search?q=${encodeURIComponent(query)}&limit=${limit}`),
 
         /**
          * 手动触发后端同步
@@ -13,6 +13,8 @@ const app = (() => {
         user: null,
         settings: {},
         allRepos: [],
+        dataVersion: null,
+        facets: null,
         metadata: {
             tags: [],
             languages: []
@@ -21,6 +23,7 @@ const app = (() => {
         activeFilter: { type: 'system', value: 'all' },
         activeSort: 'starred_at',
         searchQuery: '',
+        searchResultIds: null,
         currentView: 'list',
         selectedRepoId: null,
         isDetailsPanelOpen: false,
@@ -115,9 +118,11 @@ const app = (() => {
 
     /**
      * 计算筛选器的计数信息，为侧边栏的显示提供数据基础
+     * 优先使用服务端维护的计数（state.facets）；本地数据被乐观修改、服务端计数尚未同步时，遍历本地数据计算。
      * @returns {Object} 包含各类型筛选器及其对应计数的对象
      */
     const _calculateCounts = () => {
+        if (state.facets) return state.facets;
         const counts = { all: state.allRepos.length, constellation: 0, untagged: 0, tags: {}, languages: {} };
         // 遍历所有仓库，精确计算各类筛选器（“特别关注”、“未分类”、各标签和语言）的计数。
         // '_favorite' 是一个特殊的内部标签，用于标记“特别关注”的仓库 (constellation)。
@@ -157,10 +162,15 @@ const app = (() => {
             result = result.filter(r => r.language === filterValue);
         }
 
-        // 当存在搜索查询时，使用 Fuse.js 进行模糊搜索，并禁用默认排序，
-        // 因为 Fuse.js 的结果已按相关性排序。
+        // 当存在搜索查询时，优先使用服务端全文搜索返回的结果顺序；
+        // 服务端搜索不可用时回退到 Fuse.js 模糊搜索。两种结果都已按相关性排序，因此禁用默认排序。
         const query = state.searchQuery.toLowerCase().trim();
-        if (query) {
+        if (query && state.searchResultIds) {
+            const rankById = new Map(state.searchResultIds.map((id, index) => [id, index]));
+            result = result
+                .filter(r => rankById.has(r.id))
+                .sort((a, b) => rankById.get(a.id) - rankById.get(b.id));
+        } else if (query) {
             const fuseOptions = {
                 keys: [
                     { name: 'name', weight: 0.4 },
@@ -256,12 +266,61 @@ const app = (() => {
 
     // --- 业务逻辑处理器 ---
 
+    /**
+     * 列表数据使用 compact 视图，不包含备注和 AI 总结。
+     * 打开详情面板前按需获取完整信息并合并到本地数据，已加载过的仓库不再重复请求。
+     * @param {number} repoId - 仓库 ID
+     * @returns {Promise<boolean>} 完整信息是否可用
+     */
+    const _loadRepoDetails = async (repoId) => {
+        const repo = state.allRepos.find(r => r.id === repoId);
+        if (!repo || repo.notes !== undefined) return true;
+        try {
+            const fullRepo = await api.getRepo(repoId);
+            const target = state.allRepos.find(r => r.id === repoId);
+            if (target) Object.assign(target, fullRepo);
+            return true;
+        } catch (error) {
+            console.error(`Failed to load details for repo ${repoId}:`, error);
+            ui.showToast(i18n.t('toasts.refreshError'), 'error');
+            return false;
+        }
+    };
+
+    let latestSearchRequest = 0;
+
+    /**
+     * 调用服务端全文搜索并更新搜索状态。
+     * 只采用最后一次输入对应的响应，避免较慢的旧请求覆盖新结果；请求失败时回退到本地 Fuse.js 搜索。
+     * @param {string} query - 搜索框中的内容
+     */
+    const handleSearch = async (query) => {
+        const requestId = ++latestSearchRequest;
+        if (!query.trim()) {
+            setState({ searchQuery: query, searchResultIds: null });
+            return;
+        }
+        let searchResultIds = null;
+        try {
+            const response = await api.searchStars(query.trim());
+            searchResultIds = response.results.map(item => item.repo.id);
+        } catch (error) {
+            console.warn('Server-side search failed, falling back to local search.', error);
+        }
+        if (requestId !== latestSearchRequest) return;
+        setState({ searchQuery: query, searchResultIds });
+    };
+
     const handleUpdateRepo = async (repoId, field, value) => {
         const repoIndex = state.allRepos.findIndex(r => r.id === repoId);
         if (repoIndex === -1) return;
         const originalRepo = JSON.parse(JSON.stringify(state.allRepos[repoIndex]));
         let originalTags;
-        if (field === 'tags') originalTags = [...state.metadata.tags];
+        if (field === 'tags') {
+            originalTags = [...state.metadata.tags];
+            // 服务端计数在请求完成前已过期，改为按本地数据计算
+            state.facets = null;
+        }
         state.allRepos[repoIndex][field] = value;
         
         const onlyUpdateDetails = (field !== 'tags');
@@ -273,6 +332,7 @@ const app = (() => {
             const updatedRepo = await api.updateRepo(repoId, { [field]: value });
             state.allRepos[repoIndex] = updatedRepo;
             if (field === 'tags') {
+                api.getFacets().then(facets => { state.facets = facets; }).catch(() => {});
                 const newTags = new Set(state.metadata.tags);
                 updatedRepo.tags.forEach(tag => newTags.add(tag));
                 if (state.metadata.tags.length !== newTags.size) {
@@ -623,7 +683,7 @@ const app = (() => {
 
 
         elements.searchBox.addEventListener('input', _debounce((e) => {
-            setState({ searchQuery: e.target.value });
+            handleSearch(e.target.value);
         }, 300));
 
         elements.viewSwitcher.addEventListener('click', (e) => {
@@ -709,7 +769,7 @@ const app = (() => {
         }
 
 
-        elements.repoListContainer.addEventListener('click', (e) => {
+        elements.repoListContainer.addEventListener('click', async (e) => {
             const repoItem = e.target.closest('.repo-item');
             if (!repoItem) return;
 
@@ -718,6 +778,8 @@ const app = (() => {
                 ui.toggleRepoDetails(null);
                 setState({ isDetailsPanelOpen: false, selectedRepoId: null });
             } else {
+                // 先加载备注等完整字段再打开详情面板，避免在备注加载前进入编辑而覆盖已有内容
+                if (!await _loadRepoDetails(repoId)) return;
                 const repo = state.allRepos.find(r => r.id === repoId);
                 if (repo) {
                     const allKnownTags = state.metadata.tags.filter(t => t !== '_favorite');
@@ -861,15 +923,18 @@ const app = (() => {
                 const savedLang = localStorage.getItem('stargazer-lang') || document.documentElement.lang.split('-')[0] || 'zh';
                 await i18n.init(savedLang);
 
-                const [starsResponse, settings] = await Promise.all([
+                const [starsResponse, settings, facets] = await Promise.all([
                     api.getStars(),
-                    api.getSettings()
+                    api.getSettings(),
+                    api.getFacets()
                 ]);
 
                 ui.renderUserProfile(user);
                 setState({
                     allRepos: starsResponse.stars,
                     metadata: starsResponse.metadata,
+                    dataVersion: starsResponse.version,
+                    facets,
                     settings: settings
                 });
 
@@ -931,10 +996,37 @@ const app = (() => {
         async refresh() {
             ui.setGlobalLoading(true);
             try {
+                // 已有本地数据时只拉取自上次加载以来的变更并合并到本地副本；
+                // 服务器要求重置（例如数据库被重建）时再获取完整列表。
+                const facetsRequest = api.getFacets();
+                if (state.dataVersion !== null) {
+                    const changes = await api.getStarChanges(state.dataVersion);
+                    if (!changes.reset) {
+                        const changedById = new Map(changes.stars.map(repo => [repo.id, repo]));
+                        const deletedIds = new Set(changes.deleted_ids);
+                        // 变更列表是 compact 视图；正在详情面板中显示的仓库需要重新获取完整信息
+                        const selectedId = state.isDetailsPanelOpen ? state.selectedRepoId : null;
+                        if (selectedId !== null && changedById.has(selectedId)) {
+                            changedById.set(selectedId, await api.getRepo(selectedId));
+                        }
+                        const allRepos = state.allRepos
+                            .filter(repo => !deletedIds.has(repo.id) && !changedById.has(repo.id))
+                            .concat([...changedById.values()]);
+                        setState({
+                            allRepos,
+                            metadata: changes.metadata,
+                            dataVersion: changes.version,
+                            facets: await facetsRequest
+                        });
+                        return;
+                    }
+                }
                 const starsResponse = await api.getStars();
                 setState({
                     allRepos: starsResponse.stars,
-                    metadata: starsResponse.metadata
+                    metadata: starsResponse.metadata,
+                    dataVersion: starsResponse.version,
+                    facets: await facetsRequest
                 });
             } catch (error) {
                 console.error("Failed to refresh data:", error);